@@ -1,15 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Header, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api.deps import require_analyst_access
 from app.models.user import User
 from app.services.pdf_extractor import TurkishTaxPDFExtractor, create_sample_extracted_data
-from typing import Dict, Any
+from app.services.pdf_executor import (
+    get_pdf_executor,
+    ExtractionRejectedError,
+    ExtractionQueueFullError
+)
+from app.services.pdf_cache import get_pdf_cache
+from app.services.pdf_sandbox import get_pdf_sandbox
+from app.services.pdf_jobs import get_pdf_job_store, PDFExtractionJob, JobStatus
+from app.services.account_mapping import (
+    get_account_mapper,
+    TOTAL_ASSETS,
+    TOTAL_LIABILITIES_AND_EQUITY,
+    NET_SALES
+)
+from app.services.pdf_validation import validate_financial_data, validate_financial_data_batch
+from app.services.pdf_ingest import (
+    PDFIngestPipeline,
+    IngestValidationError,
+    IngestPermissionError,
+    summarize_alerts
+)
+from app.services.upload_spool import (
+    spool_upload,
+    spool_zip_members,
+    is_zip_upload,
+    SpooledUpload,
+    UploadRejectedError,
+    InvalidFileTypeError,
+    PDF_MAGIC,
+    ZIP_MAGIC
+)
+from app.services.chunked_upload import (
+    UploadSession,
+    UploadSessionNotFoundError,
+    UploadIncompleteError,
+    get_chunked_upload_store,
+    read_chunk_body
+)
+from app.core.config import settings
+from app.core.metrics import metrics
+from typing import Dict, Any, List, Optional, Tuple, Union, AsyncIterator
+import asyncio
+import json
 import logging
+import threading
+from functools import partial
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# SSE bağlantısının proxy'lerde kapanmaması için boşta yorum satırı aralığı
+JOB_EVENTS_HEARTBEAT_SECONDS = 15
+
 @router.post("/extract-financial-data")
 async def extract_financial_data_from_pdf(
     pdf: UploadFile = File(...),
@@ -19,7 +68,38 @@ async def extract_financial_data_from_pdf(
     """
     PDF'den mali verileri çıkar
     """
+    spooled = await _spool_pdf_upload(pdf)
     
+    try:
+        # Verileri önbellekten veya executor'da çıkar
+        extracted_data = await _run_extraction(current_user.id, spooled)
+        
+        if not extracted_data['success']:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"PDF işleme hatası: {extracted_data.get('error', 'Bilinmeyen hata')}"
+            )
+        
+        # Log the extraction
+        logger.info(f"PDF extraction successful for user {current_user.id}, file: {pdf.filename}")
+        
+        return extracted_data
+        
+    except ExtractionRejectedError as e:
+        raise _rejection_to_http(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"PDF extraction error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="PDF işleme sırasında beklenmeyen bir hata oluştu"
+        )
+    finally:
+        spooled.cleanup()
+
+async def _spool_pdf_upload(pdf: UploadFile) -> SpooledUpload:
+    """Tek PDF yüklemesini kontrol edip diske yaz"""
     # Dosya türü kontrolü
     if pdf.content_type != "application/pdf":
         raise HTTPException(
@@ -27,22 +107,437 @@ async def extract_financial_data_from_pdf(
             detail="Sadece PDF dosyaları kabul edilir"
         )
     
-    # Dosya boyutu kontrolü (50MB)
-    if pdf.size and pdf.size > 50 * 1024 * 1024:
+    # Dosya boyutu kontrolü (istemci boyut bildirdiyse erken)
+    if pdf.size and pdf.size > settings.PDF_MAX_UPLOAD_BYTES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Dosya boyutu 50MB'dan büyük olamaz"
+            detail=f"Dosya boyutu {settings.PDF_MAX_UPLOAD_BYTES // (1024 * 1024)}MB'dan büyük olamaz"
+        )
+    
+    # PDF'i parça parça diske yaz (imza ve boyut akış sırasında kontrol edilir)
+    try:
+        return await spool_upload(pdf, max_bytes=settings.PDF_MAX_UPLOAD_BYTES)
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/extract-financial-data/batch")
+async def extract_financial_data_batch(
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(require_analyst_access)
+) -> StreamingResponse:
+    """
+    Birden çok PDF'i (veya PDF içeren ZIP arşivlerini) eşzamanlı işle.
+    Her dosyanın sonucu biter bitmez NDJSON satırı olarak gönderilir.
+    """
+    items: List[Tuple[str, Union[SpooledUpload, str]]] = []
+    
+    try:
+        for upload in files:
+            if is_zip_upload(upload):
+                items.extend(await _spool_zip_upload(upload))
+            else:
+                try:
+                    spooled = await spool_upload(upload, max_bytes=settings.PDF_MAX_UPLOAD_BYTES)
+                    items.append((upload.filename, spooled))
+                except UploadRejectedError as e:
+                    items.append((upload.filename, str(e)))
+            
+            if len(items) > settings.PDF_BATCH_MAX_FILES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Tek seferde en fazla {settings.PDF_BATCH_MAX_FILES} dosya işlenebilir"
+                )
+    except BaseException:
+        _cleanup_batch_items(items)
+        raise
+    
+    logger.info(f"PDF batch extraction started for user {current_user.id}: {len(items)} files")
+    
+    return StreamingResponse(
+        _stream_batch_results(current_user.id, items),
+        media_type="application/x-ndjson"
+    )
+
+async def _spool_zip_upload(upload: UploadFile) -> List[Tuple[str, Union[SpooledUpload, str]]]:
+    """ZIP arşivini diske yaz ve içindeki PDF'leri ayrı dosyalara aç"""
+    try:
+        archive = await spool_upload(
+            upload,
+            max_bytes=settings.PDF_BATCH_MAX_ZIP_BYTES,
+            magic=ZIP_MAGIC,
+            suffix=".zip",
+            file_type="ZIP"
         )
+    except InvalidFileTypeError as e:
+        return [(upload.filename, str(e))]
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     try:
-        # PDF içeriğini oku
-        pdf_content = await pdf.read()
+        members = await asyncio.to_thread(
+            spool_zip_members,
+            archive.path,
+            settings.PDF_MAX_UPLOAD_BYTES,
+            settings.PDF_BATCH_MAX_FILES,
+            settings.PDF_BATCH_MAX_UNPACKED_BYTES
+        )
+    except InvalidFileTypeError as e:
+        return [(upload.filename, str(e))]
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        archive.cleanup()
+    
+    # Arşiv içindeki dosyaları arşiv adıyla birlikte raporla
+    return [(f"{upload.filename}/{name}", member) for name, member in members]
+
+async def _stream_batch_results(
+    user_id: int,
+    items: List[Tuple[str, Union[SpooledUpload, str]]]
+) -> AsyncIterator[str]:
+    """Dosyaları paralel işle, her sonucu tamamlanma sırasıyla yaz"""
+    # Kullanıcı kotası kadar dosya aynı anda executor'a gönderilir
+    semaphore = asyncio.Semaphore(settings.PDF_EXTRACTION_MAX_PER_USER)
+    
+    async def process(index: int, filename: str, item: Union[SpooledUpload, str]) -> Dict[str, Any]:
+        line = {'type': 'result', 'index': index, 'filename': filename}
+        
+        if isinstance(item, str):
+            return {**line, 'success': False, 'error': item}
+        
+        try:
+            async with semaphore:
+                extracted_data = await _run_extraction_with_retry(user_id, item)
+        except ExtractionRejectedError as e:
+            return {**line, 'success': False, 'error': str(e)}
+        except Exception as e:
+            logger.error(f"PDF batch extraction error for {filename}: {str(e)}")
+            return {**line, 'success': False, 'error': 'PDF işleme sırasında beklenmeyen bir hata oluştu'}
+        finally:
+            item.cleanup()
+        
+        if not extracted_data['success']:
+            return {**line, 'success': False, 'error': extracted_data.get('error', 'Bilinmeyen hata')}
+        
+        return {**line, 'success': True, 'data': extracted_data}
+    
+    tasks = [
+        asyncio.ensure_future(process(index, filename, item))
+        for index, (filename, item) in enumerate(items)
+    ]
+    succeeded = 0
+    
+    try:
+        yield json.dumps({'type': 'batch', 'total': len(items)}) + "\n"
         
-        # PDF extractor'ı başlat
-        extractor = TurkishTaxPDFExtractor()
+        for next_done in asyncio.as_completed(tasks):
+            line = await next_done
+            succeeded += 1 if line['success'] else 0
+            yield json.dumps(line, ensure_ascii=False) + "\n"
         
-        # Verileri çıkar
-        extracted_data = extractor.extract_financial_data(pdf_content)
+        yield json.dumps({
+            'type': 'summary',
+            'total': len(items),
+            'succeeded': succeeded,
+            'failed': len(items) - succeeded
+        }) + "\n"
+    finally:
+        # İstemci bağlantıyı kopardıysa kalan işleri iptal et
+        for task in tasks:
+            task.cancel()
+        _cleanup_batch_items(items)
+
+def _cleanup_batch_items(items: List[Tuple[str, Union[SpooledUpload, str]]]):
+    for _, item in items:
+        if isinstance(item, SpooledUpload):
+            item.cleanup()
+
+async def _run_extraction_with_retry(user_id: int, spooled: SpooledUpload, attempts: int = 3) -> Dict[str, Any]:
+    """Kapasite reddinde Retry-After kadar bekleyip tekrar dene"""
+    for attempt in range(attempts):
+        try:
+            return await _run_extraction(user_id, spooled)
+        except ExtractionRejectedError as e:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(e.retry_after)
+
+async def _run_extraction(user_id: int, spooled: SpooledUpload) -> Dict[str, Any]:
+    """Önbelleğe bak, yoksa çıkarmayı executor'da çalıştır"""
+    extractor = TurkishTaxPDFExtractor(page_budget=settings.PDF_PAGE_BUDGET)
+    cache = get_pdf_cache()
+    cache_key = None
+    
+    if cache is not None:
+        cache_key = cache.make_key(spooled.sha256, extractor.cache_version)
+        cached = await run_in_threadpool(cache.get, cache_key)
+        if cached is not None:
+            cached.setdefault('metadata', {})['cache_hit'] = True
+            return cached
+    
+    # Sandbox açıksa çıkarma sınırlandırılmış ayrı süreçte çalışır
+    sandbox = get_pdf_sandbox()
+    if sandbox is not None:
+        # İş iptal edilirse executor event'i set eder ve alt süreç öldürülür
+        cancel_event = threading.Event()
+        extracted_data = await get_pdf_executor().submit(
+            user_id, partial(sandbox.extract, cancel_event=cancel_event),
+            spooled.path, extractor.page_budget, cancel_event=cancel_event
+        )
+    else:
+        extracted_data = await get_pdf_executor().submit(
+            user_id, extractor.extract_financial_data, spooled.path
+        )
+    
+    if cache is not None and extracted_data['success']:
+        await run_in_threadpool(cache.put, cache_key, extracted_data)
+    
+    return extracted_data
+
+def _rejection_to_http(error: ExtractionRejectedError) -> HTTPException:
+    """Kapasite reddini 503/429 yanıtına çevir"""
+    if isinstance(error, ExtractionQueueFullError):
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    else:
+        status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    
+    return HTTPException(
+        status_code=status_code,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_extraction_job(
+    pdf: UploadFile = File(...),
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    PDF çıkarma işini arka planda başlat ve iş kimliğini hemen döndür
+    """
+    spooled = await _spool_pdf_upload(pdf)
+    
+    # Spool dosyasının sahipliği işe geçer, iş bitince silinir
+    try:
+        job = get_pdf_job_store().submit(current_user.id, spooled, _run_extraction_with_retry)
+    except ExtractionRejectedError as e:
+        spooled.cleanup()
+        raise _rejection_to_http(e)
+    
+    logger.info(f"PDF extraction job {job.id} queued for user {current_user.id}, file: {pdf.filename}")
+    
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}")
+def get_extraction_job(
+    job_id: str,
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    PDF çıkarma işinin durumunu döndür
+    """
+    return _job_response(_get_job_or_404(job_id, current_user))
+
+@router.get("/jobs/{job_id}/events")
+async def stream_extraction_job_events(
+    job_id: str,
+    current_user: User = Depends(require_analyst_access)
+) -> StreamingResponse:
+    """
+    İş durum değişikliklerini Server-Sent Events olarak yayınla;
+    iş bitince akış kapanır
+    """
+    job = _get_job_or_404(job_id, current_user)
+    
+    return StreamingResponse(
+        _stream_job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/jobs/{job_id}/result")
+def get_extraction_job_result(
+    job_id: str,
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    Tamamlanan işin çıkarılmış verilerini döndür
+    """
+    job = _get_job_or_404(job_id, current_user)
+    
+    if job.status == JobStatus.SUCCEEDED:
+        return job.result
+    
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF işleme hatası: {job.error}"
+        )
+    
+    if job.status == JobStatus.CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="İş iptal edildi"
+        )
+    
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="İş henüz tamamlanmadı"
+    )
+
+@router.delete("/jobs/{job_id}")
+def cancel_extraction_job(
+    job_id: str,
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    Bekleyen veya çalışan işi iptal et
+    """
+    job = _get_job_or_404(job_id, current_user)
+    
+    if not get_pdf_job_store().cancel(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Tamamlanmış iş iptal edilemez"
+        )
+    
+    return _job_response(job)
+
+def _get_job_or_404(job_id: str, current_user: User) -> PDFExtractionJob:
+    job = get_pdf_job_store().get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="İş bulunamadı"
+        )
+    return job
+
+def _job_response(job: PDFExtractionJob) -> Dict[str, Any]:
+    base_url = f"{settings.API_V1_STR}/pdf/jobs/{job.id}"
+    return {
+        **job.to_dict(),
+        'statusUrl': base_url,
+        'eventsUrl': f"{base_url}/events",
+        'resultUrl': f"{base_url}/result"
+    }
+
+async def _stream_job_events(job: PDFExtractionJob) -> AsyncIterator[str]:
+    """Her durum değişikliğinde bir 'status' olayı gönder"""
+    version = job.version
+    yield f"event: status\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+    
+    while not job.finished:
+        if not await job.wait_for_change(version, JOB_EVENTS_HEARTBEAT_SECONDS):
+            yield ": keep-alive\n\n"
+            continue
+        version = job.version
+        yield f"event: status\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+
+@router.post("/uploads", status_code=status.HTTP_201_CREATED)
+async def create_pdf_upload(
+    filename: str,
+    size: int,
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    Parçalı (kaldığı yerden devam edebilen) PDF yüklemesi başlat
+    """
+    try:
+        session = await run_in_threadpool(
+            get_chunked_upload_store().create,
+            current_user.id,
+            "pdf",
+            filename,
+            size,
+            settings.PDF_MAX_UPLOAD_BYTES
+        )
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return session.to_dict()
+
+@router.put("/uploads/{upload_id}")
+async def upload_pdf_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None),
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    İstek gövdesini offset'ten itibaren yaz; parçalar sırasız ve tekrar
+    gönderilebilir, X-Chunk-SHA256 uyuşmazsa parça reddedilir
+    """
+    session = _get_upload_or_404(upload_id, current_user)
+    store = get_chunked_upload_store()
+    
+    try:
+        body = await read_chunk_body(request.stream(), store.max_chunk_bytes)
+        await run_in_threadpool(store.write_chunk, session, offset, body, x_chunk_sha256)
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return session.to_dict()
+
+@router.get("/uploads/{upload_id}")
+def get_pdf_upload(
+    upload_id: str,
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    Yükleme durumunu döndür; 'committed' devam edilecek offset'tir
+    """
+    return _get_upload_or_404(upload_id, current_user).to_dict()
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def abort_pdf_upload(
+    upload_id: str,
+    current_user: User = Depends(require_analyst_access)
+) -> Response:
+    """
+    Yüklemeyi iptal et ve alınan parçaları sil
+    """
+    get_chunked_upload_store().discard(_get_upload_or_404(upload_id, current_user))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/uploads/{upload_id}/extract")
+async def extract_financial_data_from_upload(
+    upload_id: str,
+    sha256: Optional[str] = None,
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    Tamamlanan parçalı yüklemeden mali verileri çıkar; sha256 verilirse
+    tüm dosyanın özetiyle karşılaştırılır
+    """
+    session = _get_upload_or_404(upload_id, current_user)
+    
+    try:
+        spooled = await run_in_threadpool(
+            get_chunked_upload_store().finalize, session, sha256, PDF_MAGIC
+        )
+    except UploadIncompleteError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except UploadRejectedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        extracted_data = await _run_extraction(current_user.id, spooled)
         
         if not extracted_data['success']:
             raise HTTPException(
@@ -50,11 +545,12 @@ async def extract_financial_data_from_pdf(
                 detail=f"PDF işleme hatası: {extracted_data.get('error', 'Bilinmeyen hata')}"
             )
         
-        # Log the extraction
-        logger.info(f"PDF extraction successful for user {current_user.id}, file: {pdf.filename}")
+        logger.info(f"PDF extraction successful for user {current_user.id}, file: {spooled.filename}")
         
         return extracted_data
         
+    except ExtractionRejectedError as e:
+        raise _rejection_to_http(e)
     except HTTPException:
         raise
     except Exception as e:
@@ -63,6 +559,33 @@ async def extract_financial_data_from_pdf(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="PDF işleme sırasında beklenmeyen bir hata oluştu"
         )
+    finally:
+        spooled.cleanup()
+
+def _get_upload_or_404(upload_id: str, current_user: User) -> UploadSession:
+    try:
+        return get_chunked_upload_store().get(upload_id, current_user.id, kind="pdf")
+    except UploadSessionNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Yükleme bulunamadı"
+        )
+
+@router.get("/metrics")
+def get_extraction_metrics(
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    PDF işleme kuyruğu, önbellek ve gecikme metrikleri
+    """
+    cache = get_pdf_cache()
+    
+    return {
+        'executor': get_pdf_executor().stats(),
+        'cache': cache.stats() if cache is not None else None,
+        'jobs': get_pdf_job_store().stats(),
+        'metrics': metrics.snapshot("pdf_")
+    }
 
 @router.get("/sample-data")
 def get_sample_extracted_data(
@@ -82,74 +605,24 @@ def validate_extracted_data(
     """
     Çıkarılan verileri doğrula ve tutarlılık kontrolleri yap
     """
+    return validate_financial_data(data)
+
+@router.post("/validate-extracted-data/batch")
+def validate_extracted_data_batch(
+    documents: List[Dict[str, Any]],
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    Çok sayıda çıkarılmış belgeyi tek istekte doğrula; aynı VKN için
+    birbirinden sapan toplamlar anomali olarak raporlanır
+    """
+    if len(documents) > settings.PDF_VALIDATION_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tek seferde en fazla {settings.PDF_VALIDATION_BATCH_MAX_DOCUMENTS} belge doğrulanabilir"
+        )
     
-    validation_results = {
-        'isValid': True,
-        'warnings': [],
-        'errors': [],
-        'suggestions': []
-    }
-    
-    try:
-        company_info = data.get('companyInfo', {})
-        tables = data.get('tables', {})
-        
-        # VKN kontrolü
-        tax_id = company_info.get('taxId', '')
-        if not tax_id or len(tax_id) != 10 or not tax_id.isdigit():
-            validation_results['errors'].append('Geçerli bir VKN bulunamadı')
-            validation_results['isValid'] = False
-        
-        # Bilanço dengesi kontrolü
-        aktif = tables.get('aktif', {})
-        pasif = tables.get('pasif', {})
-        
-        total_aktif = aktif.get('Toplam Aktif', 0)
-        total_pasif = pasif.get('Toplam Pasif', 0)
-        
-        if total_aktif > 0 and total_pasif > 0:
-            balance_diff = abs(total_aktif - total_pasif)
-            balance_ratio = balance_diff / max(total_aktif, total_pasif)
-            
-            if balance_ratio > 0.01:  # %1'den fazla fark
-                validation_results['warnings'].append(
-                    f'Bilanço dengesi uyumsuz: Aktif {total_aktif:,.0f} TL, Pasif {total_pasif:,.0f} TL'
-                )
-        
-        # Gelir tablosu tutarlılık kontrolü
-        gelir = tables.get('gelirTablosu', {})
-        net_satis = gelir.get('Net Satışlar', 0)
-        brut_satis = gelir.get('Brüt Satışlar', 0)
-        
-        if brut_satis > 0 and net_satis > brut_satis:
-            validation_results['errors'].append('Net satışlar brüt satışlardan büyük olamaz')
-            validation_results['isValid'] = False
-        
-        # Kar tutarlılık kontrolü
-        faaliyet_kari = gelir.get('Faaliyet Karı', 0)
-        net_kar = gelir.get('Net Dönem Karı', 0)
-        ticari_kar = company_info.get('commercialProfit', 0)
-        
-        if faaliyet_kari > 0 and net_kar > faaliyet_kari:
-            validation_results['warnings'].append('Net kar faaliyet karından büyük görünüyor')
-        
-        # Öneriler
-        if total_aktif > 0:
-            validation_results['suggestions'].append(
-                f'Toplam aktif: {total_aktif:,.0f} TL - Firma büyüklüğü orta ölçekli görünüyor'
-            )
-        
-        if net_satis > 0 and net_kar > 0:
-            kar_marji = (net_kar / net_satis) * 100
-            validation_results['suggestions'].append(
-                f'Net kar marjı: %{kar_marji:.2f} - {"İyi" if kar_marji > 5 else "Düşük"} karlılık'
-            )
-        
-    except Exception as e:
-        validation_results['errors'].append(f'Doğrulama hatası: {str(e)}')
-        validation_results['isValid'] = False
-    
-    return validation_results
+    return validate_financial_data_batch(documents)
 
 @router.post("/create-company-from-pdf")
 def create_company_from_pdf_data(
@@ -165,20 +638,20 @@ def create_company_from_pdf_data(
         from app.schemas.company import CompanyCreate
         
         company_info = data.get('companyInfo', {})
-        tables = data.get('tables', {})
+        accounts = get_account_mapper().map_tables(data.get('tables', {}))
         
         # Firma bilgilerini hazırla
-        aktif = tables.get('aktif', {})
-        pasif = tables.get('pasif', {})
-        gelir = tables.get('gelirTablosu', {})
+        aktif = accounts['aktif']
+        pasif = accounts['pasif']
+        gelir = accounts['gelirTablosu']
         
         company_data = CompanyCreate(
             name=f"Firma - {company_info.get('taxId', 'Bilinmeyen')}",
             tax_id=company_info.get('taxId', ''),
             sector="Bilinmeyen",  # PDF'den çıkarılamadı
-            revenue=gelir.get('Net Satışlar', 0),
-            assets=aktif.get('Toplam Aktif', 0),
-            liabilities=pasif.get('Toplam Pasif', 0) - pasif.get('Özkaynaklar', 0),
+            revenue=gelir.get(NET_SALES, 0),
+            assets=aktif.get(TOTAL_ASSETS, 0),
+            liabilities=pasif.get(TOTAL_LIABILITIES_AND_EQUITY, 0) - pasif.get('5', 0),
             credit_limit=0  # Hesaplanacak
         )
         
@@ -197,4 +670,74 @@ def create_company_from_pdf_data(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Firma oluşturma hatası: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/ingest")
+async def ingest_pdf(
+    pdf: UploadFile = File(...),
+    period: Optional[str] = Form(None),
+    sector: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_analyst_access)
+) -> Dict[str, Any]:
+    """
+    PDF'den puanlanmış firmaya tek istekte: çıkar, doğrula, firma ve mali
+    metrikleri kaydet/güncelle, risk puanla ve uyarıları üret (tek işlem)
+    """
+    from app.schemas.company import Company as CompanySchema
+    
+    spooled = await _spool_pdf_upload(pdf)
+    
+    try:
+        extracted_data = await _run_extraction(current_user.id, spooled)
+    except ExtractionRejectedError as e:
+        raise _rejection_to_http(e)
+    finally:
+        spooled.cleanup()
+    
+    if not extracted_data['success']:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF işleme hatası: {extracted_data.get('error', 'Bilinmeyen hata')}"
+        )
+    
+    # Veritabanı işlemi senkron; event loop'u bloklamamak için thread havuzunda
+    pipeline = PDFIngestPipeline(db, current_user)
+    try:
+        result = await run_in_threadpool(pipeline.ingest, extracted_data, period, sector)
+    except IngestValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={'message': str(e), 'validation': e.validation}
+        )
+    except IngestPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"PDF ingest error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Firma oluşturma hatası: {str(e)}"
+        )
+    
+    logger.info(f"PDF ingest successful for user {current_user.id}, file: {pdf.filename}")
+    
+    analysis = result['analysis']
+    return {
+        'success': True,
+        'created': result['created'],
+        'company': CompanySchema.model_validate(result['company']),
+        'period': result['financialMetric'].period,
+        'analysis': {
+            'id': analysis.id,
+            'creditScore': analysis.credit_score,
+            'pdScore': analysis.pd_score,
+            'recommendedCreditLimit': analysis.recommended_credit_limit,
+            'riskFactors': analysis.risk_factors
+        },
+        'alerts': summarize_alerts(result['alerts']),
+        'validation': result['validation'],
+        'metadata': extracted_data.get('metadata', {})
+    }
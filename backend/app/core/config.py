@@ -2,6 +2,7 @@ from pydantic_settings import BaseSettings
 from typing import List
 import os
 import re
+import tempfile
 
 class Settings(BaseSettings):
     # Project Info
@@ -39,7 +40,51 @@ class Settings(BaseSettings):
     
     # Application Configuration
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
-    
+
+    # PDF Extraction Configuration
+    PDF_MAX_UPLOAD_BYTES: int = int(os.getenv("PDF_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+    PDF_PAGE_BUDGET: int = int(os.getenv("PDF_PAGE_BUDGET", "50"))
+    PDF_EXTRACTION_WORKERS: int = int(os.getenv("PDF_EXTRACTION_WORKERS", "2"))
+    PDF_EXTRACTION_QUEUE_SIZE: int = int(os.getenv("PDF_EXTRACTION_QUEUE_SIZE", "16"))
+    PDF_EXTRACTION_MAX_PER_USER: int = int(os.getenv("PDF_EXTRACTION_MAX_PER_USER", "4"))
+    PDF_BATCH_MAX_FILES: int = int(os.getenv("PDF_BATCH_MAX_FILES", "500"))
+    PDF_BATCH_MAX_ZIP_BYTES: int = int(os.getenv("PDF_BATCH_MAX_ZIP_BYTES", str(500 * 1024 * 1024)))
+    PDF_BATCH_MAX_UNPACKED_BYTES: int = int(os.getenv("PDF_BATCH_MAX_UNPACKED_BYTES", str(2 * 1024 * 1024 * 1024)))
+    PDF_VALIDATION_BATCH_MAX_DOCUMENTS: int = int(os.getenv("PDF_VALIDATION_BATCH_MAX_DOCUMENTS", "10000"))
+    PDF_CACHE_ENABLED: bool = os.getenv("PDF_CACHE_ENABLED", "True").lower() == "true"
+    PDF_CACHE_DIR: str = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pdf_extraction_cache"))
+    PDF_CACHE_MAX_BYTES: int = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    PDF_TEXT_BACKEND: str = os.getenv("PDF_TEXT_BACKEND", "")
+    PDF_BACKEND_PROFILE: str = os.getenv("PDF_BACKEND_PROFILE", "")
+    PDF_TIMING_DEBUG: bool = os.getenv("PDF_TIMING_DEBUG", "False").lower() == "true"
+    PDF_REJECT_UNKNOWN_DOCUMENTS: bool = os.getenv("PDF_REJECT_UNKNOWN_DOCUMENTS", "True").lower() == "true"
+    PDF_SANDBOX_ENABLED: bool = os.getenv("PDF_SANDBOX_ENABLED", "True").lower() == "true"
+    PDF_SANDBOX_TIMEOUT_SECONDS: float = float(os.getenv("PDF_SANDBOX_TIMEOUT_SECONDS", "60"))
+    PDF_SANDBOX_CPU_SECONDS: int = int(os.getenv("PDF_SANDBOX_CPU_SECONDS", "30"))
+    PDF_SANDBOX_MEMORY_MB: int = int(os.getenv("PDF_SANDBOX_MEMORY_MB", "1024"))
+    PDF_JOB_MAX_CONCURRENT: int = int(os.getenv("PDF_JOB_MAX_CONCURRENT", "2"))
+    PDF_JOB_MAX_PENDING: int = int(os.getenv("PDF_JOB_MAX_PENDING", "100"))
+    PDF_JOB_MAX_PER_USER: int = int(os.getenv("PDF_JOB_MAX_PER_USER", "20"))
+    PDF_JOB_TTL_SECONDS: int = int(os.getenv("PDF_JOB_TTL_SECONDS", "3600"))
+
+    # e-Defter Import Configuration
+    EDEFTER_IMPORT_WORKERS: int = int(os.getenv("EDEFTER_IMPORT_WORKERS", "4"))
+    EDEFTER_MAX_UPLOAD_BYTES: int = int(os.getenv("EDEFTER_MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+    EDEFTER_BULK_MAX_FILES: int = int(os.getenv("EDEFTER_BULK_MAX_FILES", "60"))
+    EDEFTER_BULK_MAX_ZIP_BYTES: int = int(os.getenv("EDEFTER_BULK_MAX_ZIP_BYTES", str(1024 * 1024 * 1024)))
+    EDEFTER_BULK_MAX_UNPACKED_BYTES: int = int(os.getenv("EDEFTER_BULK_MAX_UNPACKED_BYTES", str(4 * 1024 * 1024 * 1024)))
+    EDEFTER_TAXONOMY_PATH: str = os.getenv("EDEFTER_TAXONOMY_PATH", "")
+
+    # Resumable Chunked Upload Configuration
+    UPLOAD_SESSION_DIR: str = os.getenv("UPLOAD_SESSION_DIR", os.path.join(tempfile.gettempdir(), "upload_sessions"))
+    UPLOAD_CHUNK_MAX_BYTES: int = int(os.getenv("UPLOAD_CHUNK_MAX_BYTES", str(16 * 1024 * 1024)))
+    UPLOAD_SESSION_TTL_SECONDS: int = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", "86400"))
+    UPLOAD_SESSION_MAX_PER_USER: int = int(os.getenv("UPLOAD_SESSION_MAX_PER_USER", "8"))
+
+    # Blob Store Configuration
+    BLOB_STORE_DIR: str = os.getenv("BLOB_STORE_DIR", "./data/blobs")
+    BLOB_STORE_CODEC: str = os.getenv("BLOB_STORE_CODEC", "")
+
     # CORS Configuration
     @property
     def CORS_ORIGINS(self) -> List[str]:
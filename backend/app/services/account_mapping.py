@@ -0,0 +1,243 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Tekdüzen hesap planında kodu olmayan tablo toplamları
+TOTAL_ASSETS = 'AKTIF_TOPLAMI'
+TOTAL_LIABILITIES_AND_EQUITY = 'PASIF_TOPLAMI'
+NET_SALES = 'NET_SATISLAR'
+GROSS_PROFIT = 'BRUT_SATIS_KARI'
+OPERATING_PROFIT = 'FAALIYET_KARI'
+ORDINARY_PROFIT = 'OLAGAN_KAR'
+
+# Bölüm -> kalem listesi: (kanonik kod veya {üst grup: kod}, kanonik ad, eş anlamlılar).
+# Aynı ifade üst gruba göre farklı hesaba düşebilir (ör. Ticari Alacaklar:
+# dönen varlıklarda 12, duran varlıklarda 22); ilk kod varsayılandır.
+CodeSpec = Union[str, Dict[str, str]]
+
+ACCOUNT_SYNONYMS: Dict[str, List[Tuple[CodeSpec, str, Tuple[str, ...]]]] = {
+    'aktif': [
+        ('1', 'Dönen Varlıklar', ('Dönen Varlıklar',)),
+        ('10', 'Hazır Değerler', ('Hazır Değerler', 'Nakit ve Nakit Benzerleri', 'Kasa ve Bankalar')),
+        ('11', 'Menkul Kıymetler', ('Menkul Kıymetler',)),
+        ({'1': '12', '2': '22'}, 'Ticari Alacaklar', ('Ticari Alacaklar',)),
+        ({'1': '13', '2': '23'}, 'Diğer Alacaklar', ('Diğer Alacaklar',)),
+        ('15', 'Stoklar', ('Stoklar',)),
+        ('17', 'Yıllara Yaygın İnşaat ve Onarım Maliyetleri', ('Yıllara Yaygın İnşaat ve Onarım Maliyetleri',)),
+        ('18', 'Gelecek Aylara Ait Giderler ve Gelir Tahakkukları', ('Gelecek Aylara Ait Giderler',)),
+        ('19', 'Diğer Dönen Varlıklar', ('Diğer Dönen Varlıklar',)),
+        ('2', 'Duran Varlıklar', ('Duran Varlıklar',)),
+        ('24', 'Mali Duran Varlıklar', ('Mali Duran Varlıklar', 'Finansal Duran Varlıklar')),
+        ('25', 'Maddi Duran Varlıklar', ('Maddi Duran Varlıklar',)),
+        ('26', 'Maddi Olmayan Duran Varlıklar', ('Maddi Olmayan Duran Varlıklar',)),
+        ('27', 'Özel Tükenmeye Tabi Varlıklar', ('Özel Tükenmeye Tabi Varlıklar',)),
+        ('28', 'Gelecek Yıllara Ait Giderler ve Gelir Tahakkukları', ('Gelecek Yıllara Ait Giderler',)),
+        ('29', 'Diğer Duran Varlıklar', ('Diğer Duran Varlıklar',)),
+        (TOTAL_ASSETS, 'Aktif Toplamı', (
+            'Toplam Aktif', 'Aktif Toplamı', 'Aktifler Toplamı', 'Toplam Varlıklar', 'Varlıklar Toplamı'
+        )),
+    ],
+    'pasif': [
+        ('3', 'Kısa Vadeli Yabancı Kaynaklar', (
+            'Kısa Vadeli Yabancı Kaynaklar', 'Kısa Vadeli Yükümlülükler', 'Kısa Vadeli Borçlar'
+        )),
+        ({'3': '30', '4': '40'}, 'Mali Borçlar', ('Mali Borçlar', 'Finansal Borçlar')),
+        ({'3': '32', '4': '42'}, 'Ticari Borçlar', ('Ticari Borçlar',)),
+        ({'3': '33', '4': '43'}, 'Diğer Borçlar', ('Diğer Borçlar',)),
+        ({'3': '34', '4': '44'}, 'Alınan Avanslar', ('Alınan Avanslar',)),
+        ('36', 'Ödenecek Vergi ve Diğer Yükümlülükler', ('Ödenecek Vergi ve Diğer Yükümlülükler',)),
+        ({'3': '37', '4': '47'}, 'Borç ve Gider Karşılıkları', ('Borç ve Gider Karşılıkları',)),
+        ('4', 'Uzun Vadeli Yabancı Kaynaklar', (
+            'Uzun Vadeli Yabancı Kaynaklar', 'Uzun Vadeli Yükümlülükler', 'Uzun Vadeli Borçlar'
+        )),
+        ('5', 'Özkaynaklar', ('Özkaynaklar', 'Öz Kaynaklar', 'Özsermaye')),
+        ('50', 'Ödenmiş Sermaye', ('Ödenmiş Sermaye',)),
+        ('52', 'Sermaye Yedekleri', ('Sermaye Yedekleri',)),
+        ('54', 'Kar Yedekleri', ('Kar Yedekleri',)),
+        ('57', 'Geçmiş Yıllar Karları', ('Geçmiş Yıllar Karları', 'Geçmiş Yıl Karları')),
+        ('58', 'Geçmiş Yıllar Zararları', ('Geçmiş Yıllar Zararları', 'Geçmiş Yıl Zararları')),
+        ('590', 'Dönem Net Karı', ('Dönem Net Karı', 'Net Dönem Karı')),
+        ('591', 'Dönem Net Zararı', ('Dönem Net Zararı', 'Net Dönem Zararı')),
+        (TOTAL_LIABILITIES_AND_EQUITY, 'Pasif Toplamı', (
+            'Toplam Pasif', 'Pasif Toplamı', 'Pasifler Toplamı', 'Toplam Kaynaklar', 'Kaynaklar Toplamı'
+        )),
+    ],
+    'gelirTablosu': [
+        ('60', 'Brüt Satışlar', ('Brüt Satışlar',)),
+        ('61', 'Satış İndirimleri', ('Satış İndirimleri',)),
+        (NET_SALES, 'Net Satışlar', ('Net Satışlar', 'Net Satış Hasılatı', 'Hasılat')),
+        ('62', 'Satışların Maliyeti', ('Satışların Maliyeti', 'Satılan Malın Maliyeti')),
+        (GROSS_PROFIT, 'Brüt Satış Karı', ('Brüt Satış Karı', 'Brüt Kar')),
+        ('63', 'Faaliyet Giderleri', ('Faaliyet Giderleri',)),
+        (OPERATING_PROFIT, 'Faaliyet Karı', ('Faaliyet Karı', 'Esas Faaliyet Karı')),
+        ('64', 'Diğer Faaliyetlerden Olağan Gelir ve Karlar', ('Diğer Faaliyetlerden Olağan Gelir',)),
+        ('65', 'Diğer Faaliyetlerden Olağan Gider ve Zararlar', ('Diğer Faaliyetlerden Olağan Gider',)),
+        ('66', 'Finansman Giderleri', ('Finansman Giderleri',)),
+        (ORDINARY_PROFIT, 'Olağan Kar', ('Olağan Kar',)),
+        ('67', 'Olağandışı Gelir ve Karlar', ('Olağandışı Gelir',)),
+        ('68', 'Olağandışı Gider ve Zararlar', ('Olağandışı Gider',)),
+        ('690', 'Dönem Karı veya Zararı', ('Dönem Karı', 'Vergi Öncesi Kar')),
+        ('691', 'Dönem Karı Vergi ve Diğer Yasal Yükümlülük Karşılıkları', (
+            'Dönem Karı Vergi ve Diğer Yasal Yükümlülük Karşılıkları', 'Vergi Gideri'
+        )),
+        ('692', 'Dönem Net Karı veya Zararı', ('Dönem Net Karı', 'Net Dönem Karı')),
+    ],
+}
+
+# Bölümlerdeki üst grup kodları (satır sırası boyunca izlenir)
+GROUP_CODES = {'1', '2', '3', '4', '5'}
+
+_TURKISH_FOLD = str.maketrans({
+    'I': 'i', 'İ': 'i', 'ı': 'i', 'Ş': 's', 'ş': 's', 'Ğ': 'g', 'ğ': 'g',
+    'Ü': 'u', 'ü': 'u', 'Ö': 'o', 'ö': 'o', 'Ç': 'c', 'ç': 'c',
+    'Â': 'a', 'â': 'a', 'Î': 'i', 'î': 'i', 'Û': 'u', 'û': 'u',
+})
+_NON_WORD = re.compile(r'[\W_]+')
+
+def fold_turkish(text: str) -> str:
+    """Türkçe büyük/küçük harf ve aksan farklarını yok say: 'TOPLAM AKTİF' -> 'toplam aktif'"""
+    # Türkçe I/İ kuralı lower()'dan önce uygulanmalı
+    return _NON_WORD.sub(' ', text.translate(_TURKISH_FOLD).lower()).strip()
+
+class AhoCorasick:
+    """
+    Çok kalıplı metin arama otomatı.
+
+    Tüm kalıplar tek bir trie'de toplanır; hata bağlantıları sayesinde metin,
+    kalıp sayısından bağımsız olarak tek geçişte taranır.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """(başlangıç, bitiş, kalıp indeksi) üçlülerini üret"""
+        node = 0
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                yield position + 1 - len(patterns[index]), position + 1, index
+
+class AccountEntry(NamedTuple):
+    section: str
+    codes: Dict[str, str]
+    default_code: str
+
+class AccountMapper:
+    """
+    Tablo satır etiketlerini Tekdüzen hesap planı kodlarına eşler.
+
+    Eş anlamlılar Türkçe katlanmış biçimde tek bir Aho-Corasick otomatına
+    derlenir; her satır bir kez taranır ve bölümdeki en uzun tam kelime
+    eşleşmesi seçilir. Satırlar sırayla işlenirken üst grup (ör. Duran
+    Varlıklar) izlenir, böylece aynı ad doğru alt hesaba düşer.
+    """
+
+    def __init__(self, synonyms: Dict[str, List[Tuple[CodeSpec, str, Tuple[str, ...]]]] = ACCOUNT_SYNONYMS):
+        self.labels: Dict[Tuple[str, str], str] = {}
+        entries: Dict[str, List[AccountEntry]] = {}
+
+        for section, items in synonyms.items():
+            for code_spec, label, phrases in items:
+                codes = code_spec if isinstance(code_spec, dict) else {'': code_spec}
+                entry = AccountEntry(section, codes, next(iter(codes.values())))
+                for code in codes.values():
+                    self.labels[(section, code)] = label
+                for phrase in phrases:
+                    # Kelime sınırı için kalıplar boşlukla çevrelenir
+                    entries.setdefault(f" {fold_turkish(phrase)} ", []).append(entry)
+
+        self._phrases = list(entries)
+        self._entries = [entries[phrase] for phrase in self._phrases]
+        self._automaton = AhoCorasick(self._phrases)
+
+    def map_label(self, section: str, label: str, group: Optional[str] = None) -> Optional[str]:
+        """Tek bir etiketi kanonik koda çevir; eşleşme yoksa None"""
+        best_length = 0
+        best_entry: Optional[AccountEntry] = None
+
+        for start, end, index in self._automaton.iter_matches(f" {fold_turkish(label)} "):
+            if end - start <= best_length:
+                continue
+            for entry in self._entries[index]:
+                if entry.section == section:
+                    best_length, best_entry = end - start, entry
+                    break
+
+        if best_entry is None:
+            return None
+        return best_entry.codes.get(group, best_entry.default_code)
+
+    def map_table(self, section: str, rows: Dict[str, float]) -> Tuple[Dict[str, float], List[str]]:
+        """Satırları sırayla eşle; (kod -> tutar, eşleşmeyen etiketler) döndür"""
+        accounts: Dict[str, float] = {}
+        unmapped: List[str] = []
+        group: Optional[str] = None
+
+        for label, value in rows.items():
+            code = self.map_label(section, label, group)
+            if code is None:
+                unmapped.append(label)
+                continue
+            if code in GROUP_CODES:
+                group = code
+            # Aynı hesaba düşen sonraki satırlar (alt kırılımlar) ana satırı ezmez
+            accounts.setdefault(code, value)
+
+        return accounts, unmapped
+
+    def map_tables(self, tables: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        """Eş anlamlı sözlüğü olan tüm tabloları kanonik kodlara çevir"""
+        return {
+            section: self.map_table(section, tables.get(section) or {})[0]
+            for section in ACCOUNT_SYNONYMS
+        }
+
+    def label_for(self, section: str, code: str) -> Optional[str]:
+        return self.labels.get((section, code))
+
+_mapper: Optional[AccountMapper] = None
+
+def get_account_mapper() -> AccountMapper:
+    """Süreç genelinde paylaşılan eşleyici (otomat bir kez derlenir)"""
+    global _mapper
+    if _mapper is None:
+        _mapper = AccountMapper()
+    return _mapper
@@ -11,8 +11,10 @@ class AlertService:
     Service for generating and managing risk alerts
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocommit: bool = True):
+        # autocommit=False: uyarılar yalnızca flush edilir, çağıran işlem commit eder
         self.db = db
+        self.autocommit = autocommit
     
     def check_and_generate_alerts(self, company: Company) -> List[RiskAlert]:
         """
@@ -68,10 +70,7 @@ class AlertService:
             current_value=f"{company.pd_score:.1f}%"
         )
         
-        alert = RiskAlert(**alert_data.dict())
-        self.db.add(alert)
-        self.db.commit()
-        self.db.refresh(alert)
+        alert = self._save(RiskAlert(**alert_data.dict()))
         
         return alert
     
@@ -95,10 +94,7 @@ class AlertService:
                 current_value=f"{usage_percentage:.1f}%"
             )
             
-            alert = RiskAlert(**alert_data.dict())
-            self.db.add(alert)
-            self.db.commit()
-            self.db.refresh(alert)
+            alert = self._save(RiskAlert(**alert_data.dict()))
             
             return alert
         
@@ -118,10 +114,7 @@ class AlertService:
                 current_value=company.financial_health.value
             )
             
-            alert = RiskAlert(**alert_data.dict())
-            self.db.add(alert)
-            self.db.commit()
-            self.db.refresh(alert)
+            alert = self._save(RiskAlert(**alert_data.dict()))
             
             return alert
         
@@ -138,13 +131,19 @@ class AlertService:
             current_value="monitoring"
         )
         
-        alert = RiskAlert(**alert_data.dict())
-        self.db.add(alert)
-        self.db.commit()
-        self.db.refresh(alert)
+        alert = self._save(RiskAlert(**alert_data.dict()))
         
         return alert
     
+    def _save(self, alert: RiskAlert) -> RiskAlert:
+        self.db.add(alert)
+        if self.autocommit:
+            self.db.commit()
+            self.db.refresh(alert)
+        else:
+            self.db.flush()
+        return alert
+    
     def mark_alert_as_read(self, alert_id: int, user_id: int) -> bool:
         """Mark alert as read"""
         alert = self.db.query(RiskAlert).filter(RiskAlert.id == alert_id).first()
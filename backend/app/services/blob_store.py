@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd kurulu değilse gzip kullanılır
+    zstandard = None
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CODEC_ZSTD = "zst"
+CODEC_GZIP = "gz"
+
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+class BlobNotFoundError(KeyError):
+    """Referansı verilen blob depoda yok"""
+
+def available_codecs() -> tuple:
+    return (CODEC_ZSTD, CODEC_GZIP) if zstandard is not None else (CODEC_GZIP,)
+
+class BlobStore:
+    """
+    Sıkıştırılmış, içerik adresli blob deposu.
+
+    Referans sıkıştırılmamış içeriğin SHA-256 özeti ile codec uzantısından
+    oluşur ('<sha256>.zst'); aynı içerik bir kez saklanır ve codec referansta
+    yazılı olduğundan ayar değişse de eski bloblar okunabilir. Dosyalar
+    özetin ilk iki karakterine göre alt dizinlere dağıtılır ve geçici dosya
+    + os.replace ile atomik yazılır. Veritabanında yalnızca referans tutulur;
+    içerik yalnızca açıkça istendiğinde okunur.
+    """
+
+    def __init__(self, directory: str, codec: Optional[str] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = codec or available_codecs()[0]
+        if self.codec not in available_codecs():
+            raise ValueError(f"Unsupported blob codec: {self.codec}")
+
+        self._bytes_in = metrics.counter("blob_store.bytes_in")
+        self._bytes_stored = metrics.counter("blob_store.bytes_stored")
+        self._deduplicated = metrics.counter("blob_store.deduplicated")
+
+    def put(self, data: bytes) -> str:
+        """İçeriği sıkıştırıp sakla ve referansını döndür"""
+        ref = f"{hashlib.sha256(data).hexdigest()}.{self.codec}"
+        path = self._path(ref)
+        self._bytes_in.inc(len(data))
+
+        if path.exists():
+            self._deduplicated.inc()
+            return ref
+
+        compressed = self._compress(data)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.parent / f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+
+        self._bytes_stored.inc(len(compressed))
+        return ref
+
+    def get(self, ref: str) -> bytes:
+        """Referanstaki içeriği açıp döndür"""
+        try:
+            with open(self._path(ref), 'rb') as f:
+                compressed = f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(ref)
+        return self._decompress(compressed, ref.rsplit('.', 1)[-1])
+
+    def put_json(self, value: Any) -> str:
+        return self.put(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+    def get_json(self, ref: str) -> Any:
+        return json.loads(self.get(ref))
+
+    def exists(self, ref: str) -> bool:
+        return self._path(ref).exists()
+
+    def _path(self, ref: str) -> Path:
+        digest, _, codec = ref.partition('.')
+        if len(digest) != 64 or not codec or not all(c in '0123456789abcdef' for c in digest):
+            raise BlobNotFoundError(ref)
+        return self.directory / digest[:2] / ref
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        # mtime=0: aynı içerik aynı baytlara sıkıştırılır
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+    @staticmethod
+    def _decompress(compressed: bytes, codec: str) -> bytes:
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd blobs")
+            return zstandard.ZstdDecompressor().decompress(compressed)
+        if codec == CODEC_GZIP:
+            return gzip.decompress(compressed)
+        raise BlobNotFoundError(f"Unknown blob codec: {codec}")
+
+_store: Optional[BlobStore] = None
+
+def get_blob_store() -> BlobStore:
+    """Süreç genelinde paylaşılan blob deposu"""
+    global _store
+    if _store is None:
+        _store = BlobStore(settings.BLOB_STORE_DIR, settings.BLOB_STORE_CODEC or None)
+    return _store
@@ -0,0 +1,432 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.upload_spool import (
+    SpooledUpload,
+    UploadRejectedError,
+    InvalidFileTypeError,
+    FileTooLargeError,
+    MAGIC_SEARCH_WINDOW
+)
+
+logger = logging.getLogger(__name__)
+
+# Parça gövdesi diske bu boyutta okunarak yazılır
+CHUNK_READ_SIZE = 64 * 1024
+
+SESSION_FILE = "session.json"
+DATA_FILE = "data"
+CHUNKS_DIR = "chunks"
+
+class UploadSessionNotFoundError(KeyError):
+    """Yükleme oturumu yok, süresi doldu veya başka kullanıcıya ait"""
+
+class ChunkChecksumError(UploadRejectedError):
+    """Parçanın SHA-256 özeti bildirilen değerle uyuşmuyor"""
+
+class UploadIncompleteError(UploadRejectedError):
+    """Tüm baytlar alınmadan yükleme tamamlanmak istendi"""
+
+class UploadSession:
+    """
+    Parça parça yüklenen tek bir dosya.
+
+    Sıralı gelen parçalar doğrudan birleştirilmiş veri dosyasının sonuna
+    eklenir; önde gelen (sırası gelmemiş) parçalar ayrı dosyalarda bekler ve
+    boşluk dolunca eklenir. 'committed' baştan itibaren kesintisiz alınmış
+    bayt sayısıdır. Oturum bilgisi ve parça özetleri session.json'da tutulur;
+    süreç yeniden başlasa da yükleme kaldığı yerden sürer.
+    """
+
+    def __init__(
+        self,
+        upload_id: str,
+        directory: Path,
+        owner: Any,
+        kind: str,
+        filename: Optional[str],
+        total_size: int,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.id = upload_id
+        self.directory = directory
+        self.owner = owner
+        self.kind = kind
+        self.filename = filename
+        self.total_size = total_size
+        self.metadata = metadata or {}
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.committed = 0
+        self.chunks: List[Dict[str, Any]] = []    # birleştirilmiş parçalar
+        self.pending: List[Dict[str, Any]] = []   # sırasını bekleyen parçalar
+
+        # Yalnızca bellekte: süreç yeniden başlarsa kaybolur
+        self.lock = threading.Lock()
+        self.consumer: Optional[Any] = None
+        self.consumer_error: Optional[str] = None
+        self._digest: Optional[Any] = hashlib.sha256()
+
+    @property
+    def data_path(self) -> Path:
+        return self.directory / DATA_FILE
+
+    @property
+    def complete(self) -> bool:
+        return self.committed == self.total_size
+
+    def received_bytes(self) -> int:
+        return self.committed + sum(chunk['size'] for chunk in self.pending)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'uploadId': self.id,
+            'kind': self.kind,
+            'filename': self.filename,
+            'totalSize': self.total_size,
+            'committed': self.committed,
+            'receivedBytes': self.received_bytes(),
+            'pending': [{'offset': chunk['offset'], 'size': chunk['size']} for chunk in self.pending],
+            'complete': self.complete,
+            'consumed': self.consumer is not None and self.consumer_error is None,
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
+        }
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'owner': self.owner,
+            'kind': self.kind,
+            'filename': self.filename,
+            'total_size': self.total_size,
+            'metadata': self.metadata,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'committed': self.committed,
+            'chunks': self.chunks,
+            'pending': self.pending
+        }
+
+    def save(self):
+        tmp_path = self.directory / f"{SESSION_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state(), f)
+        os.replace(tmp_path, self.directory / SESSION_FILE)
+
+    @classmethod
+    def load(cls, directory: Path) -> "UploadSession":
+        with open(directory / SESSION_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        session = cls(
+            state['id'], directory, state['owner'], state['kind'],
+            state['filename'], state['total_size'], state['metadata']
+        )
+        session.created_at = state['created_at']
+        session.updated_at = state['updated_at']
+        session.committed = state['committed']
+        session.chunks = state['chunks']
+        session.pending = state['pending']
+        # Yeniden açılan oturumda dosya özeti tamamlanırken diskten hesaplanır
+        session._digest = None if session.committed else hashlib.sha256()
+        return session
+
+class ChunkedUploadStore:
+    """
+    Kaldığı yerden devam edebilen parçalı yükleme oturumları (yerel disk).
+
+    Protokol: create (boyut bildirilir) -> write_chunk (offset + gövde, isteğe
+    bağlı SHA-256) -> finalize. Her parça önce kendi dosyasına yazılır ve özeti
+    doğrulanır; bozuk veya yarım kalan parça birleştirilmiş veriye hiç
+    karışmaz, istemci aynı parçayı yeniden gönderir. Oturuma bir tüketici
+    (feed(bytes) metodu olan akış ayrıştırıcısı) bağlanırsa kesintisiz önek
+    büyüdükçe yeni baytlarla beslenir; böylece ayrıştırma yükleme bitmeden
+    ilerler. Oturumlar tek süreçte tutulur (birden çok worker'da yapışkan
+    yönlendirme gerekir); süresi dolanlar yeni oturum açılırken silinir.
+    """
+
+    def __init__(self, directory: str, max_chunk_bytes: int, ttl_seconds: int, max_per_user: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_chunk_bytes = max_chunk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_per_user = max_per_user
+
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+
+        self._chunks_counter = metrics.counter("chunked_upload.chunks")
+        self._bytes_counter = metrics.counter("chunked_upload.bytes")
+        self._checksum_failures = metrics.counter("chunked_upload.checksum_failures")
+        self._completed_counter = metrics.counter("chunked_upload.completed")
+
+    def create(
+        self,
+        owner: Any,
+        kind: str,
+        filename: Optional[str],
+        total_size: int,
+        max_bytes: int,
+        metadata: Optional[Dict[str, Any]] = None,
+        consumer: Optional[Any] = None
+    ) -> UploadSession:
+        if total_size <= 0:
+            raise UploadRejectedError("Dosya boş")
+        if total_size > max_bytes:
+            raise FileTooLargeError(f"Dosya boyutu {max_bytes // (1024 * 1024)}MB'dan büyük olamaz")
+
+        self.purge_expired()
+        with self._lock:
+            open_sessions = sum(1 for session in self._sessions.values() if session.owner == owner)
+            if open_sessions >= self.max_per_user:
+                raise UploadRejectedError(f"Kullanıcı başına en fazla {self.max_per_user} açık yükleme olabilir")
+
+            upload_id = uuid.uuid4().hex
+            directory = self.directory / upload_id
+            (directory / CHUNKS_DIR).mkdir(parents=True)
+            (directory / DATA_FILE).touch()
+            session = UploadSession(upload_id, directory, owner, kind, filename, total_size, metadata)
+            session.consumer = consumer
+            session.save()
+            self._sessions[upload_id] = session
+
+        return session
+
+    def get(self, upload_id: str, owner: Any, kind: Optional[str] = None) -> UploadSession:
+        """Oturumu bellekten, yoksa diskten yükle; sahibi ve türü eşleşmeli"""
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None and len(upload_id) == 32 and upload_id.isalnum():
+                directory = self.directory / upload_id
+                if (directory / SESSION_FILE).exists():
+                    try:
+                        session = UploadSession.load(directory)
+                    except (OSError, ValueError, KeyError) as e:
+                        logger.warning(f"Upload session unreadable, ignoring {upload_id}: {str(e)}")
+                    else:
+                        self._sessions[upload_id] = session
+
+        if session is None or session.owner != owner or (kind is not None and session.kind != kind):
+            raise UploadSessionNotFoundError(upload_id)
+        return session
+
+    def write_chunk(self, session: UploadSession, offset: int, body, checksum: Optional[str] = None) -> UploadSession:
+        """
+        Parçayı yaz ve kesintisiz öneki ilerlet (bloklayıcı; thread'de çağrılır).
+
+        body bayt dizilerini veren bir iterable'dır. Zaten birleştirilmiş bir
+        aralığı tekrar gönderen istek (yeniden deneme) okunup yok sayılır.
+        """
+        if offset < 0 or offset >= session.total_size:
+            raise UploadRejectedError(f"Geçersiz offset: {offset}")
+
+        fd, tmp_name = tempfile.mkstemp(suffix=".tmp", dir=session.directory / CHUNKS_DIR)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for data in body:
+                    size += len(data)
+                    if size > self.max_chunk_bytes:
+                        raise FileTooLargeError(f"Parça boyutu {self.max_chunk_bytes // (1024 * 1024)}MB'dan büyük olamaz")
+                    if offset + size > session.total_size:
+                        raise UploadRejectedError("Parça bildirilen dosya boyutunu aşıyor")
+                    digest.update(data)
+                    f.write(data)
+
+            if size == 0:
+                raise UploadRejectedError("Parça boş")
+            sha256 = digest.hexdigest()
+            if checksum is not None and checksum.lower() != sha256:
+                self._checksum_failures.inc()
+                raise ChunkChecksumError("Parça özeti uyuşmuyor, parçayı yeniden gönderin")
+
+            with session.lock:
+                if offset + size > session.committed:
+                    chunk_path = session.directory / CHUNKS_DIR / f"{offset}-{size}.part"
+                    os.replace(tmp_name, chunk_path)
+                    session.pending = [
+                        chunk for chunk in session.pending
+                        if (chunk['offset'], chunk['size']) != (offset, size)
+                    ]
+                    session.pending.append({'offset': offset, 'size': size, 'sha256': sha256})
+                    self._advance(session)
+                session.updated_at = time.time()
+                session.save()
+        finally:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+
+        self._chunks_counter.inc()
+        self._bytes_counter.inc(size)
+        return session
+
+    def finalize(
+        self,
+        session: UploadSession,
+        expected_sha256: Optional[str] = None,
+        magic: Optional[bytes] = None,
+        file_type: str = "PDF"
+    ) -> SpooledUpload:
+        """
+        Tamamlanmış yüklemeyi SpooledUpload olarak döndür.
+
+        Dosya oturum dizininden çıkarılır ve oturum silinir; dönen dosyanın
+        cleanup()'ı çağırana aittir. Tüm dosyanın özeti parçalar eklenirken
+        hesaplanmıştır (süreç yeniden başladıysa diskten hesaplanır). magic
+        verilirse spool_upload'daki gibi dosyanın başında aranır. Özet veya
+        imza uyuşmazsa veri düzeltilemeyeceğinden oturum silinir.
+        """
+        with session.lock:
+            if not session.complete:
+                raise UploadIncompleteError(
+                    f"Yükleme tamamlanmadı: {session.committed}/{session.total_size} bayt"
+                )
+            try:
+                sha256 = self._verify(session, expected_sha256, magic, file_type)
+            except UploadRejectedError:
+                self.discard(session)
+                raise
+
+            suffix = os.path.splitext(session.filename or "")[1] or ".bin"
+            fd, path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=self.directory)
+            os.close(fd)
+            os.replace(session.data_path, path)
+
+        self.discard(session)
+        self._completed_counter.inc()
+        return SpooledUpload(path, session.total_size, sha256, session.filename)
+
+    def _verify(self, session: UploadSession, expected_sha256: Optional[str], magic: Optional[bytes], file_type: str) -> str:
+        sha256 = session._digest.hexdigest() if session._digest is not None else _file_sha256(session.data_path)
+        if expected_sha256 is not None and expected_sha256.lower() != sha256:
+            self._checksum_failures.inc()
+            raise ChunkChecksumError("Dosya özeti uyuşmuyor")
+        if magic is not None:
+            with open(session.data_path, 'rb') as f:
+                if magic not in f.read(MAGIC_SEARCH_WINDOW):
+                    raise InvalidFileTypeError(f"Dosya içeriği geçerli bir {file_type} değil")
+        return sha256
+
+    def discard(self, session: UploadSession):
+        with self._lock:
+            self._sessions.pop(session.id, None)
+        shutil.rmtree(session.directory, ignore_errors=True)
+
+    def purge_expired(self):
+        """Süresi dolan oturumları (diskte kalanlar dahil) sil"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [session for session in self._sessions.values() if session.updated_at < cutoff]
+        for session in expired:
+            self.discard(session)
+
+        # Bellekte olmayan (yeniden başlatma öncesi) oturumlar ve sahipsiz kalan
+        # tamamlanmış dosyalar
+        for path in self.directory.iterdir():
+            if path.name in self._sessions:
+                continue
+            try:
+                marker = path / SESSION_FILE if path.is_dir() else path
+                expired_on_disk = marker.stat().st_mtime < cutoff
+            except OSError:
+                expired_on_disk = True
+            if not expired_on_disk:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _advance(self, session: UploadSession):
+        """Sırası gelen bekleyen parçaları veri dosyasına ekle ve tüketiciyi besle"""
+        while True:
+            ready = [chunk for chunk in session.pending if chunk['offset'] <= session.committed]
+            if not ready:
+                return
+            chunk = min(ready, key=lambda c: c['offset'])
+            chunk_path = session.directory / CHUNKS_DIR / f"{chunk['offset']}-{chunk['size']}.part"
+            # Örtüşen parçanın yalnızca önekte olmayan kısmı eklenir
+            if chunk['offset'] + chunk['size'] > session.committed:
+                self._append(session, chunk_path, session.committed - chunk['offset'])
+                session.chunks.append(chunk)
+            session.pending.remove(chunk)
+            os.unlink(chunk_path)
+
+    def _append(self, session: UploadSession, chunk_path: Path, skip: int):
+        with open(chunk_path, 'rb') as source, open(session.data_path, 'ab') as target:
+            source.seek(skip)
+            while True:
+                data = source.read(CHUNK_READ_SIZE)
+                if not data:
+                    break
+                target.write(data)
+                session.committed += len(data)
+                if session._digest is not None:
+                    session._digest.update(data)
+                self._feed(session, data)
+
+    @staticmethod
+    def _feed(session: UploadSession, data: bytes):
+        if session.consumer is None or session.consumer_error is not None:
+            return
+        try:
+            session.consumer.feed(data)
+        except Exception as e:
+            # Tüketici hatası yüklemeyi durdurmaz; sonuç tamamlanınca bildirilir
+            session.consumer_error = str(e)
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(1024 * 1024)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+async def read_chunk_body(stream: AsyncIterator[bytes], max_bytes: int) -> List[bytes]:
+    """
+    İstek gövdesini (request.stream()) bellekte topla; write_chunk thread'de
+    çalıştığından gövde önce okunur. Bellek parça boyutu sınırıyla sınırlıdır.
+    """
+    body = []
+    size = 0
+    async for data in stream:
+        size += len(data)
+        if size > max_bytes:
+            raise FileTooLargeError(f"Parça boyutu {max_bytes // (1024 * 1024)}MB'dan büyük olamaz")
+        if data:
+            body.append(data)
+    return body
+
+_store: Optional[ChunkedUploadStore] = None
+
+def get_chunked_upload_store() -> ChunkedUploadStore:
+    """Süreç genelinde paylaşılan yükleme oturumu deposu"""
+    global _store
+    if _store is None:
+        _store = ChunkedUploadStore(
+            settings.UPLOAD_SESSION_DIR,
+            settings.UPLOAD_CHUNK_MAX_BYTES,
+            settings.UPLOAD_SESSION_TTL_SECONDS,
+            settings.UPLOAD_SESSION_MAX_PER_USER
+        )
+    return _store
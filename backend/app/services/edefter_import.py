@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.blob_store import get_blob_store
+from app.services.edefter_ledger import TrialBalanceAggregator
+from app.services.edefter_parser import EDefterStreamParser, EDEFTER_CHUNK_SIZE, RAW_PREVIEW_BYTES, get_tag_table
+
+logger = logging.getLogger(__name__)
+
+# Dosya adındaki veya istenen dönem: 202401, 2024-01, 2024_01, 2024/01
+# (yevmiye_202401.xml vb.)
+_PERIOD_PATTERN = re.compile(r'(?<!\d)(20\d{2})[-_./]?(0[1-9]|1[0-2])(?!\d)')
+
+def normalize_period(text: Optional[str]) -> Optional[str]:
+    """Metindeki ilk yıl-ay ifadesini 'YYYY-MM' biçiminde döndür"""
+    if not text:
+        return None
+    match = _PERIOD_PATTERN.search(text)
+    return f"{match.group(1)}-{match.group(2)}" if match else None
+
+def parse_edefter_file(path: str, filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Process pool worker: diske yazılmış e-Defter dosyasını ayrıştır.
+
+    Sonuç süreçler arasında pickle ile taşındığından istisna yükseltilmez;
+    XML hatası 'error' alanında döner. Dönem belgedeki bağlamın bitiş
+    tarihinden (xbrli:endDate/instant; yıllık defter '2024-12') alınır,
+    yoksa dosya adından; ikisi de yoksa 'period' None'dır. Ham veri
+    (başarıda mali veri JSON'u, hatada dosyanın başı) sıkıştırma da worker'da
+    yapılsın diye blob deposuna burada yazılır ve referansı döner.
+    """
+    parser = EDefterStreamParser(ledger=TrialBalanceAggregator())
+    preview = b""
+    started = time.perf_counter()
+
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(EDEFTER_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if len(preview) < RAW_PREVIEW_BYTES:
+                    preview += chunk[:RAW_PREVIEW_BYTES - len(preview)]
+                parser.feed(chunk)
+        return finish_edefter_parser(parser, filename, started)
+    except ET.ParseError as e:
+        return {
+            'success': False,
+            'error': f"XML parsing error: {str(e)}",
+            'period': normalize_period(filename),
+            'file_size': parser.bytes_parsed,
+            'raw_data_ref': get_blob_store().put(preview) if preview else None
+        }
+
+def finish_edefter_parser(parser: EDefterStreamParser, filename: Optional[str],
+                          started: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Tüm dosyayla beslenmiş ayrıştırıcıyı kapatıp parse_edefter_file sonucunu
+    üret. Parçalı yüklemede canlı beslenen ayrıştırıcı da buradan geçer;
+    belge eksik veya bozuksa ET.ParseError yükselir. Ayrıştırma yükleme
+    boyunca parça parça yapıldıysa süre ölçülemez, started verilmez ve
+    parse_seconds sonuçta yer almaz.
+    """
+    financial_data = parser.close()
+    declared = financial_data['period'] if 'period' in parser.found_fields else None
+    result = {
+        'success': True,
+        'financial_data': financial_data,
+        'period': normalize_period(declared) or normalize_period(filename),
+        'file_size': parser.bytes_parsed,
+        'raw_data_ref': get_blob_store().put_json(financial_data)
+    }
+    if started is not None:
+        result['parse_seconds'] = time.perf_counter() - started
+    return result
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def get_edefter_process_pool() -> ProcessPoolExecutor:
+    """Süreç genelinde paylaşılan ayrıştırma havuzu (ilk kullanımda açılır)"""
+    global _pool
+    if _pool is None:
+        # forkserver: worker'lar API sürecinin thread'lerini ve bağlantılarını
+        # devralmaz; yoksa spawn kullanılır
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        # Taksonomi her worker'da iş gelmeden bir kez derlenir
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.EDEFTER_IMPORT_WORKERS,
+            mp_context=context,
+            initializer=get_tag_table
+        )
+    return _pool
+
+def _reset_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+async def parse_edefter_files(files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Dosyaları process pool'da eşzamanlı ayrıştır.
+
+    files: {'path', 'filename'} sözlükleri; sonuçlar aynı sırada döner.
+    Ayrıştırma CPU'ya bağlı olduğundan (expat + mizan) thread yerine süreç
+    kullanılır ve dosyalar çekirdek sayısı kadar paralel işlenir. Bir worker
+    çökerse (ör. bellek yetersizliği) yalnızca etkilenen dosyalar başarısız
+    sayılır ve havuz bir sonraki istek için yeniden kurulur.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_edefter_process_pool()
+    started = time.perf_counter()
+
+    results = await asyncio.gather(
+        *(loop.run_in_executor(pool, parse_edefter_file, item['path'], item.get('filename')) for item in files),
+        return_exceptions=True
+    )
+
+    parsed = []
+    broken = False
+    for item, result in zip(files, results):
+        if isinstance(result, BaseException):
+            broken = broken or isinstance(result, BrokenProcessPool)
+            logger.error(f"e-Defter import worker failed for {item.get('filename')}: {str(result)}")
+            result = {
+                'success': False,
+                'error': f"Dosya işlenemedi: {str(result) or type(result).__name__}",
+                'period': normalize_period(item.get('filename')),
+                'file_size': os.path.getsize(item['path']) if os.path.exists(item['path']) else 0
+            }
+        parsed.append(result)
+
+    if broken:
+        _reset_pool()
+
+    metrics.histogram("edefter.bulk_parse_seconds").observe(time.perf_counter() - started)
+    metrics.counter("edefter.bulk_files").inc(len(files))
+    metrics.counter("edefter.bytes_parsed").inc(sum(result['file_size'] for result in parsed))
+    return parsed
@@ -0,0 +1,196 @@
+from array import array
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.account_mapping import (
+    TOTAL_ASSETS,
+    TOTAL_LIABILITIES_AND_EQUITY,
+    NET_SALES,
+    GROSS_PROFIT,
+    OPERATING_PROFIT,
+    ORDINARY_PROFIT
+)
+from app.services.pdf_validation import Accounts
+
+GL_COR_NAMESPACE = 'http://www.xbrl.org/int/gl/cor/2006-10-25'
+
+# Tekdüzen ana hesap kodları üç hanelidir (100 Kasa ... 999)
+ACCOUNT_SLOTS = 1000
+
+# Bu kadar satır biriktikten sonra diziler bincount ile toplanır
+FLUSH_LINES = 1 << 16
+
+DEBIT = 0
+CREDIT = 1
+
+# debitCreditCode değerinin ilk harfi: D/B (debit, borç), C/A (credit, alacak)
+_SIDES = {'D': DEBIT, 'B': DEBIT, 'C': CREDIT, 'A': CREDIT}
+
+# Gelir tablosu grupları ve doğal yönleri (alacak bakiyeli gelirler pozitif)
+INCOME_GROUPS = {
+    '60': CREDIT, '61': DEBIT, '62': DEBIT, '63': DEBIT, '64': CREDIT,
+    '65': DEBIT, '66': DEBIT, '67': CREDIT, '68': DEBIT
+}
+
+def account_slot(code: str) -> Optional[int]:
+    """'100', '100.01.001' veya '10001' -> 100; ana hesap yoksa None"""
+    digits = code.strip()[:3]
+    if len(digits) == 3 and digits.isdigit():
+        return int(digits)
+    return None
+
+class TrialBalanceAggregator:
+    """
+    Yevmiye satırlarından mizan kurar.
+
+    Satırlar ana hesap koduna (3 hane) göre borç/alacak tamponlarına eklenir;
+    tampon dolunca np.bincount ile 1000 elemanlı borç ve alacak dizilerine
+    toplanır. Bellek satır sayısından bağımsızdır ve her satır için yalnızca
+    iki array.append yapılır. Alt hesaplar ana hesaba toplanır.
+    """
+
+    def __init__(self):
+        self.debit = np.zeros(ACCOUNT_SLOTS)
+        self.credit = np.zeros(ACCOUNT_SLOTS)
+        self.lines = 0
+        self.skipped_lines = 0
+        self._codes = (array('H'), array('H'))
+        self._amounts = (array('d'), array('d'))
+        self._pending = 0
+
+    def add_line(self, code: str, amount: float, side: str):
+        slot = account_slot(code)
+        direction = _SIDES.get(side[:1].upper()) if side else None
+        if slot is None or direction is None:
+            self.skipped_lines += 1
+            return
+
+        # Negatif tutar ters yönde kayıttır
+        if amount < 0:
+            amount = -amount
+            direction = 1 - direction
+
+        self._codes[direction].append(slot)
+        self._amounts[direction].append(amount)
+        self.lines += 1
+        self._pending += 1
+        if self._pending >= FLUSH_LINES:
+            self.flush()
+
+    def flush(self):
+        for direction, totals in ((DEBIT, self.debit), (CREDIT, self.credit)):
+            codes, amounts = self._codes[direction], self._amounts[direction]
+            if codes:
+                totals += np.bincount(
+                    np.frombuffer(codes, dtype=np.uint16),
+                    weights=np.frombuffer(amounts, dtype=np.float64),
+                    minlength=ACCOUNT_SLOTS
+                )
+                del codes[:]
+                del amounts[:]
+        self._pending = 0
+
+    def trial_balance(self) -> List[Dict[str, Any]]:
+        """Hareket gören ana hesaplar: borç, alacak ve bakiyeler (mizan)"""
+        self.flush()
+        net = self.debit - self.credit
+        rows = []
+        for slot in np.flatnonzero((self.debit != 0) | (self.credit != 0)).tolist():
+            rows.append({
+                'account': f'{slot:03d}',
+                'debit': round(float(self.debit[slot]), 2),
+                'credit': round(float(self.credit[slot]), 2),
+                'debitBalance': round(max(float(net[slot]), 0.0), 2),
+                'creditBalance': round(max(-float(net[slot]), 0.0), 2)
+            })
+        return rows
+
+    def accounts(self) -> Accounts:
+        """
+        Mizandan Tekdüzen hiyerarşisine göre kanonik hesaplar.
+
+        PDF extractor'ın ürettiği biçimdedir (aktif/pasif/gelirTablosu, sınıf
+        ve grup kodları); böylece aynı doğrulama ve oran hesapları kullanılır.
+        Kapanış kayıtları öncesi mizan beklenir: dönem karı 590/591'e
+        aktarılmamışsa gelir tablosundan hesaplanıp özkaynaklara eklenir.
+        """
+        self.flush()
+        net = self.debit - self.credit
+
+        # Grup (2 hane) ve sınıf (1 hane) net bakiyeleri: borç - alacak
+        groups = net.reshape(100, 10).sum(axis=1)
+        classes = groups.reshape(10, 10).sum(axis=1)
+
+        def group(code: str, direction: int = DEBIT) -> float:
+            value = float(groups[int(code)])
+            return value if direction == DEBIT else -value
+
+        def account(code: str, direction: int = DEBIT) -> float:
+            value = float(net[int(code)])
+            return value if direction == DEBIT else -value
+
+        aktif = {'1': float(classes[1]), '2': float(classes[2])}
+        pasif = {'3': -float(classes[3]), '4': -float(classes[4]), '5': -float(classes[5])}
+        for code in range(10, 30):
+            if groups[code]:
+                aktif[str(code)] = float(groups[code])
+        for code in range(30, 60):
+            if groups[code]:
+                pasif[str(code)] = -float(groups[code])
+
+        gelir = {code: group(code, direction) for code, direction in INCOME_GROUPS.items()}
+        # 7/A maliyet hesaplarında yansıtılmamış bakiye faaliyet gideri sayılır
+        # (yansıtma kayıtlarından sonra sınıf 7 bakiyesi sıfırdır)
+        gelir['63'] += float(classes[7])
+        gelir[NET_SALES] = gelir['60'] - gelir['61']
+        gelir[GROSS_PROFIT] = gelir[NET_SALES] - gelir['62']
+        gelir[OPERATING_PROFIT] = gelir[GROSS_PROFIT] - gelir['63']
+        gelir[ORDINARY_PROFIT] = gelir[OPERATING_PROFIT] + gelir['64'] - gelir['65'] - gelir['66']
+        gelir['690'] = gelir[ORDINARY_PROFIT] + gelir['67'] - gelir['68']
+        gelir['691'] = account('691')
+        gelir['692'] = gelir['690'] - gelir['691']
+
+        if self.debit[590:592].any() or self.credit[590:592].any():
+            pasif['590'] = account('590', CREDIT)
+            pasif['591'] = account('591')
+        else:
+            # Dönem karı henüz özkaynaklara kapatılmadı
+            pasif['5'] += gelir['692']
+
+        aktif[TOTAL_ASSETS] = aktif['1'] + aktif['2']
+        pasif[TOTAL_LIABILITIES_AND_EQUITY] = pasif['3'] + pasif['4'] + pasif['5']
+
+        return {'aktif': aktif, 'pasif': pasif, 'gelirTablosu': gelir}
+
+    def financial_fields(self) -> Dict[str, float]:
+        """Mizandan e-Defter özet alanları (taksonomideki alan adlarıyla)"""
+        accounts = self.accounts()
+        aktif, pasif, gelir = accounts['aktif'], accounts['pasif'], accounts['gelirTablosu']
+        return {
+            'total_assets': aktif[TOTAL_ASSETS],
+            'current_assets': aktif['1'],
+            'fixed_assets': aktif['2'],
+            'total_liabilities': pasif['3'] + pasif['4'],
+            'short_term_liabilities': pasif['3'],
+            'long_term_liabilities': pasif['4'],
+            'equity': pasif['5'],
+            'net_sales': gelir[NET_SALES],
+            'gross_profit': gelir[GROSS_PROFIT],
+            'operating_profit': gelir[OPERATING_PROFIT],
+            'net_profit': gelir['692']
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        self.flush()
+        total_debit = float(self.debit.sum())
+        total_credit = float(self.credit.sum())
+        return {
+            'lines': self.lines,
+            'skippedLines': self.skipped_lines,
+            'accounts': int(np.count_nonzero((self.debit != 0) | (self.credit != 0))),
+            'totalDebit': round(total_debit, 2),
+            'totalCredit': round(total_credit, 2),
+            # Çift taraflı kayıt: toplam borç toplam alacağa eşit olmalı
+            'balanced': abs(total_debit - total_credit) <= 0.01 * max(self.lines, 1)
+        }
@@ -0,0 +1,337 @@
+import json
+import logging
+import os
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.services.edefter_ledger import GL_COR_NAMESPACE, TrialBalanceAggregator
+from app.services.number_parser import parse_number
+
+logger = logging.getLogger(__name__)
+
+XBRLI_NAMESPACE = 'http://www.xbrl.org/2003/instance'
+
+# Uygulamayla gelen taksonomi: e-Defter eleman adı -> mali veri alanı,
+# işaret ve ölçek kuralları (EDEFTER_TAXONOMY_PATH ile değiştirilebilir)
+EDEFTER_TAXONOMY_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'edefter_taxonomy.json'
+)
+
+DEFAULT_PERIOD = "2024-12"
+
+# Alan elemanlarının arandığı ad alanları, öncelik sırasıyla ('' = ad alanı yok)
+EDEFTER_NAMESPACES = ('', XBRLI_NAMESPACE)
+
+# Yükleme bu boyutta parçalar halinde okunur ve ayrıştırıcıya verilir
+EDEFTER_CHUNK_SIZE = 1024 * 1024
+
+# Hata kaydında saklanan ham içerik önizlemesi
+RAW_PREVIEW_BYTES = 64 * 1024
+
+def parse_amount(text: Optional[str]) -> float:
+    """
+    XBRL tutarı: makine ondalık biçimi, düz tamsayılar kuruş cinsinden.
+
+    Özet etiketleri ve yevmiye satırları (gl-cor:amount) aynı kuralla
+    okunur; mizandan türetilen alanlar özet alanlarla aynı birimdedir.
+    """
+    if not text:
+        return 0.0
+    text = text.strip()
+    value = parse_number(text, decimal='.')
+    if value is None:
+        return 0.0
+    return value / 100 if text.lstrip('-').isdigit() else value
+
+# Oranlar için her taksonomide bulunması gereken alanlar
+RATIO_FIELDS = ('total_assets', 'current_assets', 'total_liabilities', 'short_term_liabilities', 'equity', 'net_profit')
+
+def add_financial_ratios(financial_data: Dict[str, Any]) -> Dict[str, Any]:
+    if financial_data['total_assets'] > 0:
+        financial_data['return_on_assets'] = (financial_data['net_profit'] / financial_data['total_assets']) * 100
+
+    if financial_data['equity'] > 0:
+        financial_data['return_on_equity'] = (financial_data['net_profit'] / financial_data['equity']) * 100
+        financial_data['debt_to_equity'] = financial_data['total_liabilities'] / financial_data['equity']
+
+    if financial_data['short_term_liabilities'] > 0:
+        financial_data['current_ratio'] = financial_data['current_assets'] / financial_data['short_term_liabilities']
+
+    return financial_data
+
+class TagRule(NamedTuple):
+    field: str
+    priority: int          # küçük olan tercih edilir
+    convert: Callable[[str], Any]
+    default: Any
+
+def _scaled(convert: Callable[[str], Any], factor: float) -> Callable[[str], Any]:
+    """İşaret ve ölçeği dönüştürücüye göm (kural ayrıştırma sırasında yorumlanmaz)"""
+    if factor == 1:
+        return convert
+
+    def scaled(text: str) -> Any:
+        value = convert(text)
+        return value * factor if value is not None else None
+
+    return scaled
+
+class TagTable:
+    """
+    Clark gösterimli etiket -> alan dağıtım tablosu.
+
+    Her yerel ad, verilen ad alanlarının her biri için ayrı bir anahtarla
+    önceden açılır; ayrıştırma sırasında eleman başına tek bir sözlük araması
+    yapılır. Taksonominin tamamı eklense de belge yine tek geçişte okunur.
+    Bir alana eklenen etiketlerin önceliği ekleme sırasıdır: önce verilen
+    ad ve ad alanı, sonra eşanlamlılar.
+    """
+
+    def __init__(self):
+        self.rules: Dict[str, TagRule] = {}
+        self.defaults: Dict[str, Any] = {}
+        self._next_priority: Dict[str, int] = {}
+
+    def add(
+        self,
+        local_name: str,
+        field: str,
+        namespaces: Iterable[str] = EDEFTER_NAMESPACES,
+        convert: Callable[[str], Any] = parse_amount,
+        default: Any = 0.0,
+        sign: int = 1,
+        scale: int = 0
+    ) -> "TagTable":
+        convert = _scaled(convert, sign * 10 ** scale)
+        priority = self._next_priority.get(field, 0)
+        for namespace in namespaces:
+            tag = f'{{{namespace}}}{local_name}' if namespace else local_name
+            self.rules[tag] = TagRule(field, priority, convert, default)
+            priority += 1
+        self._next_priority[field] = priority
+        self.defaults.setdefault(field, default)
+        return self
+
+    def update(self, fields: Dict[str, str], namespaces: Iterable[str] = EDEFTER_NAMESPACES) -> "TagTable":
+        """Yerel ad -> alan eşlemesindeki tüm tutar alanlarını ekle"""
+        namespaces = tuple(namespaces)
+        for local_name, field in fields.items():
+            self.add(local_name, field, namespaces)
+        return self
+
+def _period_text(text: str) -> Optional[str]:
+    """xbrli:endDate / xbrli:instant metni ('2024-12-31'); boşsa None"""
+    return text.strip() or None
+
+# Taksonomi eleman türleri: dönüştürücü ve eleman yoksa kullanılan değer
+ELEMENT_TYPES = {
+    'amount': (parse_amount, 0.0),
+    'period': (_period_text, DEFAULT_PERIOD),
+}
+
+def compile_taxonomy(taxonomy: Dict[str, Any]) -> TagTable:
+    """
+    Taksonomi tanımını dağıtım tablosuna derle.
+
+    Elemanlar {'name', 'field', 'type', 'namespaces', 'sign', 'scale'}
+    biçimindedir; ad alanı önekleri 'namespaces' eşlemesiyle URI'ye çözülür,
+    verilmezse 'defaultNamespaces' kullanılır. Tutar elemanlarında değer
+    sign * 10^scale ile çarpılır (ör. zarar elemanları -1, bin TL raporlanan
+    elemanlar scale=3). Hatalı tanım veya oranlar için gereken bir alanın
+    eksik olması ValueError yükseltir.
+    """
+    prefixes = taxonomy.get('namespaces', {'': ''})
+    default_prefixes = taxonomy.get('defaultNamespaces', [''])
+    table = TagTable()
+
+    for element in taxonomy['elements']:
+        try:
+            name, field = element['name'], element['field']
+            convert, default = ELEMENT_TYPES[element.get('type', 'amount')]
+            namespaces = [prefixes[prefix] for prefix in element.get('namespaces', default_prefixes)]
+        except KeyError as e:
+            raise ValueError(f"Invalid e-Defter taxonomy element {element}: missing or unknown {e}")
+
+        sign, scale = element.get('sign', 1), element.get('scale', 0)
+        if sign not in (1, -1) or not isinstance(scale, int):
+            raise ValueError(f"Invalid sign/scale for e-Defter taxonomy element {name}")
+        if (sign, scale) != (1, 0) and convert is not parse_amount:
+            raise ValueError(f"Sign/scale rules apply only to amount elements: {name}")
+
+        table.add(name, field, namespaces, convert, default, sign=sign, scale=scale)
+
+    missing = [field for field in RATIO_FIELDS if field not in table.defaults]
+    if missing:
+        raise ValueError(f"e-Defter taxonomy has no elements for: {', '.join(missing)}")
+    return table
+
+def load_tag_table(path: Optional[str] = None) -> TagTable:
+    """Taksonomi dosyasını oku ve derle"""
+    path = path or EDEFTER_TAXONOMY_FILE
+    with open(path, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    table = compile_taxonomy(taxonomy)
+    logger.info(
+        f"e-Defter taxonomy {taxonomy.get('version', '?')} loaded from {path}: "
+        f"{len(taxonomy['elements'])} elements, {len(table.rules)} tags, {len(table.defaults)} fields"
+    )
+    return table
+
+_tag_table: Optional[TagTable] = None
+
+def get_tag_table() -> TagTable:
+    """Süreç genelinde paylaşılan dağıtım tablosu (ilk çağrıda derlenir)"""
+    global _tag_table
+    if _tag_table is None:
+        _tag_table = load_tag_table(settings.EDEFTER_TAXONOMY_PATH or None)
+    return _tag_table
+
+class _EDefterTarget:
+    """
+    XMLParser hedefi: eleman ağacı kurulmaz, yalnızca dağıtım tablosundaki
+    elemanların metni toplanır. Bir alan birden fazla etiketle (ad alanı veya
+    eşanlamlı) geçiyorsa önceliği yüksek olan, aynı etiket tekrar ediyorsa
+    belgede ilk geçen değer alınır.
+    """
+
+    __slots__ = ('rules', 'defaults', 'values', 'capture', 'text')
+
+    def __init__(self, table: TagTable):
+        self.rules = table.rules
+        self.defaults = table.defaults
+        self.values: Dict[str, Tuple[Any, int]] = {}
+        self.capture: Optional[TagRule] = None
+        self.text: List[str] = []
+
+    def start(self, tag: str, attrib: Dict[str, str]):
+        if self.capture is None:
+            rule = self.rules.get(tag)
+            if rule is not None:
+                self.capture = rule
+                self.text = []
+
+    def data(self, data: str):
+        if self.capture is not None:
+            self.text.append(data)
+
+    def end(self, tag: str):
+        rule = self.capture
+        if rule is None or self.rules.get(tag) is not rule:
+            return
+        self.capture = None
+
+        current = self.values.get(rule.field)
+        if current is None or rule.priority < current[1]:
+            self.values[rule.field] = (rule.convert("".join(self.text)), rule.priority)
+
+    def close(self) -> Dict[str, Any]:
+        financial_data = dict(self.defaults)
+        for field, (value, _) in self.values.items():
+            if value is not None:
+                financial_data[field] = value
+        return add_financial_ratios(financial_data)
+
+# Yevmiye satırı elemanları (gl-cor)
+_ENTRY_DETAIL = f'{{{GL_COR_NAMESPACE}}}entryDetail'
+_LINE_FIELDS = {
+    f'{{{GL_COR_NAMESPACE}}}accountMainID': 0,
+    f'{{{GL_COR_NAMESPACE}}}amount': 1,
+    f'{{{GL_COR_NAMESPACE}}}debitCreditCode': 2,
+}
+
+class _LedgerTarget(_EDefterTarget):
+    """
+    Özet alanlara ek olarak gl-cor:entryDetail satırlarını mizana toplar.
+    Özet elemanı olmayan alanlar mizandan türetilir.
+    """
+
+    __slots__ = ('ledger', 'line', 'line_field', 'line_text')
+
+    def __init__(self, table: TagTable, ledger: TrialBalanceAggregator):
+        super().__init__(table)
+        self.ledger = ledger
+        self.line: Optional[List[Optional[str]]] = None
+        self.line_field: Optional[int] = None
+        self.line_text: List[str] = []
+
+    # Olay başına çağrı sayısı ayrıştırma hızını belirler; üst sınıf
+    # metotları çağrılmak yerine satır içine alınmıştır
+    def start(self, tag: str, attrib: Dict[str, str]):
+        if self.line is not None:
+            line_field = _LINE_FIELDS.get(tag)
+            if line_field is not None:
+                self.line_field = line_field
+                self.line_text = []
+                return
+        if tag == _ENTRY_DETAIL:
+            self.line = [None, None, None]
+        elif self.capture is None:
+            rule = self.rules.get(tag)
+            if rule is not None:
+                self.capture = rule
+                self.text = []
+
+    def data(self, data: str):
+        if self.line_field is not None:
+            self.line_text.append(data)
+        elif self.capture is not None:
+            self.text.append(data)
+
+    def end(self, tag: str):
+        if self.line_field is not None:
+            self.line[self.line_field] = "".join(self.line_text).strip()
+            self.line_field = None
+        elif tag == _ENTRY_DETAIL:
+            code, amount, side = self.line
+            self.line = None
+            if code and amount:
+                self.ledger.add_line(code, parse_amount(amount), side)
+            else:
+                self.ledger.skipped_lines += 1
+        elif self.capture is not None:
+            _EDefterTarget.end(self, tag)
+
+    def close(self) -> Dict[str, Any]:
+        financial_data = _EDefterTarget.close(self)
+        if self.ledger.lines:
+            found = set(self.values)
+            for field, value in self.ledger.financial_fields().items():
+                if field not in found:
+                    financial_data[field] = value
+            financial_data = add_financial_ratios(financial_data)
+            financial_data['ledger'] = self.ledger.summary()
+            financial_data['trial_balance'] = self.ledger.trial_balance()
+        return financial_data
+
+class EDefterStreamParser:
+    """
+    e-Defter XML'ini parça parça ayrıştırır.
+
+    Parçalar expat tabanlı XMLParser'a doğrudan verilir ve olaylar bir hedef
+    nesnesinde işlenir; eleman ağacı hiç kurulmadığından temizlenecek bir şey
+    kalmaz ve bellek kullanımı dosya boyutundan bağımsızdır (yalnızca son
+    parça ve aranan elemanların metni tutulur). ledger verilirse yevmiye
+    satırları aynı geçişte mizana toplanır.
+    """
+
+    def __init__(self, tag_table: Optional[TagTable] = None, ledger: Optional[TrialBalanceAggregator] = None):
+        table = tag_table or get_tag_table()
+        target = _LedgerTarget(table, ledger) if ledger is not None else _EDefterTarget(table)
+        self._target = target
+        self._parser = ET.XMLParser(target=target)
+        self.ledger = ledger
+        self.bytes_parsed = 0
+
+    @property
+    def found_fields(self) -> set:
+        """Belgede bulunan alanlar (varsayılan değerle doldurulanlar hariç)"""
+        return {field for field, (value, _) in self._target.values.items() if value is not None}
+
+    def feed(self, chunk: bytes):
+        self.bytes_parsed += len(chunk)
+        self._parser.feed(chunk)
+
+    def close(self) -> Dict[str, Any]:
+        """Ayrıştırmayı bitir ve mali verileri döndür (XML hatasında ParseError)"""
+        return self._parser.close()
@@ -0,0 +1,133 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+
+# Sayı adayı: isteğe bağlı parantez/eksi işareti ve rakamla başlayıp biten,
+# arada yalnızca rakam, nokta veya virgül içeren dizi. Kelime içindeki
+# rakamlar ve tarih aralıklarındaki tire (2023-12) işaret sayılmaz.
+#
+# Gruplar: (açılış parantezi, eksi, hızlı biçim, diğer biçim, kapanış, sondaki eksi).
+# Yerel biçime uyan sayılar "hızlı biçim" grubuna düşer ve tek translate ile
+# çevrilir; yalnızca geri kalanlar Python tarafında ayrıştırılır.
+_SIGN_PREFIX = r'(?<![\w.,])(?=[(\-−\d])(\()?([-−])?'
+_SIGN_SUFFIX = r'|(\d[\d.,]*\d))(\))?(-(?!\d))?'
+
+NUMBER_PATTERN = re.compile(
+    _SIGN_PREFIX + r'(?:(\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:,\d+)?)(?![.,]?\d)' + _SIGN_SUFFIX
+)
+MACHINE_NUMBER_PATTERN = re.compile(
+    _SIGN_PREFIX + r'(?:(\d+(?:\.\d+)?)(?![.,]?\d)' + _SIGN_SUFFIX
+)
+
+_THOUSANDS_DOT = re.compile(r'\d{1,3}(?:\.\d{3})+')
+_THOUSANDS_COMMA = re.compile(r'\d{1,3}(?:,\d{3})+')
+_WHITESPACE = re.compile(r'\s+')
+_TURKISH_TO_MACHINE = str.maketrans({'.': None, ',': '.'})
+_REMOVE_DOTS = str.maketrans('', '', '.')
+_REMOVE_COMMAS = str.maketrans('', '', ',')
+_REMOVE_SPACES = str.maketrans('', '', ' \u00a0\u202f')
+
+def _pattern(decimal: str) -> "re.Pattern":
+    return MACHINE_NUMBER_PATTERN if decimal == '.' else NUMBER_PATTERN
+
+def _fast_float(digits: str, decimal: str) -> float:
+    return float(digits) if decimal == '.' else float(digits.translate(_TURKISH_TO_MACHINE))
+
+def _mixed_float(digits: str, decimal: str) -> Optional[float]:
+    """Yerel biçime uymayan sayılar (yabancı ayraçlar, belirsiz gruplar)"""
+    has_dot = '.' in digits
+    has_comma = ',' in digits
+
+    try:
+        if has_dot and has_comma:
+            # İki ayraç da varsa sondaki ondalık ayracıdır: 1.234,56 / 1,234.56
+            if digits.rfind(',') > digits.rfind('.'):
+                return float(digits.translate(_TURKISH_TO_MACHINE))
+            return float(digits.translate(_REMOVE_COMMAS))
+
+        if has_dot:
+            # Çok noktalı gruplar binlik ayracıdır (1.234.567)
+            if _THOUSANDS_DOT.fullmatch(digits):
+                return float(digits.translate(_REMOVE_DOTS))
+            return float(digits)
+
+        # Yalnızca virgül: 1,234,567 binlik; tek virgül makine biçiminde
+        # binlik (1,234), aksi halde ondalık (12,50)
+        if _THOUSANDS_COMMA.fullmatch(digits) and (decimal == '.' or digits.count(',') > 1):
+            return float(digits.translate(_REMOVE_COMMAS))
+        return float(digits.replace(',', '.'))
+    except ValueError:
+        return None
+
+def _to_value(groups: Tuple[str, ...], decimal: str) -> Optional[float]:
+    opening, minus, fast, other, closing, trailing_minus = groups
+    if fast:
+        value = _fast_float(fast, decimal)
+    else:
+        value = _mixed_float(other, decimal)
+        if value is None:
+            return None
+    # Muhasebe gösterimi: (1.234,00), -1.234,00 veya 1.234,00-
+    if minus or trailing_minus or (opening and closing):
+        return -value
+    return value
+
+def parse_number(text: str, decimal: str = ',') -> Optional[float]:
+    """
+    Tek bir tutarı çevir; sayı değilse None.
+
+    Varsayılan Türkçe biçimdir (1.234.567,89); decimal='.' makine/XML
+    biçimi (1234567.89) içindir. Hem nokta hem virgül varsa sondaki ondalık
+    kabul edilir. Eksi işareti, sondaki eksi ve parantezli tutarlar negatif okunur.
+    """
+    if text is None:
+        return None
+    text = text.strip().translate(_REMOVE_SPACES)
+    if text.isdigit():
+        return float(text)
+
+    match = _pattern(decimal).fullmatch(text)
+    if match is None:
+        return None
+    return _to_value(match.groups(), decimal)
+
+def parse_numbers(line: str, decimal: str = ',') -> List[float]:
+    """Satırdaki tüm tutarları tek regex geçişinde çıkar"""
+    numbers = []
+    turkish = decimal != '.'
+    # Sıcak döngü: hızlı biçim satır içinde çevrilir, fonksiyon çağrısı yapılmaz
+    for opening, minus, fast, other, closing, trailing_minus in _pattern(decimal).findall(line):
+        if fast:
+            value = float(fast.translate(_TURKISH_TO_MACHINE)) if turkish else float(fast)
+        else:
+            value = _mixed_float(other, decimal)
+            if value is None:
+                continue
+        if minus or trailing_minus or (opening and closing):
+            value = -value
+        numbers.append(value)
+    return numbers
+
+def parse_tokens(tokens: Iterable[str], decimal: str = ',') -> List[Optional[float]]:
+    """Token listesini toplu çevir; çevrilemeyenler None"""
+    return [parse_number(token, decimal) for token in tokens]
+
+def split_label_and_numbers(line: str, decimal: str = ',') -> Tuple[str, List[float]]:
+    """Tablo satırını etiket metni ve tutarlara ayır"""
+    # split() gruplarla birlikte [metin, 6 grup, metin, 6 grup, ..., metin] döndürür
+    parts = _pattern(decimal).split(line)
+    if len(parts) == 1:
+        return _WHITESPACE.sub(' ', line).strip(), []
+
+    numbers = []
+    label_parts = [parts[0]]
+    for i in range(1, len(parts), 7):
+        groups = parts[i:i + 6]
+        value = _to_value(groups, decimal)
+        if value is None:
+            # Sayı olarak okunamayan parça etikette kalır
+            label_parts.append(''.join(part for part in groups if part))
+        else:
+            numbers.append(value)
+        label_parts.append(parts[i + 6])
+
+    return _WHITESPACE.sub(' ', ' '.join(label_parts)).strip(), numbers
@@ -0,0 +1,221 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import mmap
+import os
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PDFSource = Union[bytes, str]
+
+# Belge sınıfları dosya boyutuna göre belirlenir (açmadan bilinebilir)
+DOCUMENT_CLASSES = (
+    ('small', 256 * 1024),
+    ('medium', 4 * 1024 * 1024),
+    ('large', None),
+)
+
+class PDFDocument:
+    """Açık bir PDF belgesi; sayfa numaraları 0 tabanlıdır"""
+
+    page_count: int = 0
+
+    def raw_content(self, page_num: int) -> Optional[bytes]:
+        """Sayfanın çözülmüş içerik akışı; okunamıyorsa None"""
+        raise NotImplementedError
+
+    def extract_text(self, page_num: int) -> str:
+        raise NotImplementedError
+
+class PDFTextBackend:
+    """
+    PDF metin çıkarma motoru.
+
+    Alt sınıflar modül adını (isteğe bağlı bağımlılık) ve open() metodunu
+    tanımlar; kurulu olmayan motorlar otomatik olarak atlanır.
+    """
+
+    name = ""
+    module = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    def open(self, pdf_source: PDFSource):
+        """PDFDocument döndüren context manager"""
+        raise NotImplementedError
+
+@contextmanager
+def open_pdf_stream(pdf_source: PDFSource) -> Iterator[BinaryIO]:
+    """Bayt içeriği BytesIO ile, dosya yolunu mmap ile aç"""
+    if isinstance(pdf_source, (bytes, bytearray)):
+        yield BytesIO(pdf_source)
+        return
+
+    # mmap ile sayfalar işletim sistemi önbelleğinden okunur,
+    # dosyanın ikinci bir kopyası süreç belleğine alınmaz
+    with open(pdf_source, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+class _PyPDFDocument(PDFDocument):
+    def __init__(self, reader):
+        self._pages = reader.pages
+        self.page_count = len(self._pages)
+
+    def raw_content(self, page_num: int) -> Optional[bytes]:
+        try:
+            contents = self._pages[page_num].get_contents()
+            return contents.get_data() if contents is not None else b""
+        except Exception:
+            return None
+
+    def extract_text(self, page_num: int) -> str:
+        return self._pages[page_num].extract_text()
+
+class PyPDF2Backend(PDFTextBackend):
+    """Varsayılan motor (requirements.txt ile gelir)"""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    @contextmanager
+    def open(self, pdf_source: PDFSource) -> Iterator[PDFDocument]:
+        import PyPDF2
+        with open_pdf_stream(pdf_source) as stream:
+            yield _PyPDFDocument(PyPDF2.PdfReader(stream))
+
+class PyPDFBackend(PDFTextBackend):
+    """PyPDF2'nin devamı; yeni sürümlerde metin çıkarma daha hızlı"""
+
+    name = "pypdf"
+    module = "pypdf"
+
+    @contextmanager
+    def open(self, pdf_source: PDFSource) -> Iterator[PDFDocument]:
+        import pypdf
+        with open_pdf_stream(pdf_source) as stream:
+            yield _PyPDFDocument(pypdf.PdfReader(stream))
+
+class _PyMuPDFDocument(PDFDocument):
+    def __init__(self, document):
+        self._document = document
+        self.page_count = document.page_count
+
+    def raw_content(self, page_num: int) -> Optional[bytes]:
+        try:
+            return self._document[page_num].read_contents()
+        except Exception:
+            return None
+
+    def extract_text(self, page_num: int) -> str:
+        return self._document[page_num].get_text()
+
+class PyMuPDFBackend(PDFTextBackend):
+    """MuPDF tabanlı C motoru; tablo yoğun sayfalarda belirgin şekilde hızlı"""
+
+    name = "pymupdf"
+    module = "fitz"
+
+    @contextmanager
+    def open(self, pdf_source: PDFSource) -> Iterator[PDFDocument]:
+        try:
+            pymupdf = importlib.import_module("pymupdf")
+        except ImportError:
+            pymupdf = importlib.import_module("fitz")
+
+        # Dosya yolu doğrudan verilir; MuPDF dosyayı kendisi okur
+        if isinstance(pdf_source, (bytes, bytearray)):
+            document = pymupdf.open(stream=bytes(pdf_source), filetype="pdf")
+        else:
+            document = pymupdf.open(pdf_source, filetype="pdf")
+        try:
+            yield _PyMuPDFDocument(document)
+        finally:
+            document.close()
+
+# Profil yokken kullanılacak tercih sırası (genel olarak en hızlıdan yavaşa)
+BACKENDS: Dict[str, PDFTextBackend] = {
+    backend.name: backend
+    for backend in (PyMuPDFBackend(), PyPDFBackend(), PyPDF2Backend())
+}
+DEFAULT_BACKEND = PyPDF2Backend.name
+
+def available_backends() -> List[str]:
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def document_class(size_bytes: int) -> str:
+    for name, limit in DOCUMENT_CLASSES:
+        if limit is None or size_bytes <= limit:
+            return name
+    return DOCUMENT_CLASSES[-1][0]
+
+def source_size(pdf_source: PDFSource) -> int:
+    if isinstance(pdf_source, (bytes, bytearray)):
+        return len(pdf_source)
+    return os.path.getsize(pdf_source)
+
+class BackendSelector:
+    """
+    Belge sınıfına göre metin motoru seçer.
+
+    Benchmark aracının ürettiği profil ({"classes": {"small": {"backend": ...}}})
+    varsa her sınıf için ölçülen en hızlı motor kullanılır; yoksa ya da önerilen
+    motor kurulu değilse kurulu motorlar arasından tercih sırası geçerlidir.
+    """
+
+    def __init__(self, forced: Optional[str] = None, profile_path: Optional[str] = None):
+        self.available = available_backends()
+        if DEFAULT_BACKEND not in self.available:
+            self.available.append(DEFAULT_BACKEND)
+
+        if forced and forced not in self.available:
+            logger.warning(f"PDF text backend '{forced}' is not installed, falling back to auto selection")
+            forced = None
+        self.forced = forced
+
+        self.profile: Dict[str, Any] = {}
+        self.profile_digest = "none"
+        if profile_path and os.path.exists(profile_path):
+            try:
+                with open(profile_path, 'rb') as f:
+                    raw = f.read()
+                self.profile = json.loads(raw).get('classes', {})
+                self.profile_digest = hashlib.sha256(raw).hexdigest()[:8]
+            except (OSError, ValueError) as e:
+                logger.warning(f"PDF backend profile unreadable, ignoring {profile_path}: {str(e)}")
+
+    def select(self, pdf_source: PDFSource) -> PDFTextBackend:
+        if self.forced:
+            return BACKENDS[self.forced]
+
+        recommended = self.profile.get(document_class(source_size(pdf_source)), {}).get('backend')
+        if recommended in self.available:
+            return BACKENDS[recommended]
+
+        return BACKENDS[self.available[0]]
+
+    @property
+    def signature(self) -> str:
+        """Seçimi etkileyen durumun özeti (önbellek anahtarı için)"""
+        if self.forced:
+            return self.forced
+        return f"{'+'.join(self.available)}:{self.profile_digest}"
+
+_selector: Optional[BackendSelector] = None
+
+def get_backend_selector() -> BackendSelector:
+    """Süreç genelinde paylaşılan seçici (profil bir kez okunur)"""
+    global _selector
+    if _selector is None:
+        _selector = BackendSelector(settings.PDF_TEXT_BACKEND or None, settings.PDF_BACKEND_PROFILE or None)
+        logger.info(f"PDF text backends available: {_selector.available}, selection: {_selector.signature}")
+    return _selector
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class PDFExtractionCache:
+    """
+    PDF çıkarma sonuçları için içerik adresli disk önbelleği.
+
+    Anahtar, PDF baytlarının SHA-256 özeti ile extractor sürümünden oluşur;
+    extractor davranışı değiştiğinde sürüm artırılır ve eski kayıtlar
+    kendiliğinden geçersiz kalıp LRU ile silinir. Her kayıt ayrı bir JSON
+    dosyasıdır; bellekteki indeks açılışta dizinden, dosyaların mtime
+    sırasına göre yeniden kurulur.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self._hits = metrics.counter("pdf_cache.hits")
+        self._misses = metrics.counter("pdf_cache.misses")
+        self._evictions = metrics.counter("pdf_cache.evictions")
+
+        self._load_index()
+
+    @staticmethod
+    def make_key(content_hash: str, extractor_version: str) -> str:
+        return f"{content_hash}.v{extractor_version}"
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Önbellekteki sonucu döndür, yoksa None"""
+        path = self._path(key)
+        with self._lock:
+            if key not in self._index:
+                self._misses.inc()
+                return None
+            self._index.move_to_end(key)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            # Yeniden başlatmalarda LRU sırası korunsun
+            os.utime(path, None)
+        except (OSError, ValueError) as e:
+            logger.warning(f"PDF cache entry unreadable, dropping {key}: {str(e)}")
+            self._drop(key)
+            self._misses.inc()
+            return None
+
+        self._hits.inc()
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Sonucu kaydet ve gerekirse en eski kayıtları sil"""
+        path = self._path(key)
+        tmp_path = path.parent / f"{path.name}.{threading.get_ident()}.tmp"
+        data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+        if len(data) > self.max_bytes:
+            return
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"PDF cache write failed for {key}: {str(e)}")
+            return
+
+        with self._lock:
+            self._size -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._size += len(data)
+            evicted = self._evict_locked()
+
+        for old_key in evicted:
+            self._unlink(old_key)
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = self._hits.value, self._misses.value
+        return {
+            'entries': len(self._index),
+            'size_bytes': self._size,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'evictions': self._evictions.value,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_index(self):
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._size += size
+
+        evicted = self._evict_locked()
+        for old_key in evicted:
+            self._unlink(old_key)
+
+        logger.info(f"PDF cache loaded: {len(self._index)} entries, {self._size} bytes")
+
+    def _evict_locked(self):
+        evicted = []
+        while self._size > self.max_bytes and self._index:
+            old_key, size = self._index.popitem(last=False)
+            self._size -= size
+            self._evictions.inc()
+            evicted.append(old_key)
+        return evicted
+
+    def _drop(self, key: str):
+        with self._lock:
+            self._size -= self._index.pop(key, 0)
+        self._unlink(key)
+
+    def _unlink(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"PDF cache unlink failed for {key}: {str(e)}")
+
+_cache: Optional[PDFExtractionCache] = None
+
+def get_pdf_cache() -> Optional[PDFExtractionCache]:
+    """Süreç genelinde paylaşılan önbellek (devre dışıysa None)"""
+    global _cache
+    if _cache is None and settings.PDF_CACHE_ENABLED:
+        _cache = PDFExtractionCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
+    return _cache
@@ -0,0 +1,104 @@
+import re
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+# Anahtar kelime eşleştirmesi için Türkçe büyük harfleri ASCII'ye indir
+KEYWORD_FOLD = str.maketrans('İŞĞÜÖÇ', 'ISGUOC')
+
+KURUMLAR_VERGISI = 'kurumlar_vergisi'
+KDV = 'kdv'
+BILANCO = 'bilanco'
+
+class DocumentSignature(NamedTuple):
+    titles: Tuple[str, ...]      # belge başlığı ifadeleri
+    supporting: Tuple[str, ...]  # içerikte beklenen ifadeler (1 puan)
+    title_weight: int
+    min_score: int
+
+# Beyanname başlığı belirleyicidir: beyannameler bilanço da içerdiğinden
+# başlık ağırlığı bilanço ifadelerinin toplamından yüksek tutulur
+DOCUMENT_SIGNATURES: Dict[str, DocumentSignature] = {
+    KURUMLAR_VERGISI: DocumentSignature(
+        titles=('KURUMLAR VERGISI BEYANNAMESI',),
+        supporting=('KURUMLAR VERGISI', 'TICARI BILANCO KARI', 'MAHSUP EDILECEK VERGILER',
+                    'KURUM KAZANCI', 'VERGI MATRAHI', 'ILAVELER'),
+        title_weight=10,
+        min_score=3
+    ),
+    KDV: DocumentSignature(
+        titles=('KATMA DEGER VERGISI BEYANNAMESI', 'KDV BEYANNAMESI'),
+        supporting=('KATMA DEGER VERGISI', 'HESAPLANAN KDV', 'INDIRILECEK KDV',
+                    'ODENMESI GEREKEN KDV', 'SONRAKI DONEME DEVREDEN', 'TEVKIFAT'),
+        title_weight=10,
+        min_score=3
+    ),
+    BILANCO: DocumentSignature(
+        titles=('BILANCO', 'GELIR TABLOSU'),
+        supporting=('AKTIF', 'PASIF', 'DONEN VARLIKLAR', 'DURAN VARLIKLAR',
+                    'OZKAYNAKLAR', 'NET SATISLAR'),
+        title_weight=3,
+        min_score=4
+    ),
+}
+
+# Sınıflandırma için okunan sayfa sayısı
+CLASSIFY_PAGES = 2
+
+class Classification(NamedTuple):
+    document_type: Optional[str]
+    score: int
+    scores: Dict[str, int]
+
+def fold_keywords(text: str) -> str:
+    return text.upper().translate(KEYWORD_FOLD)
+
+class DocumentClassifier:
+    """
+    İlk sayfaların metninden belge türünü anahtar kelime puanıyla tahmin eder.
+
+    Tüm ifadeler tek bir alternasyon regex'inde derlenir; metin bir kez
+    taranır ve her eşleşme (tür, ağırlık) tablosundan puanlanır. Aynı ifade
+    birden fazla kez geçse de bir kez sayılır. Puanı en yüksek tür eşiğini
+    geçmiyorsa belge türü bilinmiyor (None) kabul edilir; eşitlikte
+    tanımlama sırası önceliklidir.
+    """
+
+    def __init__(self, signatures: Dict[str, DocumentSignature] = DOCUMENT_SIGNATURES):
+        self.order = list(signatures)
+        self.min_scores = {doc_type: signature.min_score for doc_type, signature in signatures.items()}
+        self._weights: Dict[str, Dict[str, int]] = {}
+
+        for doc_type, signature in signatures.items():
+            for phrase in signature.titles:
+                self._weights.setdefault(phrase, {})[doc_type] = signature.title_weight
+            for phrase in signature.supporting:
+                self._weights.setdefault(phrase, {}).setdefault(doc_type, 1)
+
+        # Uzun ifadeler önce: 'TICARI BILANCO KARI' içindeki 'BILANCO' ayrıca sayılmaz
+        phrases = sorted(self._weights, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'\b(?:' + '|'.join(re.escape(p).replace(r'\ ', r'\s+') for p in phrases) + r')\b'
+        )
+        self._whitespace = re.compile(r'\s+')
+
+    def classify(self, pages: Iterable[str]) -> Classification:
+        folded = fold_keywords(" ".join(pages))
+        found = {self._whitespace.sub(' ', match) for match in self._pattern.findall(folded)}
+
+        scores = {doc_type: 0 for doc_type in self.order}
+        for phrase in found:
+            for doc_type, weight in self._weights[phrase].items():
+                scores[doc_type] += weight
+
+        best = max(self.order, key=lambda doc_type: scores[doc_type])
+        if scores[best] < self.min_scores[best]:
+            return Classification(None, scores[best], scores)
+        return Classification(best, scores[best], scores)
+
+_classifier: Optional[DocumentClassifier] = None
+
+def get_document_classifier() -> DocumentClassifier:
+    """Süreç genelinde paylaşılan sınıflandırıcı (regex bir kez derlenir)"""
+    global _classifier
+    if _classifier is None:
+        _classifier = DocumentClassifier()
+    return _classifier
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class ExtractionRejectedError(Exception):
+    """Kapasite dolu olduğu için reddedilen iş"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class ExtractionQueueFullError(ExtractionRejectedError):
+    """Genel kuyruk dolu (503)"""
+
+class UserQuotaExceededError(ExtractionRejectedError):
+    """Kullanıcının eşzamanlı iş kotası dolu (429)"""
+
+class _Job:
+    __slots__ = ('user_id', 'fn', 'args', 'future', 'pool_future', 'submitted_at', 'started_at')
+
+    def __init__(self, user_id: Any, fn: Callable, args: tuple, future: asyncio.Future):
+        self.user_id = user_id
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.pool_future: Optional[asyncio.Future] = None
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+
+class PDFExtractionExecutor:
+    """
+    CPU ağırlıklı PDF işlemlerini event loop dışında çalıştıran sınırlı executor.
+
+    İşler kullanıcı bazında ayrı kuyruklarda bekler ve boşalan worker'lara
+    kullanıcılar arasında sırayla (round-robin) dağıtılır; böylece çok dosya
+    gönderen bir kullanıcı diğerlerini bekletmez. Bu metodlar yalnızca event
+    loop thread'inden çağrılır, sayaçlar için kilit gerekmez.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, max_per_user: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-extract")
+        self._queues: "OrderedDict[Any, deque]" = OrderedDict()
+        self._per_user: Dict[Any, int] = defaultdict(int)
+        self._queued = 0
+        self._running = 0
+
+        self._queue_depth = metrics.gauge("pdf_extraction.queue_depth")
+        self._in_flight = metrics.gauge("pdf_extraction.in_flight")
+        self._wait_time = metrics.histogram("pdf_extraction.wait_seconds")
+        self._run_time = metrics.histogram("pdf_extraction.run_seconds")
+        self._rejected_queue_full = metrics.counter("pdf_extraction.rejected.queue_full")
+        self._rejected_user_quota = metrics.counter("pdf_extraction.rejected.user_quota")
+
+    def ensure_capacity(self, user_id: Any):
+        """Yeni iş kabul edilemiyorsa hemen hata fırlat"""
+        if self._per_user.get(user_id, 0) >= self.max_per_user:
+            self._rejected_user_quota.inc()
+            raise UserQuotaExceededError(
+                f"Kullanıcı başına en fazla {self.max_per_user} eşzamanlı PDF işlenebilir",
+                retry_after=2
+            )
+
+        if self._running >= self.max_workers and self._queued >= self.max_queue:
+            self._rejected_queue_full.inc()
+            raise ExtractionQueueFullError(
+                "PDF işleme kuyruğu dolu, lütfen daha sonra tekrar deneyin",
+                retry_after=5
+            )
+
+    async def submit(self, user_id: Any, fn: Callable, *args,
+                     cancel_event: Optional[threading.Event] = None) -> Any:
+        """
+        İşi kuyruğa al ve sonucunu bekle.
+
+        Bekleyen görev iptal edilirse iş kuyruktaysa çıkarılır; worker'da
+        çalışıyorsa cancel_event set edilir (fn bunu izleyip erken dönebilir)
+        ve kullanıcı kotası worker iş bitene kadar tutulur.
+        """
+        self.ensure_capacity(user_id)
+
+        loop = asyncio.get_running_loop()
+        job = _Job(user_id, fn, args, loop.create_future())
+
+        self._per_user[user_id] += 1
+        self._queues.setdefault(user_id, deque()).append(job)
+        self._queued += 1
+        self._update_gauges()
+        self._dispatch(loop)
+
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            if job.pool_future is not None:
+                if cancel_event is not None:
+                    cancel_event.set()
+                await self._wait_for_worker(job)
+            raise
+        finally:
+            if job.started_at is None:
+                # İstemci beklerken iptal edildi, kuyruktan çıkar
+                self._remove_queued(job)
+            self._per_user[user_id] -= 1
+            if self._per_user[user_id] <= 0:
+                del self._per_user[user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'max_per_user': self.max_per_user,
+            'running': self._running,
+            'queued': self._queued,
+            'active_users': len(self._per_user)
+        }
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        while self._running < self.max_workers and self._queues:
+            user_id, queue = next(iter(self._queues.items()))
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user_id)
+            else:
+                del self._queues[user_id]
+
+            self._queued -= 1
+            self._running += 1
+            job.started_at = time.monotonic()
+            self._wait_time.observe(job.started_at - job.submitted_at)
+
+            job.pool_future = loop.run_in_executor(self._pool, job.fn, *job.args)
+            job.pool_future.add_done_callback(partial(self._on_done, job, loop))
+
+        self._update_gauges()
+
+    def _on_done(self, job: _Job, loop: asyncio.AbstractEventLoop, pool_future: asyncio.Future):
+        self._running -= 1
+        self._run_time.observe(time.monotonic() - job.started_at)
+
+        if not job.future.done():
+            if pool_future.cancelled():
+                job.future.cancel()
+            elif pool_future.exception() is not None:
+                job.future.set_exception(pool_future.exception())
+            else:
+                job.future.set_result(pool_future.result())
+
+        self._dispatch(loop)
+
+    async def _wait_for_worker(self, job: _Job):
+        # Thread iptal edilemez; tekrar gelen iptaller de worker bitene kadar beklemeyi kesmez
+        while not job.pool_future.done():
+            try:
+                await asyncio.wait({job.pool_future})
+            except asyncio.CancelledError:
+                pass
+
+    def _remove_queued(self, job: _Job):
+        queue = self._queues.get(job.user_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(job)
+        except ValueError:
+            return
+        self._queued -= 1
+        if not queue:
+            del self._queues[job.user_id]
+        self._update_gauges()
+
+    def _update_gauges(self):
+        self._queue_depth.set(self._queued)
+        self._in_flight.set(self._running)
+
+_executor: Optional[PDFExtractionExecutor] = None
+
+def get_pdf_executor() -> PDFExtractionExecutor:
+    """Süreç genelinde paylaşılan executor"""
+    global _executor
+    if _executor is None:
+        _executor = PDFExtractionExecutor(
+            max_workers=settings.PDF_EXTRACTION_WORKERS,
+            max_queue=settings.PDF_EXTRACTION_QUEUE_SIZE,
+            max_per_user=settings.PDF_EXTRACTION_MAX_PER_USER
+        )
+        logger.info(f"PDF extraction executor started: {_executor.stats()}")
+    return _executor
@@ -1,118 +1,530 @@
-import PyPDF2
 import re
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import time
+import heapq
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Tuple, Union, Set
 import logging
-from io import BytesIO
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.number_parser import parse_number, split_label_and_numbers
+from app.services.account_mapping import get_account_mapper
+from app.services.pdf_backends import BackendSelector, PDFDocument, get_backend_selector, source_size
+from app.services.pdf_classifier import (
+    CLASSIFY_PAGES,
+    KEYWORD_FOLD,
+    KURUMLAR_VERGISI,
+    KDV,
+    BILANCO,
+    Classification,
+    get_document_classifier
+)
 
 logger = logging.getLogger(__name__)
 
+# Ham içerik akışındaki metin parçaları için (ilk geçiş)
+_TJ_KERNING_PATTERN = re.compile(rb'\)\s*(?:-?\d*\.?\d+)?\s*\(')
+_LITERAL_STRING_PATTERN = re.compile(rb'\(((?:\\.|[^\\)])*)\)')
+_LITERAL_ESCAPE_PATTERN = re.compile(rb'\\([0-7]{1,3}|.)', re.DOTALL)
+_LITERAL_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+# Tablolar arasına giren sayfa numarası satırları
+_PAGE_FOOTER_PATTERN = re.compile(r'Sayfa\s+\d+(?:\s*/\s*\d+)?$', re.IGNORECASE)
+
+# Zamanlama modunda loglanacak en yavaş sayfa sayısı
+SLOW_PAGES_LOGGED = 5
+
+class StageTimer:
+    """
+    Çıkarma aşamalarının süreleri (saniye).
+    
+    Aşamalar: open (PDF ayrıştırma), classification (ilk sayfalardan belge
+    türü), page_index (ham içerikten sayfa indeksi),
+    text_extraction (seçilen sayfaların metni), text_assembly, company_info,
+    tables, account_mapping. Süreler metadata['timings'] altına yazılır ve
+    süreç genelindeki aşama histogramlarına eklenir.
+    """
+    
+    def __init__(self, record_pages: bool = False):
+        self.timings: Dict[str, float] = {}
+        self.record_pages = record_pages
+        self.page_timings: List[Tuple[float, int]] = []
+        self._started = time.perf_counter()
+    
+    def add(self, stage: str, seconds: float):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+    
+    def add_page(self, page_num: int, seconds: float):
+        if self.record_pages:
+            self.page_timings.append((seconds, page_num))
+    
+    def slowest_pages(self, limit: int = SLOW_PAGES_LOGGED) -> List[Dict[str, Any]]:
+        return [
+            {'page': page_num + 1, 'seconds': round(seconds, 6)}
+            for seconds, page_num in heapq.nlargest(limit, self.page_timings)
+        ]
+    
+    def finish(self) -> Dict[str, float]:
+        """Toplam süreyi ekle ve yuvarlanmış süreleri döndür"""
+        self.timings['total'] = time.perf_counter() - self._started
+        return {stage: round(seconds, 6) for stage, seconds in self.timings.items()}
+
+def record_extraction_metrics(metadata: Dict[str, Any]):
+    """
+    Çıkarma metadata'sını süreç genelindeki metriklere ekle.
+    
+    Sandbox'ta çalışan çıkarmalarda alt sürecin metrikleri kaybolur; bu
+    yüzden sonuç üst sürece döndüğünde de aynı fonksiyon çağrılır.
+    """
+    for stage, seconds in metadata.get('timings', {}).items():
+        metrics.histogram(f"pdf_extraction.stage.{stage}_seconds").observe(seconds)
+    metrics.counter("pdf_extraction.pages_processed").inc(metadata.get('page_count', 0))
+    metrics.counter("pdf_extraction.bytes_processed").inc(metadata.get('bytes_processed', 0))
+
+class PageText:
+    """Seçilen sayfaların birleştirilmiş metni ve sayfa sınırları"""
+    
+    def __init__(self, page_count: int, backend: str = "", classification: Optional[Classification] = None):
+        self.page_count = page_count
+        self.backend = backend
+        self.classification = classification
+        self.pages: List[int] = []
+        self._starts: List[int] = []
+        self._parts: List[str] = []
+        self._length = 0
+    
+    def add_page(self, page_number: int, text: str):
+        self._starts.append(self._length)
+        self.pages.append(page_number)
+        part = text + "\n"
+        self._parts.append(part)
+        self._length += len(part)
+    
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+    
+    def page_at(self, offset: int) -> int:
+        """Metin konumunun geldiği sayfa (1'den başlar)"""
+        index = max(bisect_right(self._starts, offset) - 1, 0)
+        return self.pages[index] + 1 if self.pages else 0
+
 class TurkishTaxPDFExtractor:
     """
     Türk Kurumlar Vergisi Beyannamesi PDF'lerinden mali veri çıkarma sınıfı
+    
+    İlk sayfalardan belge türü tahmin edilir; başka bir türdeki belge o türün
+    extractor'ına (EXTRACTORS) yönlendirilir, türü bilinmeyen belge tam
+    taramaya girmeden reddedilir.
     """
     
-    def __init__(self):
-        # Tablo başlıkları ve anahtar kelimeler
-        self.table_patterns = {
-            'ilaveler': [
-                r'İLAVELER',
-                r'EKLENEN\s+TUTARLAR',
-                r'İLAVE\s+EDİLEN'
-            ],
-            'vergi_bildirimi': [
-                r'VERGİ\s+BİLDİRİMİ',
-                r'BEYAN\s+EDİLEN',
-                r'VERGİ\s+MATRAH'
-            ],
-            'mahsup_vergiler': [
-                r'MAHSUP\s+EDİLECEK\s+VERGİLER',
-                r'MAHSUP\s+VERGİ',
-                r'KESİNTİ\s+VE\s+MAHSUP'
-            ],
-            'aktif': [
-                r'AKTİF',
-                r'VARLIKLAR',
-                r'DÖNEN\s+VARLIKLAR',
-                r'DURAN\s+VARLIKLAR'
-            ],
-            'pasif': [
-                r'PASİF',
-                r'KAYNAKLAR',
-                r'YABANCI\s+KAYNAKLAR',
-                r'ÖZKAYNAKLAR'
-            ],
-            'gelir_tablosu': [
-                r'GELİR\s+TABLOSU',
-                r'KAPSAMLI\s+GELİR',
-                r'NET\s+SATIŞ',
-                r'BRÜT\s+SATIŞ'
-            ]
-        }
+    # Çıkarma sonucunu etkileyen her değişiklikte artırılmalı (önbellek anahtarı)
+    VERSION = "1.4"
+    
+    # Tam metin çıkarılacak en fazla sayfa sayısı
+    DEFAULT_PAGE_BUDGET = 50
+    
+    # Tek bir tablo için taranacak en fazla karakter
+    MAX_TABLE_CHARS = 10000
+    
+    # Sınıflandırıcının bu extractor'a yönlendirdiği belge türü
+    DOCUMENT_TYPE = KURUMLAR_VERGISI
+    
+    # Tablo başlıkları ve anahtar kelimeler
+    TABLE_PATTERNS: Dict[str, List[str]] = {
+        'ilaveler': [
+            r'İLAVELER',
+            r'EKLENEN\s+TUTARLAR',
+            r'İLAVE\s+EDİLEN'
+        ],
+        'vergiBildirimi': [
+            r'VERGİ\s+BİLDİRİMİ',
+            r'BEYAN\s+EDİLEN',
+            r'VERGİ\s+MATRAH'
+        ],
+        'mahsupVergiler': [
+            r'MAHSUP\s+EDİLECEK\s+VERGİLER',
+            r'MAHSUP\s+VERGİ',
+            r'KESİNTİ\s+VE\s+MAHSUP'
+        ],
+        'aktif': [
+            r'AKTİF',
+            r'VARLIKLAR',
+            r'DÖNEN\s+VARLIKLAR',
+            r'DURAN\s+VARLIKLAR'
+        ],
+        'pasif': [
+            r'PASİF',
+            r'KAYNAKLAR',
+            r'YABANCI\s+KAYNAKLAR',
+            r'ÖZKAYNAKLAR'
+        ],
+        'gelirTablosu': [
+            r'GELİR\s+TABLOSU',
+            r'KAPSAMLI\s+GELİR',
+            r'NET\s+SATIŞ',
+            r'BRÜT\s+SATIŞ'
+        ]
+    }
+    
+    # Firma bilgileri için regex pattern'ları
+    COMPANY_PATTERNS: Dict[str, str] = {
+        'tax_id': r'(?:VKN|Vergi\s+Kimlik\s+No|Tax\s+ID)[\s:]*(\d{10})',
+        'email': r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+        'trade_registry': r'(?:Ticaret\s+Sicil\s+No|Trade\s+Registry)[\s:]*(\d+)',
+        'commercial_profit': r'(?:Ticari\s+Bilanço\s+Karı|Commercial\s+Profit)[\s:]*([0-9.,]+)'
+    }
+    
+    def __init__(
+        self,
+        page_budget: Optional[int] = None,
+        backend: Optional[str] = None,
+        timing_debug: Optional[bool] = None
+    ):
+        self.page_budget = page_budget or self.DEFAULT_PAGE_BUDGET
         
-        # Firma bilgileri için regex pattern'ları
-        self.company_patterns = {
-            'tax_id': r'(?:VKN|Vergi\s+Kimlik\s+No|Tax\s+ID)[\s:]*(\d{10})',
-            'email': r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            'trade_registry': r'(?:Ticaret\s+Sicil\s+No|Trade\s+Registry)[\s:]*(\d+)',
-            'commercial_profit': r'(?:Ticari\s+Bilanço\s+Karı|Commercial\s+Profit)[\s:]*([0-9.,]+)'
-        }
+        # Açıksa sayfa başına süre ölçülür ve en yavaş sayfalar loglanır
+        self.timing_debug = settings.PDF_TIMING_DEBUG if timing_debug is None else timing_debug
+        
+        # Metin motoru: verilmezse kurulu motorlar ve benchmark profiline göre seçilir
+        self.backend_selector = BackendSelector(forced=backend) if backend else get_backend_selector()
+        
+        # Belge türüne özgü pattern'lar (alt sınıflar kendi kümelerini tanımlar)
+        self.table_patterns = self.TABLE_PATTERNS
+        self.company_patterns = self.COMPANY_PATTERNS
         
         # Sayısal değer çıkarma için pattern
         self.number_pattern = r'([0-9.,]+(?:\.\d{2})?)'
         
-    def extract_financial_data(self, pdf_content: bytes) -> Dict[str, Any]:
+        # Tablo sonu: başka bir bölümün yalnızca başlıktan oluşan satırı
+        self.heading_lines = {
+            section: re.compile(
+                r'^[^\S\n]*(?:' + '|'.join(patterns) + r')[^\d\n]*$',
+                re.IGNORECASE | re.MULTILINE
+            )
+            for section, patterns in self.table_patterns.items()
+        }
+        
+        # Sayfa indeksi için bölüm anahtar kelimeleri (ASCII'ye indirgenmiş)
+        self.page_keywords = {
+            section: re.compile('|'.join(p.translate(KEYWORD_FOLD) for p in patterns), re.IGNORECASE)
+            for section, patterns in self.table_patterns.items()
+        }
+        self.page_keywords['company'] = re.compile(
+            r'VKN|VERGI\s+KIMLIK|TAX\s+ID|TICARET\s+SICIL|TICARI\s+BILANCO', re.IGNORECASE
+        )
+    
+    @property
+    def cache_version(self) -> str:
+        """Önbellek anahtarı için sürüm (sonucu etkileyen ayarlar dahil)"""
+        return f"{self.VERSION}-p{self.page_budget}-{self.backend_selector.signature}"
+        
+    def extract_financial_data(
+        self,
+        pdf_source: Union[bytes, str],
+        classification: Optional[Classification] = None
+    ) -> Dict[str, Any]:
         """
-        PDF'den mali verileri çıkar
+        PDF'den mali verileri çıkar (bayt içeriği veya dosya yolu)
+        
+        classification yönlendiren extractor'dan gelir; verilirse belge
+        yeniden sınıflandırılmaz.
         """
+        timer = StageTimer(record_pages=self.timing_debug)
+        bytes_processed = 0
+        
         try:
-            # PDF'i oku
-            pdf_text = self._extract_text_from_pdf(pdf_content)
+            bytes_processed = source_size(pdf_source)
+            
+            # PDF'i oku (yalnızca ilgili sayfalar)
+            document = self._extract_text_from_pdf(pdf_source, timer, classification)
+            if document.classification.document_type != self.DOCUMENT_TYPE:
+                return self._route(pdf_source, document, timer, bytes_processed)
+            
+            with timer.stage('text_assembly'):
+                pdf_text = document.text
+            
+            provenance = {'companyInfo': {}, 'tables': {}}
             
             # Firma bilgilerini çıkar
-            company_info = self._extract_company_info(pdf_text)
+            with timer.stage('company_info'):
+                company_info = self._extract_company_info(pdf_text, document, provenance['companyInfo'])
             
             # Tabloları çıkar
-            tables = self._extract_tables(pdf_text)
+            with timer.stage('tables'):
+                tables = self._extract_tables(pdf_text, document, provenance['tables'])
+            
+            # Satırları Tekdüzen hesap kodlarına eşle
+            with timer.stage('account_mapping'):
+                accounts, unmapped_rows = self._map_accounts(tables)
+            
+            timings = timer.finish()
+            metadata = {
+                'extraction_date': self._get_current_timestamp(),
+                'total_tables_found': len([t for t in tables.values() if t]),
+                'unmapped_rows': unmapped_rows,
+                'text_length': len(pdf_text),
+                'page_count': document.page_count,
+                'bytes_processed': bytes_processed,
+                'pages_extracted': [page + 1 for page in document.pages],
+                'pages_skipped': document.page_count - len(document.pages),
+                'text_backend': document.backend,
+                'document_type': self.DOCUMENT_TYPE,
+                'classification_scores': document.classification.scores,
+                'timings': timings
+            }
+            if self.timing_debug:
+                metadata['slow_pages'] = self._log_slow_pages(timer, document, timings)
+            record_extraction_metrics(metadata)
             
             return {
                 'success': True,
                 'companyInfo': company_info,
                 'tables': tables,
-                'metadata': {
-                    'extraction_date': self._get_current_timestamp(),
-                    'total_tables_found': len([t for t in tables.values() if t]),
-                    'text_length': len(pdf_text)
-                }
+                'accounts': accounts,
+                'provenance': provenance,
+                'metadata': metadata
             }
             
+        except MemoryError:
+            raise
         except Exception as e:
             logger.error(f"PDF extraction error: {str(e)}")
+            metadata = {
+                'bytes_processed': bytes_processed,
+                'timings': timer.finish()
+            }
+            record_extraction_metrics(metadata)
             return {
                 'success': False,
                 'error': str(e),
                 'companyInfo': {},
-                'tables': {}
+                'tables': {},
+                'metadata': metadata
             }
     
-    def _extract_text_from_pdf(self, pdf_content: bytes) -> str:
-        """PDF'den metin çıkar"""
+    def _route(
+        self,
+        pdf_source: Union[bytes, str],
+        document: PageText,
+        timer: StageTimer,
+        bytes_processed: int
+    ) -> Dict[str, Any]:
+        """Belgeyi türünün extractor'ına devret ya da erken reddet"""
+        classification = document.classification
+        
+        if classification.document_type is None:
+            metadata = {
+                'page_count': document.page_count,
+                'bytes_processed': bytes_processed,
+                'text_backend': document.backend,
+                'document_type': None,
+                'classification_scores': classification.scores,
+                'timings': timer.finish()
+            }
+            record_extraction_metrics(metadata)
+            metrics.counter("pdf_extraction.rejected_unknown_type").inc()
+            logger.info(f"PDF rejected, unknown document type (scores: {classification.scores})")
+            return {
+                'success': False,
+                'error': 'Desteklenmeyen belge türü: kurumlar vergisi, KDV beyannamesi veya bilanço bekleniyor',
+                'companyInfo': {},
+                'tables': {},
+                'metadata': metadata
+            }
+        
+        extractor = get_extractor_class(classification.document_type)(
+            page_budget=self.page_budget,
+            timing_debug=self.timing_debug
+        )
+        extractor.backend_selector = self.backend_selector
+        metrics.counter(f"pdf_extraction.routed.{classification.document_type}").inc()
+        
+        result = extractor.extract_financial_data(pdf_source, classification)
+        # İlk açma ve sınıflandırma süresi yönlendirilen çıkarmaya eklenir
+        result['metadata'].setdefault('timings', {})['routing'] = round(timer.finish()['total'], 6)
+        return result
+    
+    def _log_slow_pages(
+        self,
+        timer: StageTimer,
+        document: PageText,
+        timings: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """En yavaş sayfaları ve aşama sürelerini logla"""
+        slow_pages = timer.slowest_pages()
+        stages = ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in timings.items())
+        pages = ", ".join(f"p{page['page']}={page['seconds'] * 1000:.1f}ms" for page in slow_pages)
+        logger.info(
+            f"PDF timings ({document.backend}, {document.page_count} pages): {stages}; slowest pages: {pages}"
+        )
+        return slow_pages
+    
+    def _extract_text_from_pdf(
+        self,
+        pdf_source: Union[bytes, str],
+        timer: Optional[StageTimer] = None,
+        classification: Optional[Classification] = None
+    ) -> PageText:
+        """
+        PDF'den metin çıkar.
+        
+        Önce ilk sayfalardan belge türü belirlenir; tür bu extractor'a ait
+        değilse yalnızca sınıflandırma döner (sayfa metni çıkarılmaz). Sonra
+        her sayfanın ham içerik akışından ucuz bir anahtar kelime indeksi
+        kurulur, ardından yalnızca bir bölümle eşleşen sayfalar sayfa bütçesi
+        dahilinde seçilen metin motoruyla tam olarak çıkarılır.
+        """
+        timer = timer or StageTimer()
+        
         try:
-            pdf_file = BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            backend = self.backend_selector.select(pdf_source)
+            
+            opened = time.perf_counter()
+            with backend.open(pdf_source) as pdf:
+                timer.add('open', time.perf_counter() - opened)
+                
+                # Sınıflandırmada tam çıkarılan sayfalar tekrar çıkarılmaz
+                extracted: Dict[int, str] = {}
+                if classification is None:
+                    with timer.stage('classification'):
+                        classification = self._classify(pdf, extracted)
+                
+                document = PageText(pdf.page_count, backend.name, classification)
+                if classification.document_type != self.DOCUMENT_TYPE:
+                    return document
+                
+                with timer.stage('page_index'):
+                    page_index = [self._index_page(pdf.raw_content(page_num)) for page_num in range(pdf.page_count)]
+                    selected = self._select_pages(page_index)
+                
+                with timer.stage('text_extraction'):
+                    if timer.record_pages:
+                        for page_num in selected:
+                            started = time.perf_counter()
+                            document.add_page(page_num, extracted.get(page_num) or pdf.extract_text(page_num))
+                            timer.add_page(page_num, time.perf_counter() - started)
+                    else:
+                        for page_num in selected:
+                            document.add_page(page_num, extracted.get(page_num) or pdf.extract_text(page_num))
             
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
+            if len(selected) < len(page_index):
+                logger.info(f"PDF page index: extracted {len(selected)} of {len(page_index)} pages")
             
-            return text
+            return document
             
+        except MemoryError:
+            # Kaynak sınırı PDF hatası değildir; sandbox ayrı raporlar
+            raise
         except Exception as e:
             raise Exception(f"PDF okuma hatası: {str(e)}")
     
-    def _extract_company_info(self, text: str) -> Dict[str, Any]:
-        """Firma bilgilerini çıkar"""
+    def _classify(self, pdf: PDFDocument, extracted: Dict[int, str]) -> Classification:
+        """İlk CLASSIFY_PAGES sayfadan belge türünü belirle"""
+        pages = []
+        for page_num in range(min(CLASSIFY_PAGES, pdf.page_count)):
+            text = self._cheap_page_text(pdf.raw_content(page_num))
+            if text is None:
+                # Hex/CID kodlu sayfa: metin motoruyla çıkar, sonra yeniden kullan
+                text = extracted[page_num] = pdf.extract_text(page_num)
+            pages.append(text)
+        
+        classification = get_document_classifier().classify(pages)
+        if classification.document_type is None and not settings.PDF_REJECT_UNKNOWN_DOCUMENTS:
+            # Reddetme kapalı: bilinmeyen belge bu extractor'ın şemasıyla denenir
+            return classification._replace(document_type=self.DOCUMENT_TYPE)
+        return classification
+    
+    def _index_page(self, raw_content: Optional[bytes]) -> Optional[Set[str]]:
+        """Sayfada geçen bölümleri bul; metin okunamıyorsa None"""
+        text = self._cheap_page_text(raw_content)
+        if text is None:
+            return None
+        
+        folded = text.upper().translate(KEYWORD_FOLD)
+        return {section for section, pattern in self.page_keywords.items() if pattern.search(folded)}
+    
+    def _cheap_page_text(self, raw_content: Optional[bytes]) -> Optional[str]:
+        """Font çözümlemesi yapmadan içerik akışındaki metin parçalarını topla"""
+        if raw_content is None:
+            return None
+        if not raw_content:
+            return ""
+        
+        data = _TJ_KERNING_PATTERN.sub(b'', raw_content)
+        strings = _LITERAL_STRING_PATTERN.findall(data)
+        if not strings:
+            # Hex/CID kodlu metin: içerik bilinmiyor
+            return None
+        
+        return " ".join(self._decode_literal(raw) for raw in strings)
+    
+    def _decode_literal(self, raw: bytes) -> str:
+        """PDF metin dizisindeki kaçış karakterlerini çöz"""
+        def replace(match):
+            escape = match.group(1)
+            if escape[:1].isdigit():
+                return bytes([int(escape, 8) & 0xFF])
+            return _LITERAL_ESCAPES.get(escape, escape)
+        
+        # Türkçe karakterler genellikle Windows-1254 konumlarında
+        return _LITERAL_ESCAPE_PATTERN.sub(replace, raw).decode('cp1254', errors='replace')
+    
+    def _select_pages(self, page_index: List[Optional[Set[str]]]) -> List[int]:
+        """Tam çıkarılacak sayfaları öncelik sırasıyla bütçe dahilinde seç"""
+        page_count = len(page_index)
+        selected: List[int] = []
+        chosen: Set[int] = set()
+        
+        def add(page_num: int):
+            if 0 <= page_num < page_count and page_num not in chosen and len(selected) < self.page_budget:
+                chosen.add(page_num)
+                selected.append(page_num)
+        
+        # İlk sayfa her zaman (firma bilgileri)
+        add(0)
+        
+        # Firma bilgisi geçen sayfalar
+        for page_num, sections in enumerate(page_index):
+            if sections and 'company' in sections:
+                add(page_num)
+        
+        # Tablo başlığı geçen sayfalar
+        table_pages = [
+            page_num for page_num, sections in enumerate(page_index)
+            if sections and sections - {'company'}
+        ]
+        for page_num in table_pages:
+            add(page_num)
+        
+        # Sonraki sayfaya taşan tablolar
+        for page_num in table_pages:
+            add(page_num + 1)
+        
+        # İçeriği ucuz yoldan okunamayan sayfalar
+        for page_num, sections in enumerate(page_index):
+            if sections is None:
+                add(page_num)
+        
+        return sorted(selected)
+    
+    def _extract_company_info(
+        self,
+        text: str,
+        document: Optional[PageText] = None,
+        provenance: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Firma bilgilerini çıkar (kaynak sayfalar provenance'a yazılır)"""
         company_info = {
             'taxId': '',
             'email': '',
@@ -125,43 +537,47 @@ class TurkishTaxPDFExtractor:
             tax_match = re.search(self.company_patterns['tax_id'], text, re.IGNORECASE)
             if tax_match:
                 company_info['taxId'] = tax_match.group(1)
+                self._record_page(provenance, 'taxId', document, tax_match.start())
             
             # E-posta çıkar
             email_match = re.search(self.company_patterns['email'], text, re.IGNORECASE)
             if email_match:
                 company_info['email'] = email_match.group(1)
+                self._record_page(provenance, 'email', document, email_match.start())
             
             # Ticaret sicil no çıkar
             trade_match = re.search(self.company_patterns['trade_registry'], text, re.IGNORECASE)
             if trade_match:
                 company_info['tradeRegistryNo'] = trade_match.group(1)
+                self._record_page(provenance, 'tradeRegistryNo', document, trade_match.start())
             
-            # Ticari bilanço karı çıkar
-            profit_match = re.search(self.company_patterns['commercial_profit'], text, re.IGNORECASE)
+            # Ticari bilanço karı çıkar (yalnızca beyannamede bulunur)
+            profit_pattern = self.company_patterns.get('commercial_profit')
+            profit_match = re.search(profit_pattern, text, re.IGNORECASE) if profit_pattern else None
             if profit_match:
-                profit_str = profit_match.group(1).replace(',', '').replace('.', '')
-                company_info['commercialProfit'] = float(profit_str) if profit_str.isdigit() else 0
+                profit = parse_number(profit_match.group(1).rstrip('.,'))
+                company_info['commercialProfit'] = profit if profit is not None else 0
+                self._record_page(provenance, 'commercialProfit', document, profit_match.start())
                 
         except Exception as e:
             logger.warning(f"Firma bilgileri çıkarma hatası: {str(e)}")
         
         return company_info
     
-    def _extract_tables(self, text: str) -> Dict[str, Dict[str, float]]:
+    def _extract_tables(
+        self,
+        text: str,
+        document: Optional[PageText] = None,
+        provenance: Optional[Dict[str, Dict[str, int]]] = None
+    ) -> Dict[str, Dict[str, float]]:
         """Tabloları çıkar"""
-        tables = {
-            'ilaveler': {},
-            'vergiBildirimi': {},
-            'mahsupVergiler': {},
-            'aktif': {},
-            'pasif': {},
-            'gelirTablosu': {}
-        }
+        tables = {table_name: {} for table_name in self.table_patterns}
         
         try:
             # Her tablo türü için çıkarma yap
             for table_name, patterns in self.table_patterns.items():
-                table_data = self._extract_table_data(text, patterns)
+                table_provenance = provenance.setdefault(table_name, {}) if provenance is not None else None
+                table_data = self._extract_table_data(text, patterns, document, table_provenance, table_name)
                 tables[table_name] = table_data
                 
         except Exception as e:
@@ -169,7 +585,14 @@ class TurkishTaxPDFExtractor:
         
         return tables
     
-    def _extract_table_data(self, text: str, patterns: List[str]) -> Dict[str, float]:
+    def _extract_table_data(
+        self,
+        text: str,
+        patterns: List[str],
+        document: Optional[PageText] = None,
+        provenance: Optional[Dict[str, int]] = None,
+        table_name: Optional[str] = None
+    ) -> Dict[str, float]:
         """Belirli bir tablo türü için veri çıkar"""
         table_data = {}
         
@@ -185,15 +608,14 @@ class TurkishTaxPDFExtractor:
             if table_start is None:
                 return table_data
             
-            # Tablo sonunu bul (bir sonraki büyük başlık veya sayfa sonu)
-            table_end = self._find_table_end(text, table_start)
+            # Tablo sonunu bul (bir sonraki bölüm başlığı)
+            table_end = self._find_table_end(text, table_start, table_name)
             table_text = text[table_start:table_end]
             
             # Satırları işle
-            lines = table_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
+            for line_match in re.finditer(r'[^\n]+', table_text):
+                line = line_match.group(0).strip()
+                if not line or _PAGE_FOOTER_PATTERN.match(line):
                     continue
                 
                 # Satırda hem metin hem sayı var mı kontrol et
@@ -201,30 +623,37 @@ class TurkishTaxPDFExtractor:
                     key, value = self._parse_table_row(line)
                     if key and value is not None:
                         table_data[key] = value
+                        self._record_page(provenance, key, document, table_start + line_match.start())
                         
         except Exception as e:
             logger.warning(f"Tablo veri çıkarma hatası: {str(e)}")
         
         return table_data
     
-    def _find_table_end(self, text: str, start_pos: int) -> int:
-        """Tablo sonunu bul"""
-        # Sonraki büyük başlıkları ara
-        end_patterns = [
-            r'\n[A-ZÜĞŞÇÖI]{3,}',  # Büyük harfli başlıklar
-            r'\nSayfa\s+\d+',      # Sayfa numaraları
-            r'\n\s*\n\s*[A-ZÜĞŞÇÖI]{3,}',  # Boş satır sonrası başlık
-        ]
+    def _find_table_end(self, text: str, start_pos: int, table_name: Optional[str] = None) -> int:
+        """Tablo sonunu bul (başka bir bölümün başlık satırı)"""
+        min_end = min(len(text), start_pos + self.MAX_TABLE_CHARS)
         
-        min_end = len(text)
-        for pattern in end_patterns:
-            match = re.search(pattern, text[start_pos:], re.IGNORECASE)
+        for section, heading in self.heading_lines.items():
+            if section == table_name:
+                continue
+            match = heading.search(text, start_pos, min_end)
             if match:
-                end_pos = start_pos + match.start()
-                min_end = min(min_end, end_pos)
+                min_end = match.start()
+        
+        return min_end
+    
+    def _map_accounts(self, tables: Dict[str, Dict[str, float]]) -> Tuple[Dict[str, Dict[str, float]], int]:
+        """Mali tabloları kanonik hesap kodlarına çevir"""
+        mapper = get_account_mapper()
+        accounts = {}
+        unmapped_rows = 0
+        
+        for section in ('aktif', 'pasif', 'gelirTablosu'):
+            accounts[section], unmapped = mapper.map_table(section, tables.get(section, {}))
+            unmapped_rows += len(unmapped)
         
-        # Maksimum 2000 karakter al (çok uzun tabloları önlemek için)
-        return min(min_end, start_pos + 2000)
+        return accounts, unmapped_rows
     
     def _contains_financial_data(self, line: str) -> bool:
         """Satırda finansal veri var mı kontrol et"""
@@ -241,30 +670,18 @@ class TurkishTaxPDFExtractor:
     def _parse_table_row(self, line: str) -> Tuple[Optional[str], Optional[float]]:
         """Tablo satırını anahtar-değer çiftine çevir"""
         try:
-            # Sayıları bul
-            numbers = re.findall(r'([0-9.,]+)', line)
+            # Etiketi ve tutarları tek geçişte ayır (Türkçe sayı biçimi)
+            label, numbers = split_label_and_numbers(line)
             if not numbers:
                 return None, None
             
-            # En büyük sayıyı al (genellikle ana tutar)
-            max_number = 0
-            for num_str in numbers:
-                try:
-                    # Türk sayı formatını temizle
-                    clean_num = num_str.replace(',', '').replace('.', '')
-                    if clean_num.isdigit():
-                        num_value = float(clean_num)
-                        if num_value > max_number:
-                            max_number = num_value
-                except:
-                    continue
-            
+            # Mutlak değerce en büyük sayıyı al (genellikle ana tutar)
+            max_number = max(numbers, key=abs)
             if max_number == 0:
                 return None, None
             
-            # Anahtar metni çıkar (sayıları çıkararak)
-            key_text = re.sub(r'[0-9.,\s]+', ' ', line).strip()
-            key_text = re.sub(r'\s+', ' ', key_text)  # Çoklu boşlukları tek yap
+            # Anahtar metni sadeleştir
+            key_text = re.sub(r'[0-9.,\s]+', ' ', label).strip()
             
             # Çok kısa veya çok uzun anahtarları atla
             if len(key_text) < 3 or len(key_text) > 100:
@@ -276,11 +693,77 @@ class TurkishTaxPDFExtractor:
             logger.warning(f"Satır işleme hatası: {str(e)}")
             return None, None
     
+    def _record_page(
+        self,
+        provenance: Optional[Dict[str, int]],
+        key: str,
+        document: Optional[PageText],
+        offset: int
+    ):
+        """Değerin bulunduğu sayfayı kaydet"""
+        if provenance is not None and document is not None:
+            provenance[key] = document.page_at(offset)
+    
     def _get_current_timestamp(self) -> str:
         """Şu anki zaman damgası"""
         from datetime import datetime
         return datetime.now().isoformat()
 
+class KDVDeclarationExtractor(TurkishTaxPDFExtractor):
+    """
+    KDV beyannamesi: matrah, hesaplanan KDV, indirimler ve sonuç tabloları
+    """
+    
+    DOCUMENT_TYPE = KDV
+    
+    TABLE_PATTERNS: Dict[str, List[str]] = {
+        'matrah': [
+            r'MATRAH',
+            r'TESLİM\s+VE\s+HİZMETLER'
+        ],
+        'hesaplananKdv': [
+            r'HESAPLANAN\s+KDV',
+            r'HESAPLANAN\s+KATMA\s+DEĞER'
+        ],
+        'indirimler': [
+            r'İNDİRİMLER',
+            r'İNDİRİLECEK\s+KDV'
+        ],
+        'sonucHesaplari': [
+            r'SONUÇ\s+HESAPLARI',
+            r'ÖDENMESİ\s+GEREKEN',
+            r'SONRAKİ\s+DÖNEME\s+DEVREDEN'
+        ]
+    }
+    
+    COMPANY_PATTERNS: Dict[str, str] = {
+        name: pattern for name, pattern in TurkishTaxPDFExtractor.COMPANY_PATTERNS.items()
+        if name != 'commercial_profit'
+    }
+
+class BalanceSheetExtractor(TurkishTaxPDFExtractor):
+    """
+    Beyanname dışı bilanço/gelir tablosu çıktıları (yalnızca mali tablolar)
+    """
+    
+    DOCUMENT_TYPE = BILANCO
+    
+    TABLE_PATTERNS: Dict[str, List[str]] = {
+        section: TurkishTaxPDFExtractor.TABLE_PATTERNS[section]
+        for section in ('aktif', 'pasif', 'gelirTablosu')
+    }
+    
+    COMPANY_PATTERNS: Dict[str, str] = KDVDeclarationExtractor.COMPANY_PATTERNS
+
+# Belge türü -> extractor sınıfı
+EXTRACTORS = {
+    extractor.DOCUMENT_TYPE: extractor
+    for extractor in (TurkishTaxPDFExtractor, KDVDeclarationExtractor, BalanceSheetExtractor)
+}
+
+def get_extractor_class(document_type: str) -> type:
+    return EXTRACTORS[document_type]
+
 # Test için örnek kullanım
 def create_sample_extracted_data() -> Dict[str, Any]:
     """Test için örnek çıkarılmış veri"""
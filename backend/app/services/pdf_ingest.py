@@ -0,0 +1,251 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.metrics import metrics
+from app.models.company import Company, CompanyStatus
+from app.models.financial_metric import FinancialMetric
+from app.models.risk_alert import RiskAlert
+from app.models.risk_analysis import RiskAnalysis
+from app.models.user import User
+from app.services.account_mapping import (
+    get_account_mapper,
+    TOTAL_ASSETS,
+    TOTAL_LIABILITIES_AND_EQUITY,
+    NET_SALES,
+    GROSS_PROFIT,
+    OPERATING_PROFIT
+)
+from app.services.alert_service import AlertService
+from app.services.pdf_classifier import KURUMLAR_VERGISI, BILANCO
+from app.services.pdf_validation import validate_financial_data, Accounts
+from app.services.risk_engine import RiskEngine
+
+logger = logging.getLogger(__name__)
+
+INGEST_MODEL_VERSION = "pdf-ingest-1.0"
+
+# Mali tablo içeren, firmaya puan verilebilen belge türleri
+FINANCIAL_DOCUMENT_TYPES = (KURUMLAR_VERGISI, BILANCO)
+
+class IngestError(Exception):
+    """PDF ingest hattında işlem geri alındı"""
+
+class IngestValidationError(IngestError):
+    """Çıkarılan veri doğrulamadan geçmedi (400)"""
+
+    def __init__(self, validation: Dict[str, Any]):
+        super().__init__('; '.join(validation['errors']) or 'Doğrulama başarısız')
+        self.validation = validation
+
+class IngestPermissionError(IngestError):
+    """Firma başka bir bayiye ait (403)"""
+
+def default_period() -> str:
+    """Kurumlar vergisi beyannamesi bir önceki yıl içindir"""
+    return str(datetime.utcnow().year - 1)
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator > 0 else 0.0
+
+def financial_metric_values(accounts: Accounts) -> Dict[str, float]:
+    """Kanonik hesaplardan FinancialMetric alanlarını ve oranlarını hesapla"""
+    aktif = accounts.get('aktif', {})
+    pasif = accounts.get('pasif', {})
+    gelir = accounts.get('gelirTablosu', {})
+
+    current_assets = aktif.get('1', 0.0)
+    total_assets = aktif.get(TOTAL_ASSETS) or current_assets + aktif.get('2', 0.0)
+    current_liabilities = pasif.get('3', 0.0)
+    equity = pasif.get('5', 0.0)
+
+    # Yabancı kaynaklar: grup toplamları yoksa pasif toplamından özkaynak düşülür
+    total_liabilities = current_liabilities + pasif.get('4', 0.0)
+    if not total_liabilities and pasif.get(TOTAL_LIABILITIES_AND_EQUITY):
+        total_liabilities = pasif[TOTAL_LIABILITIES_AND_EQUITY] - equity
+    if not equity and total_assets:
+        equity = total_assets - total_liabilities
+
+    revenue = gelir.get(NET_SALES) or gelir.get('60', 0.0) - gelir.get('61', 0.0)
+    if '692' in gelir:
+        net_income = gelir['692']
+    else:
+        net_income = pasif.get('590', 0.0) - pasif.get('591', 0.0)
+
+    return {
+        'revenue': revenue,
+        'net_income': net_income,
+        'gross_profit': gelir.get(GROSS_PROFIT, 0.0),
+        'operating_income': gelir.get(OPERATING_PROFIT, 0.0),
+        'total_assets': total_assets,
+        'current_assets': current_assets,
+        'total_liabilities': total_liabilities,
+        'current_liabilities': current_liabilities,
+        'equity': equity,
+        'debt_to_equity': _ratio(total_liabilities, equity),
+        'current_ratio': _ratio(current_assets, current_liabilities),
+        'quick_ratio': _ratio(current_assets - aktif.get('15', 0.0), current_liabilities),
+        'roa': _ratio(net_income, total_assets),
+        'roe': _ratio(net_income, equity)
+    }
+
+class PDFIngestPipeline:
+    """
+    Çıkarılmış PDF verisinden puanlanmış firmaya tek işlemde geçiş.
+
+    Doğrulama, firma ve FinancialMetric kaydı (varsa güncelleme), risk
+    puanlaması ve uyarı üretimi aynı oturumda yapılır; ara durum bellekte
+    tutulur ve sonunda tek commit atılır. Herhangi bir adım başarısız olursa
+    işlem geri alınır.
+    """
+
+    def __init__(self, db: Session, user: User, risk_engine: Optional[RiskEngine] = None):
+        self.db = db
+        self.user = user
+        self.risk_engine = risk_engine or RiskEngine()
+        self._duration = metrics.histogram("pdf_ingest.duration_seconds")
+
+    def ingest(
+        self,
+        extracted_data: Dict[str, Any],
+        period: Optional[str] = None,
+        sector: Optional[str] = None
+    ) -> Dict[str, Any]:
+        started = datetime.utcnow()
+
+        # Sınıflandırmadan önceki çıkarmalarda ve elle girilen veride tür yoktur
+        document_type = extracted_data.get('metadata', {}).get('document_type')
+        if document_type is not None and document_type not in FINANCIAL_DOCUMENT_TYPES:
+            raise IngestValidationError({
+                'isValid': False,
+                'warnings': [],
+                'errors': [f'Belge türü ({document_type}) mali tablo içermiyor, firma puanlanamaz'],
+                'suggestions': []
+            })
+
+        # Extractor hesapları zaten eşlediyse tekrar eşlenmez
+        accounts = extracted_data.get('accounts') or get_account_mapper().map_tables(
+            extracted_data.get('tables', {})
+        )
+        validation = validate_financial_data(extracted_data, accounts)
+        if not validation['isValid']:
+            raise IngestValidationError(validation)
+
+        values = financial_metric_values(accounts)
+        period = period or default_period()
+
+        try:
+            company, created = self._upsert_company(extracted_data.get('companyInfo', {}), values, sector)
+            metric = self._upsert_metric(company, period, values)
+            analysis = self._score(company, metric)
+            alerts = AlertService(self.db, autocommit=False).check_and_generate_alerts(company)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.db.refresh(company)
+        self._duration.observe((datetime.utcnow() - started).total_seconds())
+        logger.info(
+            f"PDF ingest for company {company.id} ({'created' if created else 'updated'}), "
+            f"period {period}, {len(alerts)} alerts"
+        )
+
+        return {
+            'company': company,
+            'created': created,
+            'financialMetric': metric,
+            'analysis': analysis,
+            'alerts': alerts,
+            'validation': validation
+        }
+
+    def _upsert_company(
+        self,
+        company_info: Dict[str, Any],
+        values: Dict[str, float],
+        sector: Optional[str]
+    ) -> Tuple[Company, bool]:
+        tax_id = company_info.get('taxId', '')
+        company = self.db.query(Company).filter(Company.tax_id == tax_id).first()
+        created = company is None
+
+        if created:
+            company = Company(
+                name=f"Firma - {tax_id}",
+                tax_id=tax_id,
+                sector=sector or "Bilinmeyen",  # PDF'den çıkarılamadı
+                status=CompanyStatus.ACTIVE,
+                credit_limit=0.0,
+                created_by=self.user.id
+            )
+            self.db.add(company)
+        elif self.user.role.value == "dealer" and company.created_by != self.user.id:
+            raise IngestPermissionError("Not enough permissions")
+        elif sector:
+            company.sector = sector
+
+        company.revenue = values['revenue']
+        company.assets = values['total_assets']
+        company.liabilities = values['total_liabilities']
+
+        # Uyarı kontrolleri firma kimliğine ihtiyaç duyar
+        self.db.flush()
+        return company, created
+
+    def _upsert_metric(self, company: Company, period: str, values: Dict[str, float]) -> FinancialMetric:
+        metric = self.db.query(FinancialMetric).filter(
+            FinancialMetric.company_id == company.id,
+            FinancialMetric.period == period
+        ).first()
+
+        if metric is None:
+            metric = FinancialMetric(company_id=company.id, period=period)
+            self.db.add(metric)
+
+        for field, value in values.items():
+            setattr(metric, field, value)
+        return metric
+
+    def _score(self, company: Company, metric: FinancialMetric) -> RiskAnalysis:
+        engine = self.risk_engine
+        credit_score = engine.calculate_credit_score(company, metric)
+        pd_score = engine.calculate_pd_score(company, metric)
+        recommended_limit = engine.calculate_recommended_credit_limit(company, metric)
+
+        company.risk_score = credit_score
+        company.pd_score = pd_score
+        company.risk_level = engine.classify_risk_level(pd_score)
+        company.financial_health = engine.classify_financial_health(credit_score)
+        company.last_analysis = datetime.utcnow()
+        if not company.credit_limit:
+            company.credit_limit = recommended_limit
+
+        analysis = RiskAnalysis(
+            company_id=company.id,
+            analyst_id=self.user.id,
+            analysis_type="credit",
+            credit_score=credit_score,
+            pd_score=pd_score,
+            model_version=INGEST_MODEL_VERSION,
+            risk_factors=engine.generate_risk_factors(company, metric),
+            recommended_credit_limit=recommended_limit,
+            notes=f"PDF ingest ({metric.period})",
+            status="completed"
+        )
+        self.db.add(analysis)
+        self.db.flush()
+        return analysis
+
+def summarize_alerts(alerts: List[RiskAlert]) -> List[Dict[str, Any]]:
+    return [
+        {
+            'id': alert.id,
+            'alertType': alert.alert_type.value,
+            'severity': alert.severity.value,
+            'title': alert.title
+        }
+        for alert in alerts
+    ]
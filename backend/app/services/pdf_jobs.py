@@ -0,0 +1,227 @@
+import asyncio
+import enum
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.pdf_executor import ExtractionQueueFullError, UserQuotaExceededError
+from app.services.upload_spool import SpooledUpload
+
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[[Any, SpooledUpload], Awaitable[Dict[str, Any]]]
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+class PDFExtractionJob:
+    """Arka planda çalışan tek bir PDF çıkarma işi"""
+
+    def __init__(self, user_id: Any, filename: Optional[str], size: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.filename = filename
+        self.size = size
+        self.status = JobStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.version = 0
+        self.task: Optional[asyncio.Task] = None
+        self.released = False
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def active(self) -> bool:
+        """İptal edilmiş olsa bile alttaki çıkarma bitene kadar True"""
+        if self.released:
+            return False
+        return self.task is None or not self.task.done()
+
+    def set_status(self, status: JobStatus, error: Optional[str] = None):
+        self.status = status
+        now = time.time()
+        if status == JobStatus.RUNNING:
+            self.started_at = now
+        elif status in FINISHED_STATUSES:
+            self.finished_at = now
+        if error is not None:
+            self.error = error
+
+        # Bekleyen SSE aboneleri uyandırılır, sonraki değişiklik için yeni event
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, version: int, timeout: float) -> bool:
+        """Sürüm değişene kadar bekle; zaman aşımında False"""
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'jobId': self.id,
+            'status': self.status.value,
+            'filename': self.filename,
+            'size': self.size,
+            'createdAt': self.created_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+            'error': self.error
+        }
+
+class PDFJobStore:
+    """
+    Süreç içi PDF iş deposu.
+
+    Yükleme diske yazıldıktan sonra iş hemen kaydedilir ve arka planda bir
+    asyncio görevi olarak çalışır; aynı anda çalışan iş sayısı semaphore ile
+    sınırlanır. Biten işler TTL süresi kadar saklanır, ardından her erişimde
+    yapılan temizlikte silinir. Yalnızca event loop thread'inden kullanılır.
+    """
+
+    def __init__(self, max_concurrent: int, max_pending: int, max_per_user: int, ttl_seconds: int):
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.max_per_user = max_per_user
+        self.ttl_seconds = ttl_seconds
+
+        self._jobs: "OrderedDict[str, PDFExtractionJob]" = OrderedDict()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+        self._pending_gauge = metrics.gauge("pdf_jobs.pending")
+        self._finished_counter = metrics.counter("pdf_jobs.finished")
+        self._cancelled_counter = metrics.counter("pdf_jobs.cancelled")
+        self._duration = metrics.histogram("pdf_jobs.duration_seconds")
+
+    def submit(self, user_id: Any, spooled: SpooledUpload, runner: JobRunner) -> PDFExtractionJob:
+        """İşi kaydet ve arka planda başlat; spool dosyası iş bitince silinir"""
+        self.purge_expired()
+
+        pending = [job for job in self._jobs.values() if job.active]
+        if sum(1 for job in pending if job.user_id == user_id) >= self.max_per_user:
+            raise UserQuotaExceededError(
+                f"Kullanıcı başına en fazla {self.max_per_user} bekleyen PDF işi olabilir",
+                retry_after=5
+            )
+        if len(pending) >= self.max_pending:
+            raise ExtractionQueueFullError(
+                "PDF iş kuyruğu dolu, lütfen daha sonra tekrar deneyin",
+                retry_after=10
+            )
+
+        job = PDFExtractionJob(user_id, spooled.filename, spooled.size)
+        self._jobs[job.id] = job
+        job.task = asyncio.ensure_future(self._run(job, spooled, runner))
+        self._update_gauge()
+        return job
+
+    def get(self, job_id: str, user_id: Any) -> Optional[PDFExtractionJob]:
+        """İşi döndür; başka kullanıcıya aitse veya süresi dolduysa None"""
+        self.purge_expired()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def cancel(self, job: PDFExtractionJob) -> bool:
+        """
+        Bitmemiş işi iptal et; iş zaten bittiyse False.
+
+        İş hemen iptal edildi olarak görünür. Executor kuyruğundaki iş
+        kuyruktan çıkarılır, çalışan sandbox süreci öldürülür; semaphore slotu
+        ve spool dosyası ise alttaki çıkarma gerçekten bitene kadar tutulur.
+        """
+        if job.finished:
+            return False
+        if job.task is not None:
+            job.task.cancel()
+        job.set_status(JobStatus.CANCELLED)
+        self._cancelled_counter.inc()
+        self._update_gauge()
+        return True
+
+    def purge_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if not job.active and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_pending': self.max_pending,
+            'ttl_seconds': self.ttl_seconds,
+            'jobs': counts
+        }
+
+    async def _run(self, job: PDFExtractionJob, spooled: SpooledUpload, runner: JobRunner):
+        try:
+            async with self._semaphore:
+                job.set_status(JobStatus.RUNNING)
+                result = await runner(job.user_id, spooled)
+
+            if result.get('success'):
+                job.result = result
+                job.set_status(JobStatus.SUCCEEDED)
+            else:
+                job.set_status(JobStatus.FAILED, error=result.get('error', 'Bilinmeyen hata'))
+        except asyncio.CancelledError:
+            # Executor iptali worker bitene kadar geciktirir; buraya gelindiğinde
+            # spool dosyasını kullanan kimse kalmamıştır
+            if not job.finished:
+                job.set_status(JobStatus.CANCELLED)
+        except Exception as e:
+            logger.error(f"PDF job {job.id} failed: {str(e)}")
+            job.set_status(JobStatus.FAILED, error=str(e))
+        finally:
+            spooled.cleanup()
+            job.released = True
+            if job.started_at is not None:
+                self._duration.observe(time.time() - job.started_at)
+            self._finished_counter.inc()
+            self._update_gauge()
+
+    def _update_gauge(self):
+        self._pending_gauge.set(sum(1 for job in self._jobs.values() if job.active))
+
+_job_store: Optional[PDFJobStore] = None
+
+def get_pdf_job_store() -> PDFJobStore:
+    """Süreç genelinde paylaşılan iş deposu"""
+    global _job_store
+    if _job_store is None:
+        _job_store = PDFJobStore(
+            max_concurrent=settings.PDF_JOB_MAX_CONCURRENT,
+            max_pending=settings.PDF_JOB_MAX_PENDING,
+            max_per_user=settings.PDF_JOB_MAX_PER_USER,
+            ttl_seconds=settings.PDF_JOB_TTL_SECONDS
+        )
+    return _job_store
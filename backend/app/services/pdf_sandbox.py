@@ -0,0 +1,189 @@
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: rlimit yok, yalnızca duvar saati sınırı uygulanır
+    resource = None
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.pdf_backends import BACKENDS, available_backends
+from app.services.pdf_extractor import record_extraction_metrics
+
+logger = logging.getLogger(__name__)
+
+# Alt süreç sonlanma nedenleri
+REASON_TIMEOUT = "timeout"
+REASON_CPU_LIMIT = "cpu_limit"
+REASON_MEMORY_LIMIT = "memory_limit"
+REASON_CRASHED = "crashed"
+REASON_CANCELLED = "cancelled"
+
+LIMIT_MESSAGES = {
+    REASON_TIMEOUT: "PDF işleme süre sınırını aştı",
+    REASON_CPU_LIMIT: "PDF işleme CPU sınırını aştı",
+    REASON_MEMORY_LIMIT: "PDF işleme bellek sınırını aştı",
+    REASON_CRASHED: "PDF işleme süreci beklenmedik şekilde sonlandı",
+    REASON_CANCELLED: "PDF işleme iptal edildi",
+}
+
+# Sonuç gönderildikten sonra alt sürecin kapanması için beklenecek süre
+_EXIT_GRACE_SECONDS = 5
+
+# İptal isteğinin kontrol edilme aralığı
+_CANCEL_POLL_SECONDS = 0.25
+
+class _CPULimitExceeded(BaseException):
+    """Extractor'ın genel Exception yakalamasına takılmaması için BaseException"""
+
+def _on_cpu_limit(signum, frame):
+    raise _CPULimitExceeded()
+
+def _apply_limits(cpu_seconds: int, memory_bytes: int):
+    if resource is None:
+        return
+    # Yumuşak CPU sınırında SIGXCPU gelir ve sonuç düzgünce bildirilir; C kodunda
+    # takılı kalan süreç sert sınırda çekirdek tarafından SIGKILL ile öldürülür
+    signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 2))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+def _sandbox_main(conn, pdf_path: str, page_budget: Optional[int], backend: Optional[str],
+                  cpu_seconds: int, memory_bytes: int):
+    """Alt süreç girişi: sınırları uygula, çıkar ve sonucu geri gönder"""
+    from app.services.pdf_extractor import TurkishTaxPDFExtractor
+
+    _apply_limits(cpu_seconds, memory_bytes)
+    try:
+        result = TurkishTaxPDFExtractor(page_budget=page_budget, backend=backend).extract_financial_data(pdf_path)
+        conn.send(result)
+    except _CPULimitExceeded:
+        conn.send({'success': False, 'sandbox_reason': REASON_CPU_LIMIT})
+    except MemoryError:
+        conn.send({'success': False, 'sandbox_reason': REASON_MEMORY_LIMIT})
+    finally:
+        conn.close()
+
+class PDFSandbox:
+    """
+    PDF çıkarmayı sınırlandırılmış ayrı bir süreçte çalıştırır.
+
+    Her belge için forkserver'dan yeni bir süreç açılır; CPU ve adres alanı
+    rlimit ile, toplam süre ise üst süreçten sınırlanır. Sınırı aşan süreç
+    öldürülür ve çağırana başarısız bir çıkarma sonucu döner; böylece bozuk
+    veya kötü niyetli bir PDF API sürecinin CPU ve belleğini tüketemez.
+    Executor worker thread'lerinden çağrılır (bloklayıcı).
+    """
+
+    def __init__(self, timeout_seconds: float, cpu_seconds: int, memory_mb: int):
+        self.timeout_seconds = timeout_seconds
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+
+        methods = multiprocessing.get_all_start_methods()
+        if "forkserver" in methods:
+            # Sunucu extractor'ı ve metin motorlarını bir kez yükler, her iş
+            # ucuz bir fork ile başlar
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload(
+                ["app.services.pdf_extractor"] + [BACKENDS[name].module for name in available_backends()]
+            )
+        else:
+            self._context = multiprocessing.get_context("spawn")
+
+        self._killed = {reason: metrics.counter(f"pdf_sandbox.killed.{reason}") for reason in LIMIT_MESSAGES}
+        self._completed = metrics.counter("pdf_sandbox.completed")
+
+    def extract(self, pdf_path: str, page_budget: Optional[int] = None, backend: Optional[str] = None,
+                cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """cancel_event set edilirse alt süreç öldürülür ve iptal sonucu döner"""
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_sandbox_main,
+            args=(child_conn, pdf_path, page_budget, backend, self.cpu_seconds, self.memory_bytes),
+            daemon=True
+        )
+        started = time.monotonic()
+        process.start()
+        child_conn.close()
+
+        result = None
+        try:
+            # Sonuç gelene, alt süreç kapanana, süre dolana veya iptal edilene kadar bekle
+            deadline = started + self.timeout_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    process.kill()
+                    return self._limit_result(REASON_TIMEOUT, pdf_path, started)
+                if cancel_event is not None and cancel_event.is_set():
+                    process.kill()
+                    return self._limit_result(REASON_CANCELLED, pdf_path, started)
+                wait = remaining if cancel_event is None else min(remaining, _CANCEL_POLL_SECONDS)
+                if parent_conn.poll(wait):
+                    try:
+                        result = parent_conn.recv()
+                    except (EOFError, OSError):
+                        result = None
+                    break
+        finally:
+            parent_conn.close()
+            process.join(_EXIT_GRACE_SECONDS)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+        if result is None:
+            return self._limit_result(self._exit_reason(process.exitcode), pdf_path, started)
+        if result.get('sandbox_reason'):
+            return self._limit_result(result['sandbox_reason'], pdf_path, started)
+
+        self._completed.inc()
+        record_extraction_metrics(result.get('metadata', {}))
+        return result
+
+    def _exit_reason(self, exitcode: Optional[int]) -> str:
+        # Sonuç gönderilmeden ölen süreç: SIGKILL/SIGXCPU sert CPU sınırından gelir
+        if resource is not None and exitcode in (-signal.SIGKILL, -signal.SIGXCPU):
+            return REASON_CPU_LIMIT
+        return REASON_CRASHED
+
+    def _limit_result(self, reason: str, pdf_path: str, started: float) -> Dict[str, Any]:
+        self._killed[reason].inc()
+        elapsed = time.monotonic() - started
+        logger.warning(f"PDF sandbox stopped extraction ({reason}) after {elapsed:.1f}s: {pdf_path}")
+        return {
+            'success': False,
+            'error': LIMIT_MESSAGES[reason],
+            'companyInfo': {},
+            'tables': {},
+            'metadata': {
+                'sandbox': {
+                    'reason': reason,
+                    'elapsed_seconds': round(elapsed, 3),
+                    'timeout_seconds': self.timeout_seconds,
+                    'cpu_seconds': self.cpu_seconds,
+                    'memory_mb': self.memory_bytes // (1024 * 1024)
+                }
+            }
+        }
+
+_sandbox: Optional[PDFSandbox] = None
+
+def get_pdf_sandbox() -> Optional[PDFSandbox]:
+    """Süreç genelinde paylaşılan sandbox; kapalıysa None"""
+    global _sandbox
+    if not settings.PDF_SANDBOX_ENABLED:
+        return None
+    if _sandbox is None:
+        _sandbox = PDFSandbox(
+            timeout_seconds=settings.PDF_SANDBOX_TIMEOUT_SECONDS,
+            cpu_seconds=settings.PDF_SANDBOX_CPU_SECONDS,
+            memory_mb=settings.PDF_SANDBOX_MEMORY_MB
+        )
+    return _sandbox
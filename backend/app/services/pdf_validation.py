@@ -0,0 +1,279 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.account_mapping import (
+    get_account_mapper,
+    TOTAL_ASSETS,
+    TOTAL_LIABILITIES_AND_EQUITY,
+    NET_SALES,
+    OPERATING_PROFIT
+)
+
+Accounts = Dict[str, Dict[str, float]]
+
+# Toplu doğrulamada sütunlara çevrilen kanonik alanlar (satır demetiyle aynı sırada)
+BATCH_FIELDS = (
+    'total_assets',                  # aktif / AKTIF_TOPLAMI
+    'total_liabilities_and_equity',  # pasif / PASIF_TOPLAMI
+    'net_sales',                     # gelirTablosu / NET_SATISLAR
+    'gross_sales',                   # gelirTablosu / 60
+    'operating_profit',              # gelirTablosu / FAALIYET_KARI
+    'net_profit',                    # gelirTablosu / 692
+)
+
+# Aynı VKN'nin belgeleri arasında karşılaştırılan toplamlar
+CROSS_DOCUMENT_FIELDS = ('total_assets', 'total_liabilities_and_equity', 'net_sales')
+
+_EMPTY: Dict[str, Any] = {}
+
+def validate_financial_data(data: Dict[str, Any], accounts: Optional[Accounts] = None) -> Dict[str, Any]:
+    """
+    Çıkarılan verileri doğrula ve tutarlılık kontrolleri yap.
+
+    accounts verilmezse tablolar kanonik hesap kodlarına burada eşlenir
+    (kullanıcının düzenlediği tablolar için); ingest hattı extractor'ın
+    eşlediği hesapları doğrudan geçirir.
+    """
+    validation_results = {
+        'isValid': True,
+        'warnings': [],
+        'errors': [],
+        'suggestions': []
+    }
+
+    try:
+        company_info = data.get('companyInfo', {})
+        if accounts is None:
+            accounts = get_account_mapper().map_tables(data.get('tables', {}))
+
+        # VKN kontrolü
+        tax_id = company_info.get('taxId', '')
+        if not tax_id or len(tax_id) != 10 or not tax_id.isdigit():
+            validation_results['errors'].append('Geçerli bir VKN bulunamadı')
+            validation_results['isValid'] = False
+
+        # Bilanço dengesi kontrolü
+        aktif = accounts['aktif']
+        pasif = accounts['pasif']
+
+        total_aktif = aktif.get(TOTAL_ASSETS, 0)
+        total_pasif = pasif.get(TOTAL_LIABILITIES_AND_EQUITY, 0)
+
+        if total_aktif > 0 and total_pasif > 0:
+            balance_diff = abs(total_aktif - total_pasif)
+            balance_ratio = balance_diff / max(total_aktif, total_pasif)
+
+            if balance_ratio > 0.01:  # %1'den fazla fark
+                validation_results['warnings'].append(
+                    f'Bilanço dengesi uyumsuz: Aktif {total_aktif:,.0f} TL, Pasif {total_pasif:,.0f} TL'
+                )
+
+        # Gelir tablosu tutarlılık kontrolü
+        gelir = accounts['gelirTablosu']
+        net_satis = gelir.get(NET_SALES, 0)
+        brut_satis = gelir.get('60', 0)
+
+        if brut_satis > 0 and net_satis > brut_satis:
+            validation_results['errors'].append('Net satışlar brüt satışlardan büyük olamaz')
+            validation_results['isValid'] = False
+
+        # Kar tutarlılık kontrolü
+        faaliyet_kari = gelir.get(OPERATING_PROFIT, 0)
+        net_kar = gelir.get('692', 0)
+
+        if faaliyet_kari > 0 and net_kar > faaliyet_kari:
+            validation_results['warnings'].append('Net kar faaliyet karından büyük görünüyor')
+
+        # Öneriler
+        if total_aktif > 0:
+            validation_results['suggestions'].append(
+                f'Toplam aktif: {total_aktif:,.0f} TL - Firma büyüklüğü orta ölçekli görünüyor'
+            )
+
+        if net_satis > 0 and net_kar > 0:
+            kar_marji = (net_kar / net_satis) * 100
+            validation_results['suggestions'].append(
+                f'Net kar marjı: %{kar_marji:.2f} - {"İyi" if kar_marji > 5 else "Düşük"} karlılık'
+            )
+
+    except Exception as e:
+        validation_results['errors'].append(f'Doğrulama hatası: {str(e)}')
+        validation_results['isValid'] = False
+
+    return validation_results
+
+def _valid_tax_id(tax_id: Any) -> bool:
+    return isinstance(tax_id, str) and len(tax_id) == 10 and tax_id.isdigit()
+
+def _section(container: Any, key: str) -> Dict[str, Any]:
+    """İstekten gelen bölüm; sözlük değilse boş sayılır"""
+    value = container.get(key) if isinstance(container, dict) else None
+    return value if isinstance(value, dict) else _EMPTY
+
+def _amount(section: Dict[str, Any], code: str) -> float:
+    """Tutar; sayıya çevrilemeyen veya sonlu olmayan değer 0 sayılır"""
+    try:
+        value = float(section.get(code, 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+    return value if math.isfinite(value) else 0.0
+
+def _relative_spread(low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """|a - b| / max(a, b); iki değerden biri sıfırsa 0"""
+    spread = np.zeros_like(high)
+    np.divide(high - low, high, out=spread, where=(low > 0) & (high > 0))
+    return spread
+
+def build_validation_table(
+    documents: Sequence[Dict[str, Any]],
+    accounts: Optional[Sequence[Accounts]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Belgeleri kanonik alan sütunlarına çevir.
+
+    Belgeler istekten olduğu gibi gelir: eksik, sayı olmayan alanlar 0 ve
+    sözlük olmayan bölümler boş sayılır; tek bozuk belge tüm isteği düşürmez.
+    """
+    mapper = get_account_mapper()
+    rows = []
+    tax_ids = []
+    periods = []
+
+    # Satırlar Python listesinde toplanıp tek seferde diziye çevrilir
+    # (numpy elemanlarına tek tek yazmak çok daha yavaş)
+    for i, document in enumerate(documents):
+        if accounts is not None:
+            document_accounts = accounts[i]
+        else:
+            document_accounts = _section(document, 'accounts')
+            if not document_accounts:
+                tables = _section(document, 'tables')
+                document_accounts = mapper.map_tables(
+                    {name: table for name, table in tables.items() if isinstance(table, dict)}
+                )
+
+        aktif = _section(document_accounts, 'aktif')
+        pasif = _section(document_accounts, 'pasif')
+        gelir = _section(document_accounts, 'gelirTablosu')
+        rows.append((
+            _amount(aktif, TOTAL_ASSETS),
+            _amount(pasif, TOTAL_LIABILITIES_AND_EQUITY),
+            _amount(gelir, NET_SALES),
+            _amount(gelir, '60'),
+            _amount(gelir, OPERATING_PROFIT),
+            _amount(gelir, '692')
+        ))
+        tax_ids.append(_section(document, 'companyInfo').get('taxId', ''))
+        periods.append((document.get('period') if isinstance(document, dict) else None) or '')
+
+    matrix = np.array(rows, dtype=float).reshape(len(rows), len(BATCH_FIELDS))
+    columns = {name: matrix[:, j] for j, name in enumerate(BATCH_FIELDS)}
+    columns['tax_id'] = np.array(tax_ids, dtype=object)
+    columns['period'] = np.array(periods, dtype=object)
+    return columns
+
+def validate_financial_data_batch(
+    documents: Sequence[Dict[str, Any]],
+    accounts: Optional[Sequence[Accounts]] = None,
+    cross_document_tolerance: float = 0.05
+) -> Dict[str, Any]:
+    """
+    Çok sayıda belgeyi tek seferde doğrula.
+
+    Belge bazındaki kontroller validate_financial_data ile aynıdır (aynı hata
+    ve uyarı metinleri) ancak sütunlar üzerinde maske olarak hesaplanır.
+    'results' yalnızca hata veya uyarısı olan belgeleri içerir ('index' istek
+    sırasıdır), öneriler üretilmez. Aynı VKN (ve dönem) için toplamları
+    birbirinden sapan belgeler 'anomalies' altında raporlanır.
+    """
+    table = build_validation_table(documents, accounts)
+    count = len(documents)
+
+    total_aktif = table['total_assets']
+    total_pasif = table['total_liabilities_and_equity']
+    net_satis = table['net_sales']
+    brut_satis = table['gross_sales']
+    faaliyet_kari = table['operating_profit']
+    net_kar = table['net_profit']
+
+    tax_id_ok = np.fromiter((_valid_tax_id(t) for t in table['tax_id']), dtype=bool, count=count)
+    low, high = np.minimum(total_aktif, total_pasif), np.maximum(total_aktif, total_pasif)
+    unbalanced = _relative_spread(low, high) > 0.01  # %1'den fazla fark
+    sales_inconsistent = (brut_satis > 0) & (net_satis > brut_satis)
+    profit_inconsistent = (faaliyet_kari > 0) & (net_kar > faaliyet_kari)
+    is_valid = tax_id_ok & ~sales_inconsistent
+
+    # Sonuç yalnızca bulgusu olan belgeler için oluşturulur
+    findings: Dict[int, Dict[str, Any]] = {}
+
+    def finding(i: int) -> Dict[str, Any]:
+        result = findings.get(i)
+        if result is None:
+            result = findings[i] = {'index': i, 'isValid': True, 'warnings': [], 'errors': []}
+        return result
+
+    for i in np.flatnonzero(~is_valid).tolist():
+        finding(i)['isValid'] = False
+    for i in np.flatnonzero(~tax_id_ok).tolist():
+        finding(i)['errors'].append('Geçerli bir VKN bulunamadı')
+    for i in np.flatnonzero(unbalanced).tolist():
+        finding(i)['warnings'].append(
+            f'Bilanço dengesi uyumsuz: Aktif {total_aktif[i]:,.0f} TL, Pasif {total_pasif[i]:,.0f} TL'
+        )
+    for i in np.flatnonzero(sales_inconsistent).tolist():
+        finding(i)['errors'].append('Net satışlar brüt satışlardan büyük olamaz')
+    for i in np.flatnonzero(profit_inconsistent).tolist():
+        finding(i)['warnings'].append('Net kar faaliyet karından büyük görünüyor')
+
+    anomalies = _cross_document_anomalies(table, tax_id_ok, cross_document_tolerance)
+    valid = int(is_valid.sum())
+
+    return {
+        'results': [findings[i] for i in sorted(findings)],
+        'anomalies': anomalies,
+        'summary': {
+            'documents': count,
+            'valid': valid,
+            'invalid': count - valid,
+            'withWarnings': sum(1 for result in findings.values() if result['warnings']),
+            'withAnomalies': len({i for anomaly in anomalies for i in anomaly['documents']})
+        }
+    }
+
+def _cross_document_anomalies(
+    table: Dict[str, np.ndarray],
+    tax_id_ok: np.ndarray,
+    tolerance: float
+) -> List[Dict[str, Any]]:
+    """Aynı VKN ve dönemde toplamları tolerans dışında farklı belgeler"""
+    groups: Dict[tuple, List[int]] = {}
+    for i in np.flatnonzero(tax_id_ok).tolist():
+        groups.setdefault((table['tax_id'][i], table['period'][i]), []).append(i)
+
+    # Birden fazla belgesi olan gruplar art arda dizilir, reduceat ile özetlenir
+    repeated = [members for members in groups.values() if len(members) > 1]
+    if not repeated:
+        return []
+    candidates = np.fromiter((i for members in repeated for i in members), dtype=np.intp)
+    sizes = np.fromiter((len(members) for members in repeated), dtype=np.intp, count=len(repeated))
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+
+    anomalies = []
+    for field in CROSS_DOCUMENT_FIELDS:
+        values = table[field][candidates]
+        low = np.minimum.reduceat(values, starts)
+        high = np.maximum.reduceat(values, starts)
+        for g in np.flatnonzero(_relative_spread(low, high) > tolerance).tolist():
+            members = repeated[g]
+            anomalies.append({
+                'taxId': table['tax_id'][members[0]],
+                'period': table['period'][members[0]] or None,
+                'field': field,
+                'documents': members,
+                'min': float(low[g]),
+                'max': float(high[g])
+            })
+
+    return anomalies
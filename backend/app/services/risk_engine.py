@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional
-from app.models.company import Company
+from app.models.company import Company, RiskLevel, FinancialHealth
 from app.models.financial_metric import FinancialMetric
 
 class RiskEngine:
@@ -115,6 +115,30 @@ class RiskEngine:
         
         return max(100000, min(50000000, final_limit))  # Min 100K, Max 50M TL
     
+    def classify_risk_level(self, pd_score: float) -> RiskLevel:
+        """Map PD score (%) to a risk level (same bands as quick analysis and PD alerts)"""
+        if pd_score < 5:
+            return RiskLevel.LOW
+        elif pd_score < 10:
+            return RiskLevel.MEDIUM
+        elif pd_score <= 15:
+            return RiskLevel.HIGH
+        else:
+            return RiskLevel.CRITICAL
+    
+    def classify_financial_health(self, credit_score: int) -> FinancialHealth:
+        """Map credit score (0-1000) to financial health (same bands as the risk multiplier)"""
+        if credit_score >= 800:
+            return FinancialHealth.EXCELLENT
+        elif credit_score >= 650:
+            return FinancialHealth.GOOD
+        elif credit_score >= 500:
+            return FinancialHealth.AVERAGE
+        elif credit_score >= 350:
+            return FinancialHealth.POOR
+        else:
+            return FinancialHealth.CRITICAL
+    
     def _calculate_financial_health_score(self, company: Company, financial_metrics: Optional[FinancialMetric]) -> float:
         """Calculate financial health component of credit score"""
         if not financial_metrics:
@@ -0,0 +1,290 @@
+import math
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Dönem biçimleri: '2024-12' (aylık), '2024-Q1' (çeyrek), '2024' (yıllık)
+_PERIOD_PATTERN = re.compile(r'^\s*(\d{4})(?:-(?:(0?[1-9]|1[0-2])|Q([1-4])))?\s*$', re.IGNORECASE)
+
+MONTHS_PER_YEAR = 12
+MONTHS_PER_QUARTER = 3
+
+DEFAULT_TREND_FIELDS = ('net_sales', 'net_profit', 'total_assets', 'equity', 'total_liabilities')
+
+class RatioDefinition(NamedTuple):
+    numerator: str
+    denominator: str
+    scale: float = 1.0
+
+# add_financial_ratios ile aynı tanımlar (ROA/ROE yüzde); payda > 0 değilse oran yok
+DEFAULT_RATIOS: Dict[str, RatioDefinition] = {
+    'current_ratio': RatioDefinition('current_assets', 'short_term_liabilities'),
+    'debt_to_equity': RatioDefinition('total_liabilities', 'equity'),
+    'return_on_assets': RatioDefinition('net_profit', 'total_assets', 100.0),
+    'return_on_equity': RatioDefinition('net_profit', 'equity', 100.0),
+}
+
+def parse_period(period: str) -> Optional[Tuple[int, int]]:
+    """
+    Dönemi (ay sırası, ay cinsinden ayrıntı düzeyi) olarak döndür.
+
+    Ay sırası yıl * 12 + ay - 1'dir; çeyrek ve yıl son ayına denk gelir.
+    Ayrıntı düzeyi aylık 1, çeyreklik 3, yıllık 12'dir.
+    """
+    match = _PERIOD_PATTERN.match(period or "")
+    if not match:
+        return None
+    year, month, quarter = match.groups()
+    if quarter:
+        month, granularity = int(quarter) * MONTHS_PER_QUARTER, MONTHS_PER_QUARTER
+    elif not month:
+        month, granularity = MONTHS_PER_YEAR, MONTHS_PER_YEAR
+    else:
+        granularity = 1
+    return int(year) * MONTHS_PER_YEAR + int(month) - 1, granularity
+
+def period_ordinal(period: str) -> Optional[int]:
+    """Dönemi ay sırasına çevir (yıl * 12 + ay - 1); çeyrek ve yıl son ayına denk gelir"""
+    parsed = parse_period(period)
+    return parsed[0] if parsed is not None else None
+
+def period_label(ordinal: int, step: int) -> str:
+    year, month = divmod(ordinal, MONTHS_PER_YEAR)
+    if step % MONTHS_PER_YEAR == 0 and month == MONTHS_PER_YEAR - 1:
+        return str(year)
+    if step % MONTHS_PER_QUARTER == 0 and (month + 1) % MONTHS_PER_QUARTER == 0:
+        return f"{year}-Q{(month + 1) // MONTHS_PER_QUARTER}"
+    return f"{year}-{month + 1:02d}"
+
+class PeriodSeries(NamedTuple):
+    """Şirket x dönem yoğun matrisleri; eksik dönemler NaN"""
+    company_ids: List[int]
+    ordinals: np.ndarray      # dönem ızgarasının ay sıraları
+    step: int                 # ızgara adımı (ay): 1 aylık, 3 çeyreklik, 12 yıllık
+    values: Dict[str, np.ndarray]
+
+    @property
+    def labels(self) -> List[str]:
+        return [period_label(int(ordinal), self.step) for ordinal in self.ordinals]
+
+    @property
+    def periods_per_year(self) -> int:
+        return MONTHS_PER_YEAR // self.step
+
+def build_series(rows: Iterable[Tuple[int, str, Dict[str, Any]]], fields: Sequence[str]) -> PeriodSeries:
+    """
+    (company_id, period, {alan: değer}) satırlarından ortak dönem ızgarası kur.
+
+    Izgara adımı girdideki en ince dönem biçimidir: tüm dönemler yıllıksa 12,
+    çeyreklik veya yıllıksa 3, herhangi biri aylıksa ('2024-06') 1. Seyrek
+    aylık veri bu yüzden çeyreğe dönüştürülmez, aradaki aylar NaN kalır.
+    Yıllık/çeyreklik gecikmeler sabit sütun kaydırmasıdır. Aynı şirket ve dönem birden
+    fazla geçerse son satır kazanır (yükleme sırasıyla verilmelidir).
+    """
+    company_index: Dict[int, int] = {}
+    row_companies: List[int] = []
+    row_ordinals: List[int] = []
+    row_values: List[List[float]] = []
+    step = MONTHS_PER_YEAR
+
+    for company_id, period, data in rows:
+        parsed = parse_period(period)
+        if parsed is None:
+            continue
+        ordinal, granularity = parsed
+        step = min(step, granularity)
+        row_companies.append(company_index.setdefault(company_id, len(company_index)))
+        row_ordinals.append(ordinal)
+        row_values.append([_as_float(data.get(field)) for field in fields])
+
+    if not row_ordinals:
+        return PeriodSeries([], np.empty(0, dtype=np.int64), 1, {field: np.empty((0, 0)) for field in fields})
+
+    ordinals = np.asarray(row_ordinals, dtype=np.int64)
+    distinct = np.unique(ordinals)
+    grid = np.arange(distinct[0], distinct[-1] + 1, step, dtype=np.int64)
+    columns = (ordinals - distinct[0]) // step
+
+    matrix = np.full((len(fields), len(company_index), len(grid)), np.nan)
+    matrix[:, np.asarray(row_companies), columns] = np.asarray(row_values, dtype=np.float64).T
+
+    return PeriodSeries(
+        company_ids=list(company_index),
+        ordinals=grid,
+        step=step,
+        values={field: matrix[index] for index, field in enumerate(fields)}
+    )
+
+def _as_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+def safe_divide(numerator: np.ndarray, denominator: np.ndarray, positive_only: bool = False) -> np.ndarray:
+    """Eleman bazında bölme; sıfır/eksik (positive_only ise <= 0) payda NaN verir"""
+    valid = ~np.isnan(numerator) & ~np.isnan(denominator)
+    valid &= denominator > 0 if positive_only else denominator != 0
+    result = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=valid)
+    return result
+
+def shift(values: np.ndarray, lag: int) -> np.ndarray:
+    """Dönem ekseninde lag kadar geriye kaydır (ilk lag sütun NaN)"""
+    shifted = np.full_like(values, np.nan)
+    if 0 < lag < values.shape[1]:
+        shifted[:, lag:] = values[:, :-lag]
+    return shifted
+
+def growth(values: np.ndarray, lag: int) -> np.ndarray:
+    """lag dönem önceye göre büyüme (%); önceki değerin mutlak değeri payda"""
+    previous = shift(values, lag)
+    return safe_divide(values - previous, np.abs(previous)) * 100
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Son window dönemde gözlenen değerlerin ortalaması.
+
+    Yalnızca gözlem olan dönemler için hesaplanır; eksik dönemlere değer
+    üretilmez. İlk window-1 dönemde pencere mevcut dönemlerle sınırlıdır.
+    Kümülatif toplam farkıyla hesaplanır; dönem sayısından bağımsız olarak
+    eleman başına sabit iş yapılır.
+    """
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    pad = np.zeros((values.shape[0], 1))
+    sums = np.cumsum(np.hstack([pad, filled]), axis=1)
+    counts = np.cumsum(np.hstack([pad, present.astype(np.float64)]), axis=1)
+
+    ends = np.arange(1, values.shape[1] + 1)
+    starts = np.maximum(ends - max(window, 1), 0)
+    means = safe_divide(sums[:, ends] - sums[:, starts], counts[:, ends] - counts[:, starts])
+    return np.where(present, means, np.nan)
+
+def _first_last(values: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Her satırın ilk/son gözlenen sütunu, o sütunlardaki değerler ve gözlem var mı"""
+    present = ~np.isnan(values)
+    has_any = present.any(axis=1)
+    first = present.argmax(axis=1)
+    last = values.shape[1] - 1 - present[:, ::-1].argmax(axis=1)
+    rows = np.arange(values.shape[0])
+    return first, last, values[rows, first], values[rows, last], has_any
+
+def first_last_change(values: np.ndarray) -> np.ndarray:
+    """İlk gözlemden son gözleme mutlak değişim; tek gözlemde NaN"""
+    first, last, start, end, has_any = _first_last(values)
+    return np.where(has_any & (first != last), end - start, np.nan)
+
+def cagr(values: np.ndarray, ordinals: np.ndarray) -> np.ndarray:
+    """İlk ve son gözlem arası yıllık bileşik büyüme (%); iki uç da pozitif olmalı"""
+    first, last, start, end, has_any = _first_last(values)
+    years = (ordinals[last] - ordinals[first]) / MONTHS_PER_YEAR
+
+    valid = has_any & (years > 0) & (start > 0) & (end > 0)
+    result = np.full(values.shape[0], np.nan)
+    result[valid] = (np.power(end[valid] / start[valid], 1.0 / years[valid]) - 1) * 100
+    return result
+
+def trend_slope(values: np.ndarray, ordinals: np.ndarray) -> np.ndarray:
+    """Gözlenen dönemler üzerinde en küçük kareler eğimi (yıllık değişim)"""
+    present = ~np.isnan(values)
+    counts = present.sum(axis=1)
+    x = np.broadcast_to(ordinals / MONTHS_PER_YEAR, values.shape)
+    y = np.where(present, values, 0.0)
+
+    x_mean = safe_divide(np.where(present, x, 0.0).sum(axis=1), counts.astype(np.float64))
+    y_mean = safe_divide(y.sum(axis=1), counts.astype(np.float64))
+    dx = np.where(present, x - x_mean[:, None], 0.0)
+    dy = np.where(present, y - y_mean[:, None], 0.0)
+
+    slope = safe_divide((dx * dy).sum(axis=1), (dx * dx).sum(axis=1))
+    slope[counts < 2] = np.nan
+    return slope
+
+def _to_json(values: Optional[np.ndarray]) -> Any:
+    """Matris/vektörü tek seferde yuvarla, NaN -> None (iç içe listeler)"""
+    if values is None:
+        return None
+    return np.where(np.isnan(values), None, np.round(values, 4)).tolist()
+
+def required_fields(fields: Sequence[str], ratios: Optional[Dict[str, RatioDefinition]] = None) -> List[str]:
+    """Trend alanları ve oranların pay/paydası (sırası korunarak, tekrarsız)"""
+    ratios = DEFAULT_RATIOS if ratios is None else ratios
+    needed = list(fields)
+    for definition in ratios.values():
+        needed.extend((definition.numerator, definition.denominator))
+    return list(dict.fromkeys(needed))
+
+def compute_trends(
+    series: PeriodSeries,
+    fields: Sequence[str] = DEFAULT_TREND_FIELDS,
+    ratios: Optional[Dict[str, RatioDefinition]] = None,
+    window: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Tüm şirketler için büyüme, hareketli ortalama, CAGR ve oran trendleri.
+
+    Her metrik şirket x dönem matrisi üzerinde tek seferde hesaplanır; şirket
+    başına döngü yalnızca sonucun JSON'a dönüştürülmesindedir. YoY gecikmesi
+    bir yıl, QoQ gecikmesi bir çeyrektir (yıllık seride QoQ yok). window
+    verilmezse hareketli ortalama bir yıllık dönem sayısı kadardır.
+    """
+    ratios = DEFAULT_RATIOS if ratios is None else ratios
+    if not series.company_ids:
+        return {'periods': [], 'frequency': None, 'window': window, 'companies': []}
+
+    periods_per_year = series.periods_per_year
+    yoy_lag = periods_per_year
+    qoq_lag = MONTHS_PER_QUARTER // series.step if MONTHS_PER_QUARTER % series.step == 0 else None
+    window = max(1, window or periods_per_year)
+
+    metrics: Dict[str, Dict[str, Any]] = {}
+    for field in fields:
+        values = series.values[field]
+        metrics[field] = {
+            'values': values,
+            'yoy': growth(values, yoy_lag),
+            'qoq': growth(values, qoq_lag) if qoq_lag else None,
+            'rolling_mean': rolling_mean(values, window),
+            'cagr': cagr(values, series.ordinals)
+        }
+
+    ratio_results: Dict[str, Dict[str, Any]] = {}
+    for name, definition in ratios.items():
+        if definition.numerator not in series.values or definition.denominator not in series.values:
+            continue
+        values = safe_divide(
+            series.values[definition.numerator],
+            series.values[definition.denominator],
+            positive_only=True
+        ) * definition.scale
+        ratio_results[name] = {
+            'values': values,
+            'slope_per_year': trend_slope(values, series.ordinals),
+            'change': first_last_change(values)
+        }
+
+    metrics = {field: {key: _to_json(value) for key, value in result.items()} for field, result in metrics.items()}
+    ratio_results = {name: {key: _to_json(value) for key, value in result.items()} for name, result in ratio_results.items()}
+
+    companies = []
+    for row, company_id in enumerate(series.company_ids):
+        companies.append({
+            'company_id': company_id,
+            'metrics': {
+                field: {key: value[row] if value is not None else None for key, value in result.items()}
+                for field, result in metrics.items()
+            },
+            'ratios': {
+                name: {key: value[row] for key, value in result.items()}
+                for name, result in ratio_results.items()
+            }
+        })
+
+    return {
+        'periods': series.labels,
+        'frequency': {1: 'monthly', MONTHS_PER_QUARTER: 'quarterly', MONTHS_PER_YEAR: 'yearly'}.get(series.step, f'{series.step}m'),
+        'window': window,
+        'companies': companies
+    }
@@ -0,0 +1,220 @@
+import hashlib
+import logging
+import os
+import tempfile
+import zipfile
+from typing import List, Optional, Tuple, Union
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# PDF standardı başlığın ilk 1024 bayt içinde olmasına izin verir
+MAGIC_SEARCH_WINDOW = 1024
+
+class UploadRejectedError(ValueError):
+    """Yükleme akış sırasında reddedildi"""
+
+class InvalidFileTypeError(UploadRejectedError):
+    """Dosya imzası beklenen türle uyuşmuyor"""
+
+class FileTooLargeError(UploadRejectedError):
+    """Dosya boyut sınırını aştı"""
+
+class SpooledUpload:
+    """Diske yazılmış yükleme; işlem bitince cleanup() çağrılmalı"""
+
+    def __init__(self, path: str, size: int, sha256: str, filename: Optional[str]):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Spool file cleanup failed for {self.path}: {str(e)}")
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+class _SpoolWriter:
+    """Parçaları geçici dosyaya yazarken imza, boyut ve özet kontrolü yapar"""
+
+    def __init__(self, max_bytes: int, magic: Optional[bytes], suffix: str, file_type: str):
+        self.max_bytes = max_bytes
+        self.magic = magic
+        self.file_type = file_type
+        self.size = 0
+        self._header: Optional[bytes] = b"" if magic is not None else None
+        self._digest = hashlib.sha256()
+        fd, self.path = tempfile.mkstemp(prefix="upload_", suffix=suffix)
+        self._file = os.fdopen(fd, 'wb')
+
+    def write(self, chunk: bytes):
+        if self._header is not None:
+            self._header += chunk[:MAGIC_SEARCH_WINDOW - len(self._header)]
+            if len(self._header) >= MAGIC_SEARCH_WINDOW:
+                self._check_magic()
+
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise FileTooLargeError(f"Dosya boyutu {self.max_bytes // (1024 * 1024)}MB'dan büyük olamaz")
+
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self, filename: Optional[str]) -> SpooledUpload:
+        self._file.close()
+        if self.size == 0:
+            raise InvalidFileTypeError("Dosya boş")
+        if self._header is not None:
+            self._check_magic()
+        return SpooledUpload(self.path, self.size, self._digest.hexdigest(), filename)
+
+    def _check_magic(self):
+        if self.magic is not None and self.magic not in self._header:
+            raise InvalidFileTypeError(f"Dosya içeriği geçerli bir {self.file_type} değil")
+        self._header = None
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+async def spool_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    magic: Optional[bytes] = PDF_MAGIC,
+    chunk_size: int = SPOOL_CHUNK_SIZE,
+    suffix: str = ".pdf",
+    file_type: str = "PDF"
+) -> SpooledUpload:
+    """
+    Yüklemeyi parça parça geçici dosyaya yaz.
+
+    Dosya imzası ilk baytlardan kontrol edilir, boyut sınırı yazarken
+    uygulanır ve SHA-256 özeti aynı geçişte hesaplanır; böylece dosyanın
+    tamamı hiçbir zaman bellekte tutulmaz.
+    """
+    writer = _SpoolWriter(max_bytes, magic, suffix, file_type)
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            writer.write(chunk)
+        return writer.finish(upload.filename)
+    except BaseException:
+        writer.abort()
+        raise
+
+def is_zip_upload(upload: UploadFile) -> bool:
+    """Yüklemenin ZIP arşivi olup olmadığını ad/tür üzerinden tahmin et"""
+    content_type = (upload.content_type or "").lower()
+    filename = (upload.filename or "").lower()
+    return filename.endswith(".zip") or content_type in ("application/zip", "application/x-zip-compressed")
+
+def spool_zip_members(
+    zip_path: str,
+    max_member_bytes: int,
+    max_members: int,
+    max_total_bytes: int,
+    magic: Optional[bytes] = PDF_MAGIC,
+    extension: str = ".pdf",
+    chunk_size: int = SPOOL_CHUNK_SIZE
+) -> List[Tuple[str, Union[SpooledUpload, str]]]:
+    """
+    ZIP arşivindeki dosyaları tek tek geçici dosyalara aç.
+
+    Her üye için (ad, SpooledUpload) ya da (ad, hata mesajı) döner; bozuk
+    bir üye arşivin geri kalanını etkilemez. Üye başına ve toplam açılmış
+    boyut sınırları önce arşivde bildirilen boyutlarla, sonra bu değerlere
+    güvenilmeden açma sırasında uygulanır; toplam aşılırsa o ana kadar açılan
+    üyeler silinir ve arşiv reddedilir (ZIP bombası diski dolduramaz).
+    Bloklayan bir işlemdir, event loop dışında çağrılmalıdır.
+    """
+    total_error = f"ZIP arşivinin açılmış boyutu {max_total_bytes // (1024 * 1024)}MB'dan büyük olamaz"
+    members: List[Tuple[str, Union[SpooledUpload, str]]] = []
+
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except zipfile.BadZipFile:
+        raise InvalidFileTypeError("Dosya geçerli bir ZIP arşivi değil")
+
+    with archive:
+        infos = [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and info.filename.lower().endswith(extension)
+        ]
+
+        if len(infos) > max_members:
+            raise UploadRejectedError(f"ZIP arşivi en fazla {max_members} dosya içerebilir")
+        if sum(min(info.file_size, max_member_bytes) for info in infos) > max_total_bytes:
+            raise UploadRejectedError(total_error)
+
+        remaining = max_total_bytes
+        try:
+            for info in infos:
+                name = info.filename
+                if info.file_size > max_member_bytes:
+                    members.append((name, f"Dosya boyutu {max_member_bytes // (1024 * 1024)}MB'dan büyük olamaz"))
+                    continue
+
+                limit = min(max_member_bytes, remaining)
+                try:
+                    spooled = _spool_zip_member(archive, info, limit, magic, chunk_size, extension)
+                except FileTooLargeError as e:
+                    if limit < max_member_bytes:
+                        raise UploadRejectedError(total_error)
+                    members.append((name, str(e)))
+                    continue
+                except UploadRejectedError as e:
+                    members.append((name, str(e)))
+                except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+                    members.append((name, f"ZIP üyesi okunamadı: {str(e)}"))
+                    continue
+                members.append((name, spooled))
+                remaining -= spooled.size
+        except BaseException:
+            for _, member in members:
+                if isinstance(member, SpooledUpload):
+                    member.cleanup()
+            raise
+
+    return members
+
+def _spool_zip_member(
+    archive: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    max_bytes: int,
+    magic: Optional[bytes],
+    chunk_size: int,
+    suffix: str
+) -> SpooledUpload:
+    writer = _SpoolWriter(max_bytes, magic, suffix, "PDF")
+    try:
+        with archive.open(info) as member:
+            while True:
+                chunk = member.read(chunk_size)
+                if not chunk:
+                    break
+                writer.write(chunk)
+        return writer.finish(info.filename)
+    except BaseException:
+        writer.abort()
+        raise
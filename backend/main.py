@@ -1,8 +1,10 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, Response, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Enum
-from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Enum, Index, insert, update, or_, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declarative_base, sessionmaker, Session, deferred
 from sqlalchemy.sql import func
 from pydantic import BaseModel
 from typing import Optional, List
@@ -10,9 +12,33 @@ from datetime import datetime, timedelta
 import enum
 import os
 import json
+import base64
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 
+from app.core.config import settings
+from app.services.edefter_import import parse_edefter_files, finish_edefter_parser, normalize_period
+from app.services.edefter_ledger import TrialBalanceAggregator
+from app.services.edefter_parser import EDefterStreamParser, get_tag_table
+from app.services.chunked_upload import (
+    UploadSession,
+    UploadSessionNotFoundError,
+    UploadIncompleteError,
+    get_chunked_upload_store,
+    read_chunk_body
+)
+from app.services.blob_store import get_blob_store, BlobNotFoundError
+from app.services.trend_analytics import DEFAULT_TREND_FIELDS, build_series, compute_trends, required_fields
+from app.services.upload_spool import (
+    SpooledUpload,
+    UploadRejectedError,
+    InvalidFileTypeError,
+    ZIP_MAGIC,
+    spool_upload,
+    spool_zip_members,
+    is_zip_upload
+)
+
 # Database setup (SQLite for local development)
 SQLALCHEMY_DATABASE_URL = "sqlite:///./financial_risk.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -104,6 +130,7 @@ class EDefterData(Base):
     file_type = Column(String)  # XML, JSON, CSV
     file_name = Column(String)
     file_size = Column(Integer)
+    content_sha256 = Column(String(64))  # Dosya içeriğinin özeti; aynı dosya tekrar işlenmez
     
     # Mali Tablo Verileri
     total_assets = Column(Float, default=0.0)
@@ -136,7 +163,26 @@ class EDefterData(Base):
     processed = Column(Boolean, default=False)
     validation_status = Column(String, default="pending")  # pending, valid, invalid
     validation_errors = Column(String)  # JSON format
-    raw_data = Column(String)  # Ham veri (JSON format)
+    # Ham veri: sıkıştırılmış olarak blob deposunda, tabloda yalnızca referansı
+    raw_data_ref = Column(String)
+    raw_data = deferred(Column(String))  # Eski kayıtlar (JSON format); yalnızca istenince yüklenir
+
+# Aynı dosya aynı dönem için bir kez saklanır
+Index(
+    "uq_edefter_data_company_period_content",
+    EDefterData.company_id,
+    EDefterData.period,
+    EDefterData.content_sha256,
+    unique=True
+)
+
+# Şirket geçmişi sayfalama indeksi: yeni yüklemeden eskiye, id eşitlik bozucu
+Index(
+    "ix_edefter_data_company_upload_date",
+    EDefterData.company_id,
+    EDefterData.upload_date.desc(),
+    EDefterData.id.desc()
+)
 # Create tables
 def create_tables():
     """Create all tables"""
@@ -242,6 +288,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # File upload imports
@@ -809,76 +856,7 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
         "risk_distribution": risk_counts
     }
 
-# e-Defter XML Parser
-def parse_edefter_xml(xml_content: str, company_id: int, file_name: str) -> dict:
-    """Parse e-Defter XML content and extract financial data"""
-    try:
-        root = ET.fromstring(xml_content)
-        
-        # e-Defter XML namespace handling
-        namespaces = {
-            'xbrli': 'http://www.xbrl.org/2003/instance',
-            'iso4217': 'http://www.xbrl.org/2003/iso4217',
-            'link': 'http://www.xbrl.org/2003/linkbase',
-            'xlink': 'http://www.w3.org/1999/xlink',
-            'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
-        }
-        
-        # Extract period information
-        period_elem = root.find('.//xbrli:period', namespaces)
-        period = "2024-12" if period_elem is None else period_elem.text
-        
-        # Extract financial data with Turkish e-Defter structure
-        financial_data = {
-            'period': period,
-            'total_assets': extract_numeric_value(root, 'ToplamVarliklar', namespaces),
-            'current_assets': extract_numeric_value(root, 'DonVarliklar', namespaces),
-            'fixed_assets': extract_numeric_value(root, 'DuranVarliklar', namespaces),
-            'total_liabilities': extract_numeric_value(root, 'ToplamYukumlulukler', namespaces),
-            'short_term_liabilities': extract_numeric_value(root, 'KisaVadeliYukumlulukler', namespaces),
-            'long_term_liabilities': extract_numeric_value(root, 'UzunVadeliYukumlulukler', namespaces),
-            'equity': extract_numeric_value(root, 'Ozkaynaklar', namespaces),
-            'net_sales': extract_numeric_value(root, 'NetSatislar', namespaces),
-            'gross_profit': extract_numeric_value(root, 'BrutKar', namespaces),
-            'operating_profit': extract_numeric_value(root, 'FaaliyetKari', namespaces),
-            'net_profit': extract_numeric_value(root, 'NetKar', namespaces),
-            'operating_cash_flow': extract_numeric_value(root, 'FaaliyetNakitAkisi', namespaces),
-            'investing_cash_flow': extract_numeric_value(root, 'YatirimNakitAkisi', namespaces),
-            'financing_cash_flow': extract_numeric_value(root, 'FinansmanNakitAkisi', namespaces)
-        }
-        
-        # Calculate financial ratios
-        if financial_data['total_assets'] > 0:
-            financial_data['return_on_assets'] = (financial_data['net_profit'] / financial_data['total_assets']) * 100
-        
-        if financial_data['equity'] > 0:
-            financial_data['return_on_equity'] = (financial_data['net_profit'] / financial_data['equity']) * 100
-            financial_data['debt_to_equity'] = financial_data['total_liabilities'] / financial_data['equity']
-        
-        if financial_data['short_term_liabilities'] > 0:
-            financial_data['current_ratio'] = financial_data['current_assets'] / financial_data['short_term_liabilities']
-        
-        return financial_data
-        
-    except Exception as e:
-        raise ValueError(f"XML parsing error: {str(e)}")
-
-def extract_numeric_value(root, element_name: str, namespaces: dict) -> float:
-    """Extract numeric value from XML element"""
-    try:
-        # Try different possible element paths
-        element = root.find(f'.//{element_name}', namespaces)
-        if element is None:
-            element = root.find(f'.//xbrli:{element_name}', namespaces)
-        
-        if element is not None and element.text:
-            # Clean and convert to float
-            value = element.text.replace(',', '').replace('.', '')
-            return float(value) / 100 if value.isdigit() else 0.0
-        return 0.0
-    except:
-        return 0.0
-
+# e-Defter XML (parsing is streamed, see app.services.edefter_parser)
 def create_sample_edefter_xml(company_name: str, tax_id: str, period: str) -> str:
     """Create sample e-Defter XML data"""
     xml_template = f"""<?xml version="1.0" encoding="UTF-8"?>
@@ -918,6 +896,178 @@ def create_sample_edefter_xml(company_name: str, tax_id: str, period: str) -> st
 </xbrli:xbrl>"""
     return xml_template
 
+def apply_edefter_financials(company: Company, financial_data: dict):
+    """Update company figures and the debt-ratio risk heuristic from e-Defter data"""
+    company.revenue = financial_data.get('net_sales', 0)
+    company.assets = financial_data.get('total_assets', 0)
+    company.liabilities = financial_data.get('total_liabilities', 0)
+    
+    # Recalculate risk scores based on new data
+    if financial_data.get('total_assets', 0) > 0:
+        debt_ratio = financial_data.get('total_liabilities', 0) / financial_data.get('total_assets', 0)
+        if debt_ratio < 0.3:
+            company.risk_level = RiskLevel.LOW
+            company.risk_score = 750 + int((1 - debt_ratio) * 200)
+        elif debt_ratio < 0.6:
+            company.risk_level = RiskLevel.MEDIUM
+            company.risk_score = 500 + int((0.6 - debt_ratio) * 500)
+        elif debt_ratio < 0.8:
+            company.risk_level = RiskLevel.HIGH
+            company.risk_score = 300 + int((0.8 - debt_ratio) * 400)
+        else:
+            company.risk_level = RiskLevel.CRITICAL
+            company.risk_score = 200 + int((1 - debt_ratio) * 200)
+    
+    company.last_analysis = datetime.now().strftime("%Y-%m-%d")
+
+def edefter_financial_summary(financial_data: dict) -> dict:
+    return {
+        "total_assets": financial_data.get('total_assets', 0),
+        "total_liabilities": financial_data.get('total_liabilities', 0),
+        "equity": financial_data.get('equity', 0),
+        "net_sales": financial_data.get('net_sales', 0),
+        "net_profit": financial_data.get('net_profit', 0),
+        "current_ratio": financial_data.get('current_ratio', 0),
+        "debt_to_equity": financial_data.get('debt_to_equity', 0),
+        "journal_lines": financial_data.get('ledger', {}).get('lines', 0)
+    }
+
+# Financial columns filled from parsed e-Defter data
+EDEFTER_FINANCIAL_COLUMNS = [
+    column.name for column in EDefterData.__table__.columns
+    if isinstance(column.type, Float)
+]
+
+def edefter_financial_columns(financial_data: dict) -> dict:
+    """Column values for a parsed file; taxonomy fields without a column stay in the raw payload only"""
+    return {column: financial_data.get(column, 0.0) for column in EDEFTER_FINANCIAL_COLUMNS}
+
+def edefter_record_financials(record: EDefterData) -> dict:
+    return {column: getattr(record, column) for column in EDEFTER_FINANCIAL_COLUMNS}
+
+def edefter_record_error(record: EDefterData) -> str:
+    try:
+        return json.loads(record.validation_errors)["error"]
+    except (TypeError, ValueError, KeyError):
+        return "File processing failed"
+
+def edefter_upload_response(record: EDefterData, financial_data: dict) -> EDefterUploadResponse:
+    return EDefterUploadResponse(
+        id=str(record.id),
+        company_id=str(record.company_id),
+        period=record.period,
+        file_name=record.file_name,
+        file_size=record.file_size,
+        validation_status=record.validation_status,
+        processed=record.processed,
+        upload_date=record.upload_date.isoformat(),
+        financial_summary=edefter_financial_summary(financial_data)
+    )
+
+def normalize_edefter_period(period: str) -> str:
+    """Store requested periods as YYYY-MM, like bulk imports, so uploads of the same period match"""
+    normalized = normalize_period(period)
+    if normalized is None:
+        raise HTTPException(status_code=400, detail="Period must contain a year and month, e.g. 2024-12")
+    return normalized
+
+def latest_edefter_period(db: Session, company_id: int) -> Optional[str]:
+    """Newest period with a valid record; periods are YYYY-MM, so string order is chronological"""
+    return db.query(func.max(EDefterData.period)).filter(
+        EDefterData.company_id == company_id,
+        EDefterData.validation_status == "valid"
+    ).scalar()
+
+def find_edefter_upload(db: Session, company_id: int, period: str, content_sha256: str) -> Optional[EDefterData]:
+    return db.query(EDefterData).filter(
+        EDefterData.company_id == company_id,
+        EDefterData.period == period,
+        EDefterData.content_sha256 == content_sha256
+    ).first()
+
+def edefter_existing_response(record: EDefterData) -> EDefterUploadResponse:
+    """Replay the outcome of an earlier upload of the same file"""
+    if record.validation_status != "valid":
+        raise HTTPException(status_code=400, detail=f"File processing failed: {edefter_record_error(record)}")
+    return edefter_upload_response(record, edefter_record_financials(record))
+
+def commit_edefter_upload(db: Session, company_id: int, period: str, content_sha256: str) -> Optional[EDefterData]:
+    """Commit; if a concurrent request stored the same file first, roll back and return its record"""
+    try:
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+        existing = find_edefter_upload(db, company_id, period, content_sha256)
+        if existing is None:
+            raise
+        return existing
+
+def store_edefter_upload(
+    db: Session,
+    company: Company,
+    period: str,
+    filename: str,
+    content_sha256: str,
+    result: dict
+) -> EDefterUploadResponse:
+    """Store a parse result: an invalid record on failure, otherwise upsert the period's valid record"""
+    if not result['success']:
+        # Create failed record (only the start of the file is kept for inspection)
+        edefter_record = EDefterData(
+            company_id=company.id,
+            period=period,
+            file_type=filename.split('.')[-1].upper(),
+            file_name=filename,
+            file_size=result['file_size'],
+            content_sha256=content_sha256,
+            raw_data_ref=result.get('raw_data_ref'),
+            processed=False,
+            validation_status="invalid",
+            validation_errors=json.dumps({"error": result['error']})
+        )
+        db.add(edefter_record)
+        commit_edefter_upload(db, company.id, period, content_sha256)
+        raise HTTPException(status_code=400, detail=f"File processing failed: {result['error']}")
+    
+    financial_data = result['financial_data']
+    stored_latest = latest_edefter_period(db, company.id)
+    
+    # A changed file for a period replaces that period's valid record in place
+    edefter_record = db.query(EDefterData).filter(
+        EDefterData.company_id == company.id,
+        EDefterData.period == period,
+        EDefterData.validation_status == "valid"
+    ).order_by(EDefterData.upload_date.desc()).first()
+    if edefter_record is None:
+        edefter_record = EDefterData(company_id=company.id, period=period)
+        db.add(edefter_record)
+    
+    # The requested period wins over the one declared in the file
+    for column, value in edefter_financial_columns(financial_data).items():
+        setattr(edefter_record, column, value)
+    edefter_record.file_type = filename.split('.')[-1].upper()
+    edefter_record.file_name = filename
+    edefter_record.file_size = result['file_size']
+    edefter_record.content_sha256 = content_sha256
+    edefter_record.raw_data_ref = result['raw_data_ref']
+    edefter_record.upload_date = datetime.utcnow()
+    edefter_record.processed = True
+    edefter_record.validation_status = "valid"
+    edefter_record.validation_errors = None
+    
+    # Update company financial data and risk scores, unless a newer period is already stored
+    if stored_latest is None or period >= stored_latest:
+        apply_edefter_financials(company, financial_data)
+    
+    committed = commit_edefter_upload(db, company.id, period, content_sha256)
+    if committed is not None:
+        # The same file was stored by a concurrent request
+        return edefter_existing_response(committed)
+    db.refresh(edefter_record)
+    
+    return edefter_upload_response(edefter_record, financial_data)
+
 @app.post("/api/v1/edefter/upload", response_model=EDefterUploadResponse)
 async def upload_edefter_file(
     company_id: int,
@@ -926,100 +1076,402 @@ async def upload_edefter_file(
     db: Session = Depends(get_db),
     current_user: UserResponse = Depends(get_current_user)
 ):
-    """Upload and process e-Defter file"""
+    """
+    Upload and process e-Defter file.
+    
+    Uploads are idempotent per (company, period, content SHA-256): an identical
+    re-upload returns the stored record without parsing, and a changed file for
+    a period that already has a valid record updates that record in place.
+    """
+    
+    period = normalize_edefter_period(period)
     
     # Validate company exists
     company = db.query(Company).filter(Company.id == company_id).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    # Read file content
-    content = await file.read()
-    file_content = content.decode('utf-8')
+    # Spool to disk first; the content hash is computed while writing
+    try:
+        spooled = await spool_upload(
+            file,
+            max_bytes=settings.EDEFTER_MAX_UPLOAD_BYTES,
+            magic=None,
+            suffix=".xml",
+            file_type="XML"
+        )
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     try:
-        # Parse e-Defter data
-        financial_data = parse_edefter_xml(file_content, company_id, file.filename)
-        
-        # Create e-Defter record
-        edefter_record = EDefterData(
-            company_id=company_id,
-            period=period,
-            file_type=file.filename.split('.')[-1].upper(),
-            file_name=file.filename,
-            file_size=len(content),
-            **financial_data,
-            raw_data=json.dumps(financial_data),
-            processed=True,
-            validation_status="valid"
+        existing = find_edefter_upload(db, company_id, period, spooled.sha256)
+        if existing is None:
+            result = (await parse_edefter_files([{'path': spooled.path, 'filename': file.filename}]))[0]
+    finally:
+        spooled.cleanup()
+    
+    if existing is not None:
+        return edefter_existing_response(existing)
+    
+    return store_edefter_upload(db, company, period, file.filename, spooled.sha256, result)
+
+# Resumable chunked uploads: initiate, PUT chunks at byte offsets, complete.
+# The parser is fed as the contiguous prefix grows, so most of the parsing is
+# done by the time the last chunk arrives.
+def edefter_upload_session(upload_id: str, current_user: UserResponse) -> UploadSession:
+    try:
+        return get_chunked_upload_store().get(upload_id, current_user.id, kind="edefter")
+    except UploadSessionNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+@app.post("/api/v1/edefter/uploads", status_code=status.HTTP_201_CREATED)
+async def create_edefter_upload(
+    company_id: int,
+    period: str,
+    filename: str,
+    size: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Open an upload session for a file of `size` bytes"""
+    period = normalize_edefter_period(period)
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    try:
+        session = await run_in_threadpool(
+            get_chunked_upload_store().create,
+            current_user.id,
+            "edefter",
+            filename,
+            size,
+            settings.EDEFTER_MAX_UPLOAD_BYTES,
+            {"company_id": company_id, "period": period},
+            EDefterStreamParser(ledger=TrialBalanceAggregator())
         )
-        
-        db.add(edefter_record)
-        
-        # Update company financial data
-        company.revenue = financial_data.get('net_sales', 0)
-        company.assets = financial_data.get('total_assets', 0)
-        company.liabilities = financial_data.get('total_liabilities', 0)
-        
-        # Recalculate risk scores based on new data
-        if financial_data.get('total_assets', 0) > 0:
-            debt_ratio = financial_data.get('total_liabilities', 0) / financial_data.get('total_assets', 0)
-            if debt_ratio < 0.3:
-                company.risk_level = RiskLevel.LOW
-                company.risk_score = 750 + int((1 - debt_ratio) * 200)
-            elif debt_ratio < 0.6:
-                company.risk_level = RiskLevel.MEDIUM
-                company.risk_score = 500 + int((0.6 - debt_ratio) * 500)
-            elif debt_ratio < 0.8:
-                company.risk_level = RiskLevel.HIGH
-                company.risk_score = 300 + int((0.8 - debt_ratio) * 400)
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.to_dict()
+
+@app.put("/api/v1/edefter/uploads/{upload_id}")
+async def upload_edefter_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Write the request body at `offset`.
+    
+    Chunks may arrive out of order and may be retried; a chunk whose
+    X-Chunk-SHA256 does not match is rejected and must be resent.
+    """
+    session = edefter_upload_session(upload_id, current_user)
+    store = get_chunked_upload_store()
+    try:
+        body = await read_chunk_body(request.stream(), store.max_chunk_bytes)
+        await run_in_threadpool(store.write_chunk, session, offset, body, x_chunk_sha256)
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return session.to_dict()
+
+@app.get("/api/v1/edefter/uploads/{upload_id}")
+def get_edefter_upload(
+    upload_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Upload progress; `committed` is the offset to resume from"""
+    return edefter_upload_session(upload_id, current_user).to_dict()
+
+@app.delete("/api/v1/edefter/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def abort_edefter_upload(
+    upload_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    get_chunked_upload_store().discard(edefter_upload_session(upload_id, current_user))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+async def parse_chunked_edefter_upload(session: UploadSession, spooled: SpooledUpload) -> dict:
+    """Close the parser fed during the upload; fall back to parsing the file if it did not see every byte"""
+    parser = session.consumer
+    if parser is not None and session.consumer_error is None and parser.bytes_parsed == spooled.size:
+        try:
+            return await run_in_threadpool(finish_edefter_parser, parser, spooled.filename)
+        except ET.ParseError:
+            pass
+    # Parse errors are reported (with the file preview) by the regular path
+    return (await parse_edefter_files([{'path': spooled.path, 'filename': spooled.filename}]))[0]
+
+@app.post("/api/v1/edefter/uploads/{upload_id}/complete", response_model=EDefterUploadResponse)
+async def complete_edefter_upload(
+    upload_id: str,
+    sha256: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Finish a chunked upload and store it like a single upload.
+    
+    `sha256`, when given, is checked against the whole file.
+    """
+    session = edefter_upload_session(upload_id, current_user)
+    company_id, period = session.metadata["company_id"], session.metadata["period"]
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    try:
+        spooled = await run_in_threadpool(get_chunked_upload_store().finalize, session, sha256)
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        existing = find_edefter_upload(db, company_id, period, spooled.sha256)
+        if existing is None:
+            result = await parse_chunked_edefter_upload(session, spooled)
+    finally:
+        spooled.cleanup()
+    
+    if existing is not None:
+        return edefter_existing_response(existing)
+    
+    return store_edefter_upload(db, company, period, spooled.filename, spooled.sha256, result)
+
+async def spool_edefter_uploads(files: List[UploadFile]) -> List[tuple]:
+    """Write uploads (and members of ZIP archives) to temp files as (filename, SpooledUpload | error)"""
+    items = []
+    try:
+        for upload in files:
+            if is_zip_upload(upload):
+                try:
+                    archive = await spool_upload(
+                        upload,
+                        max_bytes=settings.EDEFTER_BULK_MAX_ZIP_BYTES,
+                        magic=ZIP_MAGIC,
+                        suffix=".zip",
+                        file_type="ZIP"
+                    )
+                except InvalidFileTypeError as e:
+                    items.append((upload.filename, str(e)))
+                    continue
+                try:
+                    members = await run_in_threadpool(
+                        spool_zip_members,
+                        archive.path,
+                        settings.EDEFTER_MAX_UPLOAD_BYTES,
+                        settings.EDEFTER_BULK_MAX_FILES,
+                        settings.EDEFTER_BULK_MAX_UNPACKED_BYTES,
+                        magic=None,
+                        extension=".xml"
+                    )
+                except InvalidFileTypeError as e:
+                    members = []
+                    items.append((upload.filename, str(e)))
+                finally:
+                    archive.cleanup()
+                items.extend((f"{upload.filename}/{name}", member) for name, member in members)
             else:
-                company.risk_level = RiskLevel.CRITICAL
-                company.risk_score = 200 + int((1 - debt_ratio) * 200)
+                try:
+                    spooled = await spool_upload(
+                        upload,
+                        max_bytes=settings.EDEFTER_MAX_UPLOAD_BYTES,
+                        magic=None,
+                        suffix=".xml",
+                        file_type="XML"
+                    )
+                    items.append((upload.filename, spooled))
+                except InvalidFileTypeError as e:
+                    items.append((upload.filename, str(e)))
+            
+            if len(items) > settings.EDEFTER_BULK_MAX_FILES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"At most {settings.EDEFTER_BULK_MAX_FILES} files can be imported at once"
+                )
+    except UploadRejectedError as e:
+        cleanup_spooled_items(items)
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        cleanup_spooled_items(items)
+        raise
+    return items
+
+def cleanup_spooled_items(items: List[tuple]):
+    for _, item in items:
+        if isinstance(item, SpooledUpload):
+            item.cleanup()
+
+@app.post("/api/v1/edefter/bulk-upload")
+async def bulk_upload_edefter_files(
+    company_id: int,
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Import many e-Defter files (or ZIP archives of them) for one company.
+    
+    Files already stored for the company (same content SHA-256) and repeats
+    within the request are reported as unchanged without parsing. The rest are
+    parsed concurrently in a process pool; the period of each file comes from
+    the end date of its context (xbrli:endDate / xbrli:instant), or from a
+    YYYYMM / YYYY-MM in its file name. If several
+    files share a period the last one wins. Periods that already have a valid
+    record are updated in place, new ones are inserted with one bulk statement,
+    and the company is updated once from the latest period (only if no newer
+    period is already stored), in a single transaction.
+    """
+    company = db.query(Company).filter(Company.id == company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    
+    items = await spool_edefter_uploads(files)
+    try:
+        hashes = {item.sha256 for _, item in items if isinstance(item, SpooledUpload)}
+        stored = {
+            record.content_sha256: record
+            for record in db.query(
+                EDefterData.id,
+                EDefterData.period,
+                EDefterData.content_sha256,
+                EDefterData.validation_status
+            ).filter(EDefterData.company_id == company_id, EDefterData.content_sha256.in_(hashes))
+        } if hashes else {}
         
-        company.last_analysis = datetime.now().strftime("%Y-%m-%d")
+        first_seen = {}
+        to_parse = []
+        for index, (_, item) in enumerate(items):
+            if isinstance(item, SpooledUpload) and item.sha256 not in stored and item.sha256 not in first_seen:
+                first_seen[item.sha256] = index
+                to_parse.append(index)
         
-        db.commit()
-        db.refresh(edefter_record)
+        parsed = await parse_edefter_files([
+            {'path': items[index][1].path, 'filename': os.path.basename(items[index][0])} for index in to_parse
+        ])
+    finally:
+        cleanup_spooled_items(items)
+    results = dict(zip(to_parse, parsed))
+    
+    files_report = []
+    valid_rows = {}
+    invalid_rows = []
+    for index, (filename, item) in enumerate(items):
+        sha256 = item.sha256 if isinstance(item, SpooledUpload) else None
+        report = {
+            "file_name": filename,
+            "period": normalize_period(os.path.basename(filename)),
+            "file_size": item.size if sha256 else 0,
+            "status": "invalid",
+            "id": None,
+            "error": None
+        }
+        files_report.append(report)
         
-        return EDefterUploadResponse(
-            id=str(edefter_record.id),
-            company_id=str(company_id),
-            period=period,
-            file_name=file.filename,
-            file_size=len(content),
-            validation_status="valid",
-            processed=True,
-            upload_date=edefter_record.upload_date.isoformat(),
-            financial_summary={
-                "total_assets": financial_data.get('total_assets', 0),
-                "total_liabilities": financial_data.get('total_liabilities', 0),
-                "equity": financial_data.get('equity', 0),
-                "net_sales": financial_data.get('net_sales', 0),
-                "net_profit": financial_data.get('net_profit', 0),
-                "current_ratio": financial_data.get('current_ratio', 0),
-                "debt_to_equity": financial_data.get('debt_to_equity', 0)
-            }
-        )
+        if sha256 in stored:
+            record = stored[sha256]
+            report.update(period=record.period, status="unchanged", id=record.id)
+            if record.validation_status != "valid":
+                report['status'], report['error'] = "invalid", "File was already rejected"
+            continue
+        if sha256 is not None and first_seen[sha256] != index:
+            report.update(status="unchanged", error=None, duplicate_of=items[first_seen[sha256]][0])
+            continue
         
-    except Exception as e:
-        # Create failed record
-        edefter_record = EDefterData(
-            company_id=company_id,
-            period=period,
-            file_type=file.filename.split('.')[-1].upper(),
-            file_name=file.filename,
-            file_size=len(content),
-            raw_data=file_content,
-            processed=False,
-            validation_status="invalid",
-            validation_errors=json.dumps({"error": str(e)})
-        )
+        result = results.get(index) or {'error': item}
+        error = result.get('error')
+        if result.get('success') and not result.get('period'):
+            error = "Period could not be determined from the file contents or file name"
+        report['period'] = result.get('period') or report['period']
         
-        db.add(edefter_record)
+        row = {
+            'company_id': company_id,
+            'period': report['period'],
+            'file_type': filename.split('.')[-1].upper(),
+            'file_name': filename,
+            'file_size': report['file_size'],
+            'content_sha256': sha256,
+            'raw_data_ref': result.get('raw_data_ref')
+        }
+        if error is None:
+            row.update(
+                edefter_financial_columns(result['financial_data']),
+                processed=True,
+                validation_status="valid",
+                validation_errors=None
+            )
+            # Later files for the same period supersede earlier ones
+            if row['period'] in valid_rows:
+                superseded = valid_rows[row['period']]
+                superseded['report']['status'] = "superseded"
+            valid_rows[row['period']] = {'row': row, 'report': report, 'financial_data': result['financial_data']}
+        else:
+            row.update(
+                {column: 0.0 for column in EDEFTER_FINANCIAL_COLUMNS},
+                processed=False,
+                validation_status="invalid",
+                validation_errors=json.dumps({"error": error})
+            )
+            report['error'] = error
+            invalid_rows.append(row)
+    
+    stored_latest = latest_edefter_period(db, company_id)
+    
+    # Periods that already have a valid record are updated in place (latest record per period)
+    existing_ids = {}
+    if valid_rows:
+        for record in db.query(EDefterData.id, EDefterData.period).filter(
+            EDefterData.company_id == company_id,
+            EDefterData.period.in_(list(valid_rows)),
+            EDefterData.validation_status == "valid"
+        ).order_by(EDefterData.upload_date, EDefterData.id):
+            existing_ids[record.period] = record.id
+    
+    inserts = list(invalid_rows)
+    updates = []
+    now = datetime.utcnow()
+    for period, entry in valid_rows.items():
+        if period in existing_ids:
+            updates.append({**entry['row'], 'id': existing_ids[period], 'upload_date': now})
+            entry['report'].update(status="updated", id=existing_ids[period])
+        else:
+            inserts.append(entry['row'])
+            entry['report']['status'] = "created"
+    
+    if inserts:
+        db.execute(insert(EDefterData), inserts)
+    if updates:
+        db.execute(update(EDefterData), updates)
+    
+    # Periods are YYYY-MM, so string order is chronological. The company's
+    # figures follow its newest period overall, so importing older history
+    # does not overwrite them.
+    latest = max(valid_rows) if valid_rows else None
+    company_updated = latest is not None and (stored_latest is None or latest >= stored_latest)
+    if company_updated:
+        apply_edefter_financials(company, valid_rows[latest]['financial_data'])
+    
+    try:
         db.commit()
-        
-        raise HTTPException(status_code=400, detail=f"File processing failed: {str(e)}")
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Some of these files were imported by a concurrent request, retry")
+    
+    counts = {status_name: 0 for status_name in ("created", "updated", "unchanged", "superseded", "invalid")}
+    for report in files_report:
+        counts[report['status']] += 1
+    return {
+        "company_id": str(company_id),
+        "total": len(files_report),
+        **counts,
+        "latest_period": latest,
+        "company_updated": company_updated,
+        "financial_summary": edefter_financial_summary(valid_rows[latest]['financial_data']) if latest else None,
+        "files": files_report
+    }
 
 @app.get("/api/v1/edefter/sample/{company_id}")
 def generate_sample_edefter(
@@ -1067,15 +1519,66 @@ def download_sample_edefter(
         }
     )
 
+# History rows are projected to these columns; blob and error columns are never read
+EDEFTER_HISTORY_COLUMNS = (
+    EDefterData.id,
+    EDefterData.period,
+    EDefterData.file_name,
+    EDefterData.file_type,
+    EDefterData.file_size,
+    EDefterData.validation_status,
+    EDefterData.processed,
+    EDefterData.upload_date,
+    EDefterData.total_assets,
+    EDefterData.total_liabilities,
+    EDefterData.equity,
+    EDefterData.net_sales,
+    EDefterData.net_profit
+)
+
+EDEFTER_HISTORY_MAX_LIMIT = 200
+
+def encode_history_cursor(upload_date: datetime, record_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{upload_date.isoformat()}|{record_id}".encode()).decode()
+
+def decode_history_cursor(cursor: str) -> tuple:
+    try:
+        upload_date, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(upload_date), int(record_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/api/v1/edefter/history/{company_id}")
 def get_edefter_history(
     company_id: int,
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: UserResponse = Depends(get_current_user)
 ):
-    """Get e-Defter upload history for a company"""
+    """
+    Get e-Defter upload history for a company, newest first.
+    
+    Keyset pagination over (upload_date, id) served by the composite index;
+    pass the X-Next-Cursor response header back as `cursor` for the next page
+    (absent on the last page).
+    """
+    limit = max(1, min(limit, EDEFTER_HISTORY_MAX_LIMIT))
     
-    records = db.query(EDefterData).filter(EDefterData.company_id == company_id).order_by(EDefterData.upload_date.desc()).all()
+    query = db.query(*EDEFTER_HISTORY_COLUMNS).filter(EDefterData.company_id == company_id)
+    if cursor:
+        upload_date, record_id = decode_history_cursor(cursor)
+        query = query.filter(or_(
+            EDefterData.upload_date < upload_date,
+            and_(EDefterData.upload_date == upload_date, EDefterData.id < record_id)
+        ))
+    
+    # One extra row tells whether another page exists
+    records = query.order_by(EDefterData.upload_date.desc(), EDefterData.id.desc()).limit(limit + 1).all()
+    if len(records) > limit:
+        records = records[:limit]
+        response.headers["X-Next-Cursor"] = encode_history_cursor(records[-1].upload_date, records[-1].id)
     
     return [
         {
@@ -1098,10 +1601,105 @@ def get_edefter_history(
         for record in records
     ]
 
+@app.get("/api/v1/edefter/{record_id}/raw")
+def get_edefter_raw_data(
+    record_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Load the raw payload of an e-Defter record (parsed JSON, or the start of a rejected file)"""
+    from fastapi.responses import Response
+    
+    record = db.query(EDefterData).filter(EDefterData.id == record_id).first()
+    if not record:
+        raise HTTPException(status_code=404, detail="e-Defter record not found")
+    
+    if record.raw_data_ref:
+        try:
+            content = get_blob_store().get(record.raw_data_ref)
+        except BlobNotFoundError:
+            raise HTTPException(status_code=404, detail="Raw data not found")
+    elif record.raw_data:
+        # Records stored before the blob store keep the payload in the table
+        content = record.raw_data.encode('utf-8')
+    else:
+        raise HTTPException(status_code=404, detail="Raw data not found")
+    
+    return Response(
+        content=content,
+        media_type="application/json" if record.validation_status == "valid" else "text/plain; charset=utf-8"
+    )
+
+# Portfolio trend analytics (vectorized, see app.services.trend_analytics)
+TREND_MAX_COMPANIES = 1000
+
+@app.get("/api/v1/analytics/trends")
+def get_financial_trends(
+    company_ids: Optional[str] = None,
+    sector: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    metrics: Optional[str] = None,
+    window: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Period-over-period trends for one company or a portfolio segment.
+    
+    Companies are selected by comma separated `company_ids` and/or `sector` /
+    `risk_level`. Valid e-Defter periods are loaded as dense company x period
+    arrays and YoY/QoQ growth, rolling averages, CAGR and ratio trends (current
+    ratio, D/E, ROA, ROE) are computed for all companies at once.
+    """
+    fields = [field.strip() for field in metrics.split(",") if field.strip()] if metrics else list(DEFAULT_TREND_FIELDS)
+    unknown = [field for field in fields if field not in EDEFTER_FINANCIAL_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+    if window is not None and window < 1:
+        raise HTTPException(status_code=400, detail="window must be at least 1")
+    
+    query = db.query(Company.id, Company.name)
+    if company_ids:
+        try:
+            ids = [int(value) for value in company_ids.split(",") if value.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="company_ids must be comma separated integers")
+        query = query.filter(Company.id.in_(ids))
+    if sector:
+        query = query.filter(Company.sector == sector)
+    if risk_level:
+        query = query.filter(Company.risk_level == risk_level)
+    
+    companies = dict(query.order_by(Company.id).limit(TREND_MAX_COMPANIES + 1).all())
+    if len(companies) > TREND_MAX_COMPANIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {TREND_MAX_COMPANIES} companies can be analyzed at once"
+        )
+    
+    columns = required_fields(fields)
+    rows = (
+        db.query(EDefterData.company_id, EDefterData.period, *(getattr(EDefterData, column) for column in columns))
+        .filter(EDefterData.company_id.in_(list(companies)), EDefterData.validation_status == "valid")
+        .order_by(EDefterData.upload_date, EDefterData.id)
+        .all()
+    )
+    
+    # Later uploads of the same period replace earlier ones
+    series = build_series(((row.company_id, row.period, row._mapping) for row in rows), columns)
+    trends = compute_trends(series, fields=fields, window=window)
+    for company in trends['companies']:
+        company['company_name'] = companies.get(company['company_id'])
+    
+    with_data = set(series.company_ids)
+    trends['companies_without_data'] = [company_id for company_id in companies if company_id not in with_data]
+    return trends
+
 # Initialize sample data on startup
 @app.on_event("startup")
 def startup_event():
     create_tables()  # Ensure tables exist
+    get_tag_table()  # Compile the e-Defter taxonomy before the first upload
     init_sample_data()
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""
+Script to benchmark streaming e-Defter XML parsing throughput and memory.
+
+Generates a synthetic yevmiye (journal) file of the requested size, parses it
+in upload-sized chunks (building the trial balance as the upload endpoint
+does) and reports MB/sec, journal lines/sec and peak memory. Peak memory should
+stay flat as --size-mb grows; the run fails if throughput is below the target.
+
+Usage:
+    python scripts/benchmark_edefter_parser.py --size-mb 50,200
+    python scripts/benchmark_edefter_parser.py --size-mb 20 --compare-dom
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Dict, Any
+
+from app.services.edefter_ledger import TrialBalanceAggregator
+from app.services.edefter_parser import EDefterStreamParser, EDEFTER_CHUNK_SIZE
+
+# Kabul edilen en düşük ayrıştırma hızı (MB/sn)
+DEFAULT_TARGET_MB_PER_SEC = 20.0
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<edefter:defter xmlns:edefter="http://www.edefter.gov.tr"
+                xmlns:xbrli="http://www.xbrl.org/2003/instance"
+                xmlns:gl-cor="http://www.xbrl.org/int/gl/cor/2006-10-25">
+<xbrli:context id="FY2024">
+  <xbrli:period><xbrli:startDate>2024-01-01</xbrli:startDate><xbrli:endDate>2024-12-31</xbrli:endDate></xbrli:period>
+</xbrli:context>
+<gl-cor:accountingEntries>
+"""
+
+ENTRY = """<gl-cor:entryHeader>
+  <gl-cor:entryNumber>{number}</gl-cor:entryNumber>
+  <gl-cor:enteredDate>2024-12-{day:02d}</gl-cor:enteredDate>
+  <gl-cor:entryComment>Yevmiye kaydı {number}</gl-cor:entryComment>
+  <gl-cor:entryDetail>
+    <gl-cor:lineNumber>1</gl-cor:lineNumber>
+    <gl-cor:account><gl-cor:accountMainID>{debit}</gl-cor:accountMainID><gl-cor:accountMainDescription>Borçlu hesap</gl-cor:accountMainDescription></gl-cor:account>
+    <gl-cor:amount>{amount}</gl-cor:amount>
+    <gl-cor:debitCreditCode>D</gl-cor:debitCreditCode>
+  </gl-cor:entryDetail>
+  <gl-cor:entryDetail>
+    <gl-cor:lineNumber>2</gl-cor:lineNumber>
+    <gl-cor:account><gl-cor:accountMainID>{credit}</gl-cor:accountMainID><gl-cor:accountMainDescription>Alacaklı hesap</gl-cor:accountMainDescription></gl-cor:account>
+    <gl-cor:amount>{amount}</gl-cor:amount>
+    <gl-cor:debitCreditCode>C</gl-cor:debitCreditCode>
+  </gl-cor:entryDetail>
+</gl-cor:entryHeader>
+"""
+
+FOOTER = """</gl-cor:accountingEntries>
+<ToplamVarliklar>2500000000</ToplamVarliklar>
+<DonVarliklar>1500000000</DonVarliklar>
+<ToplamYukumlulukler>1800000000</ToplamYukumlulukler>
+<KisaVadeliYukumlulukler>800000000</KisaVadeliYukumlulukler>
+<Ozkaynaklar>700000000</Ozkaynaklar>
+<NetSatislar>3500000000</NetSatislar>
+<NetKar>320000000</NetKar>
+</edefter:defter>
+"""
+
+ACCOUNTS = ("100", "102", "120", "153", "320", "600", "620", "770")
+
+def generate_ledger(path: str, size_mb: int, seed: int = 42) -> int:
+    """Hedef boyutta yevmiye dosyası yaz; bayt sayısını döndür"""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    number = 0
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(HEADER)
+        while written < target:
+            block = []
+            for _ in range(1000):
+                number += 1
+                block.append(ENTRY.format(
+                    number=number,
+                    day=rng.randint(1, 31),
+                    debit=rng.choice(ACCOUNTS),
+                    credit=rng.choice(ACCOUNTS),
+                    amount=f"{rng.randint(1, 10 ** 7)}.{rng.randint(0, 99):02d}"
+                ))
+            chunk = "".join(block)
+            f.write(chunk)
+            written += len(chunk.encode('utf-8'))
+        f.write(FOOTER)
+
+    return os.path.getsize(path)
+
+def parse_streaming(path: str, chunk_size: int) -> Dict[str, Any]:
+    parser = EDefterStreamParser(ledger=TrialBalanceAggregator())
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    return parser.close()
+
+def parse_dom(path: str) -> int:
+    """Önceki yaklaşım: dosyanın tamamı str olarak okunup ET.fromstring"""
+    with open(path, 'rb') as f:
+        root = ET.fromstring(f.read().decode('utf-8'))
+    return len(root)
+
+def measure(func, *args) -> Dict[str, Any]:
+    started = time.perf_counter()
+    output = func(*args)
+    seconds = time.perf_counter() - started
+
+    # Bellek ölçümü ayrı geçişte yapılır; tracemalloc süreleri bozmasın
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'seconds': seconds, 'peak_memory_mb': peak / (1024 * 1024), 'output': output}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming e-Defter parsing")
+    parser.add_argument("--size-mb", default="20,100", help="Comma separated file sizes")
+    parser.add_argument("--chunk-size", type=int, default=EDEFTER_CHUNK_SIZE)
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET_MB_PER_SEC, help="Minimum MB/sec")
+    parser.add_argument("--compare-dom", action="store_true", help="Also time the full-DOM approach")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="edefter_bench_") as workdir:
+        for size_mb in (int(s) for s in args.size_mb.split(",")):
+            path = os.path.join(workdir, f"yevmiye_{size_mb}mb.xml")
+            size = generate_ledger(path, size_mb, args.seed)
+            megabytes = size / (1024 * 1024)
+
+            result = measure(parse_streaming, path, args.chunk_size)
+            mb_per_sec = megabytes / result['seconds']
+            status = "✅" if mb_per_sec >= args.target else "❌"
+            failed = failed or mb_per_sec < args.target
+            lines = result['output'].get('ledger', {}).get('lines', 0)
+            print(
+                f"{status} {megabytes:>7.1f} MB  streaming  {mb_per_sec:>7.1f} MB/sec  "
+                f"{lines / result['seconds']:>10,.0f} lines/sec  peak {result['peak_memory_mb']:>7.1f} MB"
+            )
+
+            if args.compare_dom:
+                dom = measure(parse_dom, path)
+                print(
+                    f"   {megabytes:>7.1f} MB  full DOM   {megabytes / dom['seconds']:>7.1f} MB/sec  "
+                    f"peak {dom['peak_memory_mb']:>7.1f} MB"
+                )
+
+            os.unlink(path)
+
+    print(f"🎯 target {args.target:.1f} MB/sec")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
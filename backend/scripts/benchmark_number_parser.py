@@ -0,0 +1,69 @@
+"""
+Script to microbenchmark the Turkish number parser against the legacy stripping approach.
+
+Usage:
+    python scripts/benchmark_number_parser.py --lines 20000 --repeat 5
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import argparse
+import random
+import re
+import timeit
+from typing import List
+
+from app.services.number_parser import parse_numbers, parse_tokens, split_label_and_numbers
+
+LABELS = [
+    "Dönen Varlıklar", "Ticari Alacaklar", "Stoklar", "Kısa Vadeli Yükümlülükler",
+    "Net Satışlar", "Satışların Maliyeti (-)", "Faaliyet Giderleri", "Net Dönem Karı",
+]
+
+def make_lines(count: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        values = [rng.randint(0, 10 ** rng.randint(3, 10)) + rng.randint(0, 99) / 100 for _ in range(2)]
+        amounts = [f"{int(v):,}".replace(",", ".") + f",{int(round(v * 100)) % 100:02d}" for v in values]
+        lines.append(f"{rng.choice(LABELS)}    {amounts[0]}    {amounts[1]}")
+    return lines
+
+def legacy_parse_line(line: str) -> List[float]:
+    """Önceki extractor davranışı (karşılaştırma için)"""
+    numbers = []
+    for num_str in re.findall(r'([0-9.,]+)', line):
+        clean_num = num_str.replace(',', '').replace('.', '')
+        if clean_num.isdigit():
+            numbers.append(float(clean_num))
+    return numbers
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the number parser")
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    tokens = [token for line in lines for token in line.split("    ")[1:]]
+
+    cases = {
+        'legacy strip (wrong values)': lambda: [legacy_parse_line(line) for line in lines],
+        'parse_numbers': lambda: [parse_numbers(line) for line in lines],
+        'split_label_and_numbers': lambda: [split_label_and_numbers(line) for line in lines],
+        'parse_tokens': lambda: parse_tokens(tokens),
+    }
+
+    print(f"📄 {len(lines)} lines, {len(tokens)} tokens, best of {args.repeat}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print(f"   {name:<28} {best * 1000:>8.1f} ms  {len(tokens) / best:>12,.0f} tokens/sec")
+
+    sample = lines[0]
+    print(f"🔎 {sample!r}")
+    print(f"   legacy        {legacy_parse_line(sample)}")
+    print(f"   parse_numbers {parse_numbers(sample)}")
+
+if __name__ == "__main__":
+    main()
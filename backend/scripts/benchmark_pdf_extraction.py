@@ -0,0 +1,320 @@
+"""
+Script to benchmark PDF extraction speed, memory and accuracy on a synthetic corpus.
+
+Reports pages/sec, MB/sec, peak memory, per-stage time and field-level accuracy
+against ground truth, and compares the run with a stored baseline.
+
+Usage:
+    python scripts/benchmark_pdf_extraction.py --pages 2,20,200 --count 3
+    python scripts/benchmark_pdf_extraction.py --corpus /tmp/pdf_corpus --save-baseline
+    python scripts/benchmark_pdf_extraction.py --pages 2,200,2000 --profile-backends --profile-output profile.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(os.path.dirname(__file__))
+
+import argparse
+import json
+import logging
+import resource
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+from app.services.pdf_extractor import TurkishTaxPDFExtractor
+from app.services.pdf_backends import available_backends, document_class, DOCUMENT_CLASSES
+from generate_pdf_corpus import generate_corpus, load_corpus, LAYOUTS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "pdf_benchmark_baseline.json")
+DEFAULT_PROFILE = os.path.join(os.path.dirname(__file__), "pdf_backend_profile.json")
+
+# Yüksek olması iyi olan metrikler; geri kalanlarda düşük olan iyidir
+HIGHER_IS_BETTER = {'pages_per_sec', 'mb_per_sec', 'field_accuracy'}
+COMPARED_METRICS = ('pages_per_sec', 'mb_per_sec', 'peak_memory_mb', 'field_accuracy')
+
+# Eski sürümlerdeki snake_case tablo adları
+TABLE_ALIASES = {
+    'vergiBildirimi': 'vergi_bildirimi',
+    'mahsupVergiler': 'mahsup_vergiler',
+    'gelirTablosu': 'gelir_tablosu',
+}
+
+def _values_match(expected: Any, actual: Any) -> bool:
+    if isinstance(expected, (int, float)) and not isinstance(expected, bool):
+        try:
+            return abs(float(actual) - float(expected)) <= 0.5
+        except (TypeError, ValueError):
+            return False
+    return str(actual or '') == str(expected)
+
+def score_fields(truth: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, bool]:
+    """Her ground-truth alanı için doğru çıkarılıp çıkarılmadığı"""
+    scores = {}
+    extracted_info = result.get('companyInfo') or {}
+    for field, expected in truth['companyInfo'].items():
+        scores[f"companyInfo.{field}"] = _values_match(expected, extracted_info.get(field))
+
+    extracted_tables = result.get('tables') or {}
+    for table_name, rows in truth['tables'].items():
+        table = extracted_tables.get(table_name) or extracted_tables.get(TABLE_ALIASES.get(table_name, ''), {}) or {}
+        for label, expected in rows.items():
+            scores[f"{table_name}.{label}"] = _values_match(expected, table.get(label))
+
+    return scores
+
+def run_benchmark(
+    corpus: List[Dict[str, Any]],
+    page_budget: Optional[int] = None,
+    repeat: int = 1,
+    measure_memory: bool = True,
+    backend: Optional[str] = None,
+    timing_debug: bool = False
+) -> Dict[str, Any]:
+    """Korpus üzerinde extractor'ı çalıştır ve özet metrikleri döndür"""
+    extractor = TurkishTaxPDFExtractor(page_budget=page_budget, backend=backend, timing_debug=timing_debug)
+    stage_seconds: Dict[str, float] = defaultdict(float)
+
+    total_seconds = 0.0
+    total_pages = 0
+    total_bytes = 0
+    failures = 0
+    field_hits: Dict[str, List[bool]] = defaultdict(list)
+    layout_hits: Dict[str, List[bool]] = defaultdict(list)
+    documents = []
+
+    for entry in corpus:
+        seconds = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = extractor.extract_financial_data(entry['pdf'])
+            seconds.append(time.perf_counter() - started)
+            # Aşama süreleri extractor'ın kendi ölçümünden alınır
+            for stage, stage_time in result.get('metadata', {}).get('timings', {}).items():
+                if stage != 'total':
+                    stage_seconds[stage] += stage_time
+
+        elapsed = min(seconds)
+        total_seconds += elapsed
+        total_pages += entry['page_count']
+        total_bytes += entry['size_bytes']
+        if not result.get('success'):
+            failures += 1
+
+        scores = score_fields(entry['ground_truth'], result)
+        for field, hit in scores.items():
+            field_hits[field].append(hit)
+            layout_hits[entry['layout']].append(hit)
+
+        documents.append({
+            'name': entry['name'],
+            'class': document_class(entry['size_bytes']),
+            'bytes': entry['size_bytes'],
+            'pages': entry['page_count'],
+            'seconds': round(elapsed, 4),
+            'accuracy': round(sum(scores.values()) / len(scores), 4) if scores else 0.0,
+            'success': bool(result.get('success'))
+        })
+
+    # Bellek ölçümü ayrı geçişte yapılır; tracemalloc süreleri bozmasın
+    peak_memory = 0
+    if measure_memory:
+        for entry in corpus:
+            tracemalloc.start()
+            TurkishTaxPDFExtractor(page_budget=page_budget, backend=backend).extract_financial_data(entry['pdf'])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_memory = max(peak_memory, peak)
+
+    all_hits = [hit for hits in field_hits.values() for hit in hits]
+    stage_total = sum(stage_seconds.values()) or 1.0
+
+    return {
+        'backend': backend or 'auto',
+        'documents': len(corpus),
+        'failures': failures,
+        'pages': total_pages,
+        'megabytes': round(total_bytes / (1024 * 1024), 3),
+        'seconds': round(total_seconds, 4),
+        'pages_per_sec': round(total_pages / total_seconds, 2) if total_seconds else 0.0,
+        'mb_per_sec': round(total_bytes / (1024 * 1024) / total_seconds, 3) if total_seconds else 0.0,
+        'peak_memory_mb': round(peak_memory / (1024 * 1024), 2) if measure_memory else None,
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        'stages': {
+            stage: {
+                'seconds': round(seconds / repeat, 4),
+                'share': round(seconds / stage_total, 3)
+            }
+            for stage, seconds in sorted(stage_seconds.items(), key=lambda item: -item[1])
+        },
+        'field_accuracy': round(sum(all_hits) / len(all_hits), 4) if all_hits else 0.0,
+        'accuracy_by_layout': {
+            layout: round(sum(hits) / len(hits), 4) for layout, hits in sorted(layout_hits.items())
+        },
+        'accuracy_by_field': {
+            field: round(sum(hits) / len(hits), 4) for field, hits in sorted(field_hits.items())
+        },
+        'per_document': documents
+    }
+
+def profile_backends(
+    corpus: List[Dict[str, Any]],
+    page_budget: Optional[int] = None,
+    repeat: int = 1,
+    accuracy_tolerance: float = 0.01
+) -> Dict[str, Any]:
+    """
+    Kurulu her motoru belge sınıfı bazında ölç ve sınıf başına en hızlısını seç.
+    Doğruluğu en iyi motorun toleransı dışında kalan motorlar seçilmez.
+    """
+    measurements: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(dict)
+
+    for backend in available_backends():
+        report = run_benchmark(corpus, page_budget, repeat, measure_memory=False, backend=backend)
+        by_class: Dict[str, Dict[str, float]] = defaultdict(lambda: {'pages': 0, 'bytes': 0, 'seconds': 0.0, 'accuracy': []})
+        for document in report['per_document']:
+            stats = by_class[document['class']]
+            stats['pages'] += document['pages']
+            stats['bytes'] += document['bytes']
+            stats['seconds'] += document['seconds']
+            stats['accuracy'].append(document['accuracy'])
+
+        for class_name, stats in by_class.items():
+            measurements[class_name][backend] = {
+                'pages_per_sec': round(stats['pages'] / stats['seconds'], 2) if stats['seconds'] else 0.0,
+                'mb_per_sec': round(stats['bytes'] / (1024 * 1024) / stats['seconds'], 3) if stats['seconds'] else 0.0,
+                'field_accuracy': round(sum(stats['accuracy']) / len(stats['accuracy']), 4)
+            }
+        print(f"   {backend:<10} {report['pages_per_sec']:>10} pages/sec  accuracy {report['field_accuracy']:.1%}")
+
+    classes = {}
+    for class_name, backends in measurements.items():
+        best_accuracy = max(m['field_accuracy'] for m in backends.values())
+        eligible = {
+            name: m for name, m in backends.items()
+            if m['field_accuracy'] >= best_accuracy - accuracy_tolerance
+        }
+        chosen = max(eligible, key=lambda name: eligible[name]['pages_per_sec'])
+        classes[class_name] = {'backend': chosen, 'measurements': backends}
+
+    return {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'class_limits': {name: limit for name, limit in DOCUMENT_CLASSES},
+        'classes': classes
+    }
+
+def compare_with_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Baseline'a göre toleransı aşan gerilemeleri döndür"""
+    regressions = []
+    for metric in COMPARED_METRICS:
+        old, new = baseline.get(metric), report.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        print(f"   {metric:<16} {old:>10} -> {new:<10} ({change:+.1%})")
+        if worse > tolerance:
+            regressions.append(f"{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+def print_report(report: Dict[str, Any], verbose: bool = False):
+    print(f"🔧 text backend: {report['backend']}")
+    print(f"📄 {report['documents']} documents, {report['pages']} pages, {report['megabytes']} MB "
+          f"({report['failures']} failed)")
+    print(f"⚡ {report['pages_per_sec']} pages/sec, {report['mb_per_sec']} MB/sec")
+    if report['peak_memory_mb'] is not None:
+        print(f"💾 peak traced memory {report['peak_memory_mb']} MB, max RSS {report['max_rss_mb']} MB")
+    print("⏱️  stages:")
+    for stage, stats in report['stages'].items():
+        print(f"   {stage:<16} {stats['seconds']:>8.3f}s  {stats['share']:.0%}")
+    print(f"🎯 field accuracy {report['field_accuracy']:.1%}")
+    for layout, accuracy in report['accuracy_by_layout'].items():
+        print(f"   {layout:<14} {accuracy:.1%}")
+    if verbose:
+        for field, accuracy in report['accuracy_by_field'].items():
+            print(f"   {field:<50} {accuracy:.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction")
+    parser.add_argument("--corpus", help="Existing corpus directory (generated into a temp dir if omitted)")
+    parser.add_argument("--count", type=int, default=3, help="Documents per layout and page count")
+    parser.add_argument("--pages", default="2,20,100", help="Comma separated page counts")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS))
+    parser.add_argument("--number-format", choices=("tr", "plain"), default="tr")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--page-budget", type=int, default=None)
+    parser.add_argument("--backend", help="Force a text backend (default: auto selection)")
+    parser.add_argument("--slow-pages", action="store_true",
+                        help="Log per-stage timings and the slowest pages of each document")
+    parser.add_argument("--profile-backends", action="store_true",
+                        help="Measure every installed backend per document class and write a profile")
+    parser.add_argument("--profile-output", default=DEFAULT_PROFILE,
+                        help="Profile path (point PDF_BACKEND_PROFILE at it)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per document (best time is kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression ratio")
+    parser.add_argument("--output", help="Write the full JSON report to this path")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pdf_corpus_") as tmp_dir:
+        if args.corpus and os.path.exists(os.path.join(args.corpus, "manifest.json")):
+            corpus = load_corpus(args.corpus)
+        else:
+            corpus = generate_corpus(
+                args.corpus or tmp_dir,
+                count=args.count,
+                page_counts=tuple(int(p) for p in args.pages.split(",")),
+                layouts=tuple(args.layouts.split(",")),
+                number_format=args.number_format,
+                seed=args.seed
+            )
+
+        if args.profile_backends:
+            print(f"🔬 profiling backends on {len(corpus)} documents:")
+            profile = profile_backends(corpus, args.page_budget, args.repeat)
+            with open(args.profile_output, "w", encoding="utf-8") as f:
+                json.dump(profile, f, indent=2)
+            for class_name, choice in sorted(profile['classes'].items()):
+                print(f"   {class_name:<10} -> {choice['backend']}")
+            print(f"✅ Backend profile saved to {args.profile_output}")
+            return
+
+        if args.slow_pages:
+            logging.basicConfig(level=logging.INFO, format="%(message)s")
+        report = run_benchmark(
+            corpus, args.page_budget, args.repeat, not args.no_memory, args.backend, args.slow_pages
+        )
+
+    print_report(report, args.verbose)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    summary = {k: v for k, v in report.items() if k not in ('per_document', 'accuracy_by_field')}
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("📊 compared with baseline:")
+        regressions = compare_with_baseline(summary, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions beyond tolerance:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("✅ No regressions beyond tolerance")
+
+if __name__ == "__main__":
+    main()
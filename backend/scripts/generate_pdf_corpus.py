@@ -0,0 +1,349 @@
+"""
+Script to generate a synthetic Kurumlar Vergisi Beyannamesi PDF corpus for benchmarks.
+
+Writes minimal PDF files (standard Helvetica font, no external dependency)
+together with a ground-truth JSON file per document.
+
+Usage:
+    python scripts/generate_pdf_corpus.py --output /tmp/pdf_corpus --count 5 --pages 2,20,200
+"""
+import argparse
+import json
+import os
+import random
+import zlib
+from typing import Dict, Any, List, Tuple
+
+LAYOUTS = ("compact", "spread", "two_column")
+NUMBER_FORMATS = ("tr", "plain")
+
+# Helvetica WinAnsiEncoding'de olmayan Türkçe karakterler cp1254 konumlarına eşlenir
+FONT_DIFFERENCES = "[208 /Gbreve 221 /Idotaccent 222 /Scedilla 240 /gbreve 253 /dotlessi 254 /scedilla]"
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+LINE_HEIGHT = 14
+LINES_PER_PAGE = 50
+
+FILLER_SENTENCES = [
+    "Bu beyanname ekinde yer alan açıklamalar bilgi amaçlıdır.",
+    "Mükellef tarafından sunulan belgeler dosyada muhafaza edilmektedir.",
+    "Dönem içinde yapılan düzeltmeler ilgili notlarda gösterilmiştir.",
+    "Tutarlar Türk Lirası cinsinden ifade edilmiştir.",
+    "Muhasebe politikalarında önceki döneme göre değişiklik yoktur.",
+    "Bağımsız denetim raporu ayrıca sunulmuştur.",
+]
+
+TABLE_HEADINGS = {
+    'ilaveler': "İLAVELER",
+    'vergiBildirimi': "VERGİ BİLDİRİMİ",
+    'mahsupVergiler': "MAHSUP EDİLECEK VERGİLER",
+    'aktif': "AKTİF",
+    'pasif': "PASİF",
+    'gelirTablosu': "GELİR TABLOSU",
+}
+
+def generate_declaration(rng: random.Random) -> Dict[str, Any]:
+    """Tutarlı rastgele beyanname verisi (ground truth)"""
+    def amount(low: int, high: int) -> int:
+        return rng.randint(low, high) * 1000
+
+    nakit = amount(200, 3000)
+    alacak = amount(500, 5000)
+    stok = amount(300, 4000)
+    donen = nakit + alacak + stok
+    maddi = amount(2000, 12000)
+    maddi_olmayan = amount(100, 3000)
+    duran = maddi + maddi_olmayan
+    toplam_aktif = donen + duran
+
+    ticari_borc = amount(500, 3000)
+    diger_borc = amount(100, 2000)
+    kisa_vadeli = ticari_borc + diger_borc
+    finansal_borc = amount(200, 4000)
+    uzun_vadeli = finansal_borc
+    ozkaynak = toplam_aktif - kisa_vadeli - uzun_vadeli
+    net_donem_kari = amount(50, 1500)
+
+    brut_satis = amount(8000, 40000)
+    satis_indirim = amount(100, 900)
+    net_satis = brut_satis - satis_indirim
+    satis_maliyeti = int(net_satis * rng.uniform(0.55, 0.8))
+    brut_kar = net_satis - satis_maliyeti
+    faaliyet_gideri = int(brut_kar * rng.uniform(0.4, 0.8))
+    faaliyet_kari = brut_kar - faaliyet_gideri
+    finansman_gideri = int(faaliyet_kari * rng.uniform(0.05, 0.3))
+    vergi_oncesi = faaliyet_kari - finansman_gideri
+    vergi_gideri = int(vergi_oncesi * 0.2)
+    net_kar = vergi_oncesi - vergi_gideri
+
+    amortisman = amount(50, 400)
+    karsilik = amount(10, 200)
+    diger_ilave = amount(5, 100)
+
+    tax_id = "".join(str(rng.randint(0, 9)) for _ in range(10))
+
+    return {
+        'companyInfo': {
+            'taxId': tax_id,
+            'email': f"info@firma{tax_id[:4]}.com.tr",
+            'tradeRegistryNo': str(rng.randint(100000, 999999)),
+            'commercialProfit': vergi_oncesi
+        },
+        'tables': {
+            'ilaveler': {
+                'Amortisman İlavesi': amortisman,
+                'Karşılık İlavesi': karsilik,
+                'Diğer İlaveler': diger_ilave,
+                'Toplam İlaveler': amortisman + karsilik + diger_ilave
+            },
+            'vergiBildirimi': {
+                'Ticari Kar': vergi_oncesi,
+                'Vergi Matrahı': vergi_oncesi + amortisman,
+                'Kurumlar Vergisi': vergi_gideri,
+            },
+            'mahsupVergiler': {
+                'Stopaj Vergisi': amount(10, 200),
+                'Geçici Vergi': amount(50, 500),
+            },
+            'aktif': {
+                'Dönen Varlıklar': donen,
+                'Nakit ve Nakit Benzerleri': nakit,
+                'Ticari Alacaklar': alacak,
+                'Stoklar': stok,
+                'Duran Varlıklar': duran,
+                'Maddi Duran Varlıklar': maddi,
+                'Maddi Olmayan Duran Varlıklar': maddi_olmayan,
+                'Toplam Aktif': toplam_aktif
+            },
+            'pasif': {
+                'Kısa Vadeli Yükümlülükler': kisa_vadeli,
+                'Ticari Borçlar': ticari_borc,
+                'Diğer Borçlar': diger_borc,
+                'Uzun Vadeli Yükümlülükler': uzun_vadeli,
+                'Finansal Borçlar': finansal_borc,
+                'Özkaynaklar': ozkaynak,
+                'Net Dönem Karı': net_donem_kari,
+                'Toplam Pasif': toplam_aktif
+            },
+            'gelirTablosu': {
+                'Brüt Satışlar': brut_satis,
+                'Satış İndirimleri': satis_indirim,
+                'Net Satışlar': net_satis,
+                'Satışların Maliyeti': satis_maliyeti,
+                'Brüt Kar': brut_kar,
+                'Faaliyet Giderleri': faaliyet_gideri,
+                'Faaliyet Karı': faaliyet_kari,
+                'Finansman Giderleri': finansman_gideri,
+                'Vergi Öncesi Kar': vergi_oncesi,
+                'Vergi Gideri': vergi_gideri,
+                'Net Dönem Karı': net_kar
+            }
+        }
+    }
+
+def format_amount(value: float, number_format: str) -> str:
+    if number_format == "plain":
+        return str(int(value))
+    # Türk biçimi: 1.234.567,00
+    integer = f"{int(value):,}".replace(",", ".")
+    return f"{integer},00"
+
+def layout_pages(
+    declaration: Dict[str, Any],
+    layout: str,
+    page_count: int,
+    number_format: str,
+    rng: random.Random
+) -> List[List[str]]:
+    """Beyanname verisini sayfa satırlarına yerleştir"""
+    info = declaration['companyInfo']
+    header = [
+        "KURUMLAR VERGİSİ BEYANNAMESİ",
+        f"VKN: {info['taxId']}",
+        f"E-posta: {info['email']}",
+        f"Ticaret Sicil No: {info['tradeRegistryNo']}",
+        f"Ticari Bilanço Karı: {format_amount(info['commercialProfit'], number_format)}",
+        "",
+    ]
+
+    table_blocks = []
+    for table_name, rows in declaration['tables'].items():
+        block = [TABLE_HEADINGS[table_name]]
+        for label, value in rows.items():
+            if layout == "two_column":
+                previous = value * rng.uniform(0.7, 1.1)
+                block.append(f"{label}    {format_amount(value, number_format)}    {format_amount(previous, number_format)}")
+            else:
+                block.append(f"{label}    {format_amount(value, number_format)}")
+        block.append("")
+        table_blocks.append(block)
+
+    def filler_page() -> List[str]:
+        return [rng.choice(FILLER_SENTENCES) for _ in range(LINES_PER_PAGE // 2)]
+
+    pages: List[List[str]] = []
+    if layout == "spread":
+        # Tablolar belge boyunca dağıtılır, aralar açıklama sayfalarıyla dolar
+        pages.append(header)
+        slots = max(page_count - 1, len(table_blocks))
+        positions = sorted(rng.sample(range(slots), len(table_blocks)))
+        blocks = iter(table_blocks)
+        for slot in range(slots):
+            pages.append(next(blocks) if slot in positions else filler_page())
+    else:
+        current = list(header)
+        for block in table_blocks:
+            if len(current) + len(block) > LINES_PER_PAGE:
+                pages.append(current)
+                current = []
+            current.extend(block)
+        pages.append(current)
+        while len(pages) < page_count:
+            pages.append(filler_page())
+
+    return pages
+
+def _pdf_string(text: str) -> bytes:
+    out = bytearray(b"(")
+    for byte in text.encode("cp1254", errors="replace"):
+        if byte in (0x28, 0x29, 0x5C):
+            out += b"\\" + bytes([byte])
+        elif byte < 0x20 or byte > 0x7E:
+            out += f"\\{byte:03o}".encode("ascii")
+        else:
+            out.append(byte)
+    out += b")"
+    return bytes(out)
+
+def _page_stream(lines: List[str]) -> bytes:
+    parts = [b"BT", b"/F1 10 Tf", f"{LINE_HEIGHT} TL".encode("ascii"), f"50 {PAGE_HEIGHT - 60} Td".encode("ascii")]
+    for line in lines:
+        parts.append(_pdf_string(line) + b" Tj T*")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+def write_pdf(path: str, pages: List[List[str]], compress: bool = True):
+    """Çok sayfalı, yalnızca metin içeren en küçük PDF'i yaz"""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"")
+    pages_id = add(b"")
+    font_id = add(
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding "
+        b"<< /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences "
+        + FONT_DIFFERENCES.encode("ascii") + b" >> >>"
+    )
+
+    page_ids = []
+    for lines in pages:
+        stream = _page_stream(lines)
+        if compress:
+            stream = zlib.compress(stream)
+            header = f"<< /Length {len(stream)} /Filter /FlateDecode >>".encode("ascii")
+        else:
+            header = f"<< /Length {len(stream)} >>".encode("ascii")
+        content_id = add(header + b"\nstream\n" + stream + b"\nendstream")
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>".encode("ascii")
+        ))
+
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("ascii")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+
+        xref_offset = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n".encode("ascii"))
+        f.write(b"0000000000 65535 f \n")
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode("ascii"))
+        f.write(
+            f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+
+def generate_corpus(
+    output_dir: str,
+    count: int = 3,
+    page_counts: Tuple[int, ...] = (2, 20, 100),
+    layouts: Tuple[str, ...] = LAYOUTS,
+    number_format: str = "tr",
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """Her (düzen, sayfa sayısı) için count adet belge üret; manifest döndür"""
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    manifest = []
+
+    for layout in layouts:
+        for page_count in page_counts:
+            for index in range(count):
+                declaration = generate_declaration(rng)
+                pages = layout_pages(declaration, layout, page_count, number_format, rng)
+                name = f"kv_{layout}_{page_count}p_{index:03d}"
+                pdf_path = os.path.join(output_dir, f"{name}.pdf")
+                truth_path = os.path.join(output_dir, f"{name}.json")
+
+                write_pdf(pdf_path, pages)
+                entry = {
+                    'name': name,
+                    'pdf': pdf_path,
+                    'layout': layout,
+                    'number_format': number_format,
+                    'page_count': len(pages),
+                    'size_bytes': os.path.getsize(pdf_path),
+                    'ground_truth': declaration
+                }
+                with open(truth_path, "w", encoding="utf-8") as f:
+                    json.dump(entry, f, ensure_ascii=False, indent=2)
+                manifest.append(entry)
+
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump([{k: v for k, v in e.items() if k != 'ground_truth'} for e in manifest], f, indent=2)
+
+    return manifest
+
+def load_corpus(corpus_dir: str) -> List[Dict[str, Any]]:
+    """Daha önce üretilmiş korpusu ground truth ile birlikte yükle"""
+    entries = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith(".json") and name != "manifest.json":
+            with open(os.path.join(corpus_dir, name), encoding="utf-8") as f:
+                entries.append(json.load(f))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic tax declaration PDF corpus")
+    parser.add_argument("--output", required=True, help="Output directory")
+    parser.add_argument("--count", type=int, default=3, help="Documents per layout and page count")
+    parser.add_argument("--pages", default="2,20,100", help="Comma separated page counts")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS), help="Comma separated layouts")
+    parser.add_argument("--number-format", choices=NUMBER_FORMATS, default="tr")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(
+        args.output,
+        count=args.count,
+        page_counts=tuple(int(p) for p in args.pages.split(",")),
+        layouts=tuple(args.layouts.split(",")),
+        number_format=args.number_format,
+        seed=args.seed
+    )
+    total_mb = sum(e['size_bytes'] for e in manifest) / (1024 * 1024)
+    print(f"✅ {len(manifest)} PDF written to {args.output} ({total_mb:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# Testler backend dizininden veya depo kökünden çalıştırılabilir
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import blob_store  # noqa: E402
+
+@pytest.fixture
+def tmp_blob_store(tmp_path, monkeypatch):
+    """Blob deposunu testin geçici dizinine yönlendir"""
+    store = blob_store.BlobStore(str(tmp_path / "blobs"))
+    monkeypatch.setattr(blob_store, "_store", store)
+    return store
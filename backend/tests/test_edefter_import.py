@@ -0,0 +1,115 @@
+import pytest
+
+from app.services.edefter_import import finish_edefter_parser, normalize_period, parse_edefter_file
+from app.services.edefter_ledger import TrialBalanceAggregator
+from app.services.edefter_parser import EDefterStreamParser
+
+DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<edefter:defter xmlns:edefter="http://www.edefter.gov.tr" xmlns:xbrli="http://www.xbrl.org/2003/instance">
+{context}
+<ToplamVarliklar>2500000000</ToplamVarliklar>
+</edefter:defter>"""
+
+def duration(start: str, end: str) -> str:
+    return (
+        '<xbrli:context id="D"><xbrli:period>'
+        f'<xbrli:startDate>{start}</xbrli:startDate><xbrli:endDate>{end}</xbrli:endDate>'
+        '</xbrli:period></xbrli:context>'
+    )
+
+def instant(date: str) -> str:
+    return f'<xbrli:context id="I"><xbrli:period><xbrli:instant>{date}</xbrli:instant></xbrli:period></xbrli:context>'
+
+def write(tmp_path, context: str, name: str = "defter.xml") -> str:
+    path = tmp_path / name
+    path.write_text(DOCUMENT.format(context=context), encoding="utf-8")
+    return str(path)
+
+@pytest.mark.parametrize("context, period", [
+    (duration("2024-01-01", "2024-12-31"), "2024-12"),
+    (duration("2024-01-01", "2024-06-30"), "2024-06"),
+    (instant("2024-03-31"), "2024-03"),
+    # Bilanço (anlık) ve gelir tablosu (dönem) bağlamları birlikte
+    (instant("2024-12-31") + duration("2024-01-01", "2024-12-31"), "2024-12"),
+])
+def test_period_comes_from_context_end_date(tmp_path, tmp_blob_store, context, period):
+    result = parse_edefter_file(write(tmp_path, context), "yevmiye_202401.xml")
+
+    assert result['success']
+    assert result['period'] == period
+    assert result['financial_data']['period'] in ("2024-12-31", "2024-06-30", "2024-03-31")
+
+def test_period_falls_back_to_file_name(tmp_path, tmp_blob_store):
+    result = parse_edefter_file(write(tmp_path, ""), "yevmiye_2024_05.xml")
+
+    assert result['period'] == "2024-05"
+
+def test_live_parser_matches_file_parse(tmp_path, tmp_blob_store):
+    path = write(tmp_path, duration("2024-07-01", "2024-09-30"))
+    parser = EDefterStreamParser(ledger=TrialBalanceAggregator())
+    with open(path, 'rb') as f:
+        content = f.read()
+    for offset in range(0, len(content), 7):
+        parser.feed(content[offset:offset + 7])
+
+    live = finish_edefter_parser(parser, "defter.xml")
+    parsed = parse_edefter_file(path, "defter.xml")
+
+    # Yükleme boyunca beslenen ayrıştırıcının süresi ölçülemez
+    assert 'parse_seconds' not in live
+    assert parsed['parse_seconds'] >= 0
+
+    assert live['period'] == parsed['period'] == "2024-09"
+    assert live['financial_data'] == parsed['financial_data']
+
+LEDGER_DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<edefter:defter xmlns:edefter="http://www.edefter.gov.tr" xmlns:xbrli="http://www.xbrl.org/2003/instance"
+  xmlns:gl-cor="http://www.xbrl.org/int/gl/cor/2006-10-25">
+{context}
+<Ozkaynaklar>1000000</Ozkaynaklar>
+<gl-cor:accountingEntries><gl-cor:entryHeader>
+  <gl-cor:entryDetail>
+    <gl-cor:account><gl-cor:accountMainID>100</gl-cor:accountMainID></gl-cor:account>
+    <gl-cor:amount>1000000</gl-cor:amount><gl-cor:debitCreditCode>D</gl-cor:debitCreditCode>
+  </gl-cor:entryDetail>
+  <gl-cor:entryDetail>
+    <gl-cor:account><gl-cor:accountMainID>500</gl-cor:accountMainID></gl-cor:account>
+    <gl-cor:amount>10000.00</gl-cor:amount><gl-cor:debitCreditCode>C</gl-cor:debitCreditCode>
+  </gl-cor:entryDetail>
+</gl-cor:entryHeader></gl-cor:accountingEntries>
+</edefter:defter>"""
+
+def test_ledger_amounts_use_summary_units(tmp_path, tmp_blob_store):
+    path = tmp_path / "defter.xml"
+    path.write_text(LEDGER_DOCUMENT.format(context=instant("2024-12-31")), encoding="utf-8")
+
+    data = parse_edefter_file(str(path), path.name)['financial_data']
+
+    # Düz tamsayılar hem özet etiketlerde hem yevmiye satırlarında kuruştur
+    assert data['equity'] == pytest.approx(10000.0)
+    assert data['total_assets'] == pytest.approx(10000.0)
+    assert data['trial_balance'] == [
+        {'account': '100', 'debit': 10000.0, 'credit': 0.0, 'debitBalance': 10000.0, 'creditBalance': 0.0},
+        {'account': '500', 'debit': 0.0, 'credit': 10000.0, 'debitBalance': 0.0, 'creditBalance': 10000.0},
+    ]
+
+def test_invalid_xml_is_reported_not_raised(tmp_path, tmp_blob_store):
+    path = tmp_path / "bozuk_202402.xml"
+    path.write_bytes(b"<a><b></a>")
+
+    result = parse_edefter_file(str(path), path.name)
+
+    assert not result['success']
+    assert result['period'] == "2024-02"
+    assert tmp_blob_store.get(result['raw_data_ref']) == b"<a><b></a>"
+
+@pytest.mark.parametrize("text, period", [
+    ("2024-12", "2024-12"),
+    ("2024/12", "2024-12"),
+    ("202412", "2024-12"),
+    ("2024-12-31", "2024-12"),
+    ("Q4", None),
+    (None, None),
+])
+def test_normalize_period(text, period):
+    assert normalize_period(text) == period
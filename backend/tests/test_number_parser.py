@@ -0,0 +1,65 @@
+import pytest
+
+from app.services.edefter_parser import parse_amount
+from app.services.number_parser import parse_number, parse_numbers, split_label_and_numbers
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.234.567,89", 1234567.89),
+    ("(1.234,00)", -1234.0),
+    ("1.234,00-", -1234.0),
+    ("−3,2", -3.2),
+    ("-5", -5.0),
+    ("1 234,50", 1234.5),
+    ("1,234.56", 1234.56),
+    ("42", 42.0),
+])
+def test_parse_number_turkish_format(text, expected):
+    assert parse_number(text) == pytest.approx(expected)
+
+@pytest.mark.parametrize("text", [None, "", "abc", "12a"])
+def test_parse_number_rejects_non_numbers(text):
+    assert parse_number(text) is None
+
+def test_parse_number_machine_format():
+    assert parse_number("1234567.89", decimal=".") == pytest.approx(1234567.89)
+    assert parse_number("-12.5", decimal=".") == pytest.approx(-12.5)
+    # Aynı metin Türkçe biçimde binlik ayracı olarak okunur
+    assert parse_number("1.234", decimal=".") == pytest.approx(1.234)
+    assert parse_number("1.234") == pytest.approx(1234.0)
+
+def test_parse_numbers_does_not_treat_date_dash_as_sign():
+    values = parse_numbers("Dönem 2023-12 Satışlar 1.234,56 (12,00) 7")
+
+    assert values == pytest.approx([2023.0, 12.0, 1234.56, -12.0, 7.0])
+
+def test_parse_numbers_machine_format():
+    values = parse_numbers("1234567.89 -12.5 (3.25) 1,234.56", decimal=".")
+
+    assert values == pytest.approx([1234567.89, -12.5, -3.25, 1234.56])
+
+def test_split_label_and_numbers():
+    label, values = split_label_and_numbers("  Ticari   Alacaklar  1.234,56  (789,00)")
+
+    assert label == "Ticari Alacaklar"
+    assert values == pytest.approx([1234.56, -789.0])
+
+def test_split_label_keeps_unparseable_digits_in_label():
+    label, values = split_label_and_numbers("Hesap 1.2.3 Toplam 5,00")
+
+    assert label == "Hesap 1.2.3 Toplam"
+    assert values == pytest.approx([5.0])
+
+def test_split_label_without_numbers():
+    assert split_label_and_numbers("Nakit ve  Nakit Benzerleri") == ("Nakit ve Nakit Benzerleri", [])
+
+@pytest.mark.parametrize("text, expected", [
+    ("123456", 1234.56),
+    ("-500", -5.0),
+    ("1234.56", 1234.56),
+    ("-0.5", -0.5),
+    ("", 0.0),
+    (None, 0.0),
+    ("tutar", 0.0),
+])
+def test_parse_amount_plain_integers_are_kurus(text, expected):
+    assert parse_amount(text) == pytest.approx(expected)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from app.services.trend_analytics import rolling_mean
+
+NAN = np.nan
+
+def test_rolling_mean_only_covers_observed_periods():
+    values = np.array([
+        [1.0, NAN, 3.0, 5.0, NAN, 7.0],
+        [2.0, 4.0, 6.0, 8.0, 10.0, 12.0],
+        [NAN] * 6,
+    ])
+
+    result = rolling_mean(values, 3)
+
+    # Eksik dönemlere değer üretilmez, ilk dönemler kısmi pencereyle hesaplanır
+    np.testing.assert_allclose(result, [
+        [1.0, NAN, 2.0, 4.0, NAN, 6.0],
+        [2.0, 3.0, 4.0, 6.0, 8.0, 10.0],
+        [NAN] * 6,
+    ])
+
+def test_rolling_mean_window_larger_than_series():
+    values = np.array([[4.0, NAN, 8.0]])
+
+    np.testing.assert_allclose(rolling_mean(values, 12), [[4.0, NAN, 6.0]])
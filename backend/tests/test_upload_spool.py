@@ -0,0 +1,57 @@
+import glob
+import io
+import os
+import tempfile
+import zipfile
+
+import pytest
+
+from app.services.upload_spool import SpooledUpload, UploadRejectedError, spool_zip_members
+
+def make_zip(tmp_path, members) -> str:
+    path = tmp_path / "arsiv.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return str(path)
+
+def spooled_files():
+    return set(glob.glob(os.path.join(tempfile.gettempdir(), "upload_*.pdf")))
+
+def test_members_within_budget_are_spooled(tmp_path):
+    path = make_zip(tmp_path, {"a.pdf": b"%PDF-" + b"a" * 100, "b.pdf": b"%PDF-" + b"b" * 100})
+
+    members = spool_zip_members(path, 1000, 10, 1000)
+    try:
+        assert [name for name, _ in members] == ["a.pdf", "b.pdf"]
+        assert all(isinstance(member, SpooledUpload) for _, member in members)
+    finally:
+        for _, member in members:
+            member.cleanup()
+
+def test_declared_total_over_budget_is_rejected_up_front(tmp_path):
+    path = make_zip(tmp_path, {f"{i}.pdf": b"%PDF-" + b"x" * 400 for i in range(3)})
+    before = spooled_files()
+
+    with pytest.raises(UploadRejectedError):
+        spool_zip_members(path, 1000, 10, 1000)
+    assert spooled_files() == before
+
+def test_understated_sizes_are_caught_while_streaming(tmp_path, monkeypatch):
+    path = make_zip(tmp_path, {f"{i}.pdf": b"%PDF-" + b"x" * 400 for i in range(3)})
+    # Arşivde bildirilen boyutlara güvenilmez (ZIP bombası küçük boyut bildirebilir)
+    original = zipfile.ZipFile.infolist
+
+    def understated(self):
+        infos = original(self)
+        for info in infos:
+            info.file_size = 1
+        return infos
+
+    monkeypatch.setattr(zipfile.ZipFile, "infolist", understated)
+    monkeypatch.setattr(zipfile.ZipFile, "open", lambda self, info, *args, **kwargs: io.BytesIO(b"%PDF-" + b"x" * 400))
+    before = spooled_files()
+
+    with pytest.raises(UploadRejectedError):
+        spool_zip_members(path, 1000, 10, 1000)
+    assert spooled_files() == before